@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+CRC16 Micro-Benchmark
+=====================
+
+Compare the shared CRC engine in utils/crc16.py against crccheck and the
+previous bit-by-bit MODBUS loop from test_fase1.py.
+
+Usage:
+    python bench_crc16.py [--size BYTES] [--frames COUNT]
+
+Author: Assistant
+Date: October 2025
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+
+# Shared host protocol layer lives in utils/ at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.crc16 import crc16_modbus, crc16_xmodem, validate_frames
+from utils.protocol import FrameBuilder
+
+try:
+    from crccheck.crc import Crc16Modbus, Crc16Xmodem
+except ImportError:
+    Crc16Modbus = Crc16Xmodem = None
+
+
+def bitwise_modbus(data: bytes) -> int:
+    """Previous test_fase1.calculate_crc16 implementation."""
+    crc = 0xFFFF
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            if crc & 0x0001:
+                crc = (crc >> 1) ^ 0xA001
+            else:
+                crc >>= 1
+    return crc
+
+
+def build_xmodem_table():
+    """MSB-first lookup table for polynomial 0x1021."""
+    table = []
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+        table.append(crc & 0xFFFF)
+    return tuple(table)
+
+
+XMODEM_TABLE = build_xmodem_table()
+
+
+def table_xmodem(data: bytes) -> int:
+    """Pure-Python table-driven XMODEM, for reference."""
+    crc = 0
+    table = XMODEM_TABLE
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFF) ^ table[(crc >> 8) ^ byte]
+    return crc
+
+
+def measure(func, data: bytes, number: int) -> float:
+    """Return throughput in MB/s for func(data)."""
+    seconds = min(timeit.repeat(lambda: func(data), number=number, repeat=3))
+    return len(data) * number / seconds / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CRC16 micro-benchmark")
+    parser.add_argument('--size', type=int, default=256, help='Block size in bytes (default: 256)')
+    parser.add_argument('--frames', type=int, default=10000, help='Frames for bulk validation (default: 10000)')
+    args = parser.parse_args()
+
+    data = bytes(random.getrandbits(8) for _ in range(args.size))
+    number = max(1, 200000 // args.size)
+
+    # Sanity check before timing anything
+    assert table_xmodem(data) == crc16_xmodem(data)
+    assert bitwise_modbus(data) == crc16_modbus(data)
+
+    candidates = [
+        ('xmodem utils.crc16', crc16_xmodem),
+        ('xmodem table (python)', table_xmodem),
+        ('modbus utils.crc16', crc16_modbus),
+        ('modbus bitwise (old)', bitwise_modbus),
+    ]
+    if Crc16Xmodem is not None:
+        assert Crc16Xmodem.calc(data) == crc16_xmodem(data)
+        assert Crc16Modbus.calc(data) == crc16_modbus(data)
+        candidates.insert(1, ('xmodem crccheck', Crc16Xmodem.calc))
+        candidates.insert(4, ('modbus crccheck', Crc16Modbus.calc))
+    else:
+        print("crccheck not installed - skipping comparison")
+
+    print(f"\nBlock size: {args.size} bytes")
+    print("-" * 50)
+    for name, func in candidates:
+        print(f"{name:30s} {measure(func, data, number):10.2f} MB/s")
+
+    # Bulk validation over a synthetic capture
+    builder = FrameBuilder()
+    frames = [
+        builder.build_frame(0x00, 0x00, random.randrange(256),
+                            bytes(random.getrandbits(8) for _ in range(random.randrange(0, 64))))
+        for _ in range(args.frames)
+    ]
+    seconds = min(timeit.repeat(lambda: validate_frames(frames), number=1, repeat=3))
+    assert all(validate_frames(frames))
+    print("-" * 50)
+    print(f"{'validate_frames':30s} {args.frames / seconds:10.0f} frames/s")
+
+    if Crc16Xmodem is not None:
+        def crccheck_bulk():
+            return [Crc16Xmodem.calc(f[1:-3]) == (f[-3] | (f[-2] << 8)) for f in frames]
+        seconds = min(timeit.repeat(crccheck_bulk, number=1, repeat=3))
+        print(f"{'crccheck loop':30s} {args.frames / seconds:10.0f} frames/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Log Parser Benchmark
+====================
+
+Measure how many firmware log lines per second the host can parse and
+format, against the most the firmware can send on the 115200 baud RS485
+log port.
+
+Compares the previous ``LoggerMonitor.parse_log_message`` (regex, two
+colour dicts rebuilt and float maths per line, fed one line at a time)
+with ``utils.log_parser`` per line and in batch mode over 4 KiB reads.
+The line mix is dominated by UART2/LoRa hex dumps, the case where the
+monitor used to fall behind.
+
+Usage:
+    python bench_log_parser.py [--lines N] [--baudrate BAUD] [--chunk BYTES]
+
+Author: Assistant
+Date: October 2025
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+# Shared host protocol layer lives in utils/ at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.command_registry import REGISTRY
+from utils.log_parser import LogParser
+from utils.protocol import FrameBuilder
+
+# Required headroom over the firmware's maximum line rate
+REQUIRED_FACTOR = 10
+
+
+class PreviousParser:
+    """The per-line parser LoggerMonitor used before utils.log_parser."""
+
+    def __init__(self):
+        self.log_pattern = re.compile(r'\[(\d+)\] (\w+):(\w+) (.+)')
+        self.command_pattern = re.compile(r'Processing command 0x([0-9A-Fa-f]{2})')
+        self.frame_pattern = re.compile(r'\[\d+\]: 7E ([0-9A-F]{2}) [0-9A-F]{2} ([0-9A-F]{2})')
+
+    def parse_log_message(self, line):
+        match = self.log_pattern.match(line.strip())
+        if match:
+            timestamp_ms = int(match.group(1))
+            level = match.group(2)
+            source = match.group(3)
+            message = match.group(4)
+            timestamp_sec = timestamp_ms / 1000.0
+            hours = int(timestamp_sec // 3600)
+            minutes = int((timestamp_sec % 3600) // 60)
+            seconds = timestamp_sec % 60
+            colors = {'DBG': '\033[36m', 'INF': '\033[32m', 'WRN': '\033[33m', 'ERR': '\033[31m',
+                      'CRT': '\033[91m'}
+            source_colors = {'SYS': '\033[94m', 'U2': '\033[95m', 'LRX': '\033[92m', 'LTX': '\033[93m',
+                             'CMD': '\033[96m', 'CFG': '\033[97m'}
+            reset = '\033[0m'
+            level_color = colors.get(level, '')
+            source_color = source_colors.get(source, '')
+            formatted_time = f"{hours:02d}:{minutes:02d}:{seconds:06.3f}"
+            message = self.annotate_command(message)
+            return f"[{formatted_time}] {level_color}{level}{reset}:{source_color}{source}{reset} {message}"
+        return line.strip()
+
+    def annotate_command(self, message):
+        match = self.command_pattern.search(message)
+        if match:
+            return f"{message} ({REGISTRY.command_name(int(match.group(1), 16))})"
+        match = self.frame_pattern.search(message)
+        if match:
+            return f"{message} ({REGISTRY.command_name(int(match.group(2), 16), int(match.group(1), 16))})"
+        return message
+
+
+def generate_log(lines: int, seed: int = 1) -> bytes:
+    """Synthetic firmware log in the Logger.cpp format, mostly hex dumps."""
+    rng = random.Random(seed)
+    builder = FrameBuilder()
+    commands = [spec.command for spec in REGISTRY]
+    out = []
+    tick = 0
+    for _ in range(lines):
+        tick += rng.randrange(0, 5)
+        kind = rng.random()
+        if kind < 0.6:
+            frame = builder.build_frame(0, 0, rng.choice(commands), bytes(rng.randrange(256)
+                                                                          for _ in range(rng.randrange(0, 24))))
+            source, prefix = rng.choice((('U2 ', 'RX'), ('U2 ', 'TX'), ('LRX', 'RX'), ('LTX', 'TX')))
+            dump = ''.join(f"{b:02X} " for b in frame)
+            out.append(f"[{tick:08d}] DBG:{source} {prefix}[{len(frame)}]: {dump}")
+        elif kind < 0.8:
+            out.append(f"[{tick:08d}] INF:CMD Processing command 0x{rng.choice(commands):02X}")
+        else:
+            out.append(f"[{tick:08d}] INF:SYS Heartbeat uptime={tick // 1000}s free={rng.randrange(4096)}")
+    return ('\r\n'.join(out) + '\r\n').encode('ascii')
+
+
+def chunks(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def bench_previous(data: bytes) -> float:
+    """One decode, strip and parse per line, as the old readline loop did."""
+    parser = PreviousParser()
+    started = time.perf_counter()
+    for raw_line in data.split(b'\n'):
+        line = raw_line.decode('utf-8', errors='ignore')
+        if line.strip():
+            parser.parse_log_message(line)
+    return time.perf_counter() - started
+
+
+def bench_per_line(data: bytes) -> float:
+    parser = LogParser()
+    started = time.perf_counter()
+    for raw_line in data.split(b'\n'):
+        line = raw_line.decode('utf-8', errors='ignore')
+        if line.strip():
+            parser.format(line)
+    return time.perf_counter() - started
+
+
+def bench_batch(data: bytes, chunk_size: int) -> float:
+    parser = LogParser()
+    pieces = chunks(data, chunk_size)
+    started = time.perf_counter()
+    for piece in pieces:
+        parser.feed(piece)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Firmware log parser throughput benchmark")
+    parser.add_argument('--lines', type=int, default=100000, help='Lines to parse (default: 100000)')
+    parser.add_argument('--baudrate', type=int, default=115200, help='Log port baudrate (default: 115200)')
+    parser.add_argument('--chunk', type=int, default=4096, help='Read size for batch mode (default: 4096)')
+    args = parser.parse_args()
+
+    data = generate_log(args.lines)
+    line_lengths = [len(line) + 1 for line in data.split(b'\n') if line]
+    shortest = min(line_lengths)
+    average = len(data) / args.lines
+    # 8N1: 10 bits per byte; the shortest line gives the highest possible line rate
+    firmware_max = args.baudrate / 10 / shortest
+    firmware_mix = args.baudrate / 10 / average
+
+    # Same output from both parsers (apart from the padding after 2-letter sources)
+    sample = data.split(b'\r\n')[:200]
+    previous, current = PreviousParser(), LogParser()
+    for line in sample:
+        text = line.decode()
+        assert previous.parse_log_message(text).replace('  ', ' ') == current.format(text), text
+
+    print(f"\n{args.lines} lines, {len(data) / 1e6:.1f} MB, average {average:.0f} bytes/line")
+    print(f"Firmware at {args.baudrate} baud: {firmware_mix:.0f} lines/s for this mix, "
+          f"at most {firmware_max:.0f} lines/s ({shortest}-byte lines)")
+    print("-" * 64)
+    results = [
+        ('previous parse_log_message', min(bench_previous(data) for _ in range(3))),
+        ('LogParser.format per line', min(bench_per_line(data) for _ in range(3))),
+        (f'LogParser.feed batch ({args.chunk} B reads)', min(bench_batch(data, args.chunk) for _ in range(3))),
+    ]
+    for name, seconds in results:
+        rate = args.lines / seconds
+        print(f"{name:38s} {rate:10.0f} lines/s  {rate / firmware_max:6.1f}x firmware max")
+    print("-" * 64)
+
+    batch_rate = args.lines / results[-1][1]
+    factor = batch_rate / firmware_max
+    verdict = "PASS" if factor >= REQUIRED_FACTOR else "FAIL"
+    print(f"{verdict}: batch mode sustains {factor:.1f}x the firmware's maximum line rate "
+          f"(required {REQUIRED_FACTOR}x)")
+    return 0 if factor >= REQUIRED_FACTOR else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Serial Read Latency Benchmark
+=============================
+
+Measure request/response round-trip time and idle CPU cost of the old
+``in_waiting`` + 10 ms sleep loop against ``utils.serial_reader`` on a
+pty-backed device that echoes every frame it receives (Linux only).
+
+Usage:
+    python bench_serial_latency.py [--count N] [--idle SECONDS]
+
+Author: Assistant
+Date: October 2025
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+import serial
+
+# Shared host protocol layer lives in utils/ at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.protocol import FrameBuilder, FrameDecoder
+from utils.serial_reader import DEFAULT_TIMEOUT, SerialReader
+
+
+class EchoDevice:
+    """Pty master that answers each complete frame with the same frame."""
+
+    def __init__(self):
+        self.master_fd, slave_fd = os.openpty()
+        self.port_name = os.ttyname(slave_fd)
+        self._slave_fd = slave_fd
+        self._decoder = FrameDecoder()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while self._running:
+            try:
+                data = os.read(self.master_fd, 4096)
+            except OSError:
+                break
+            for frame in self._decoder.feed(data):
+                os.write(self.master_fd, frame.raw)
+
+    def close(self):
+        self._running = False
+        os.close(self._slave_fd)
+        os.close(self.master_fd)
+
+
+class PollingReader:
+    """The previous reader loop: check in_waiting, then sleep 10 ms."""
+
+    def __init__(self, port):
+        self.port = port
+
+    def read(self) -> bytes:
+        if self.port.in_waiting > 0:
+            return self.port.read(self.port.in_waiting)
+        time.sleep(0.01)
+        return b''
+
+
+def round_trips(port, reader, count: int):
+    """Return round-trip times in milliseconds for ``count`` echoed queries."""
+    builder = FrameBuilder()
+    decoder = FrameDecoder()
+    samples = []
+    for i in range(count):
+        request = builder.build_frame(0x00, 0x00, 0x20 + (i % 6))
+        start = time.perf_counter()
+        port.write(request)
+        frames = []
+        while not frames:
+            frames = decoder.feed(reader.read())
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return samples
+
+
+def idle_cpu(reader, seconds: float) -> float:
+    """Return CPU seconds spent by the reader loop on an idle port."""
+    cpu_start = time.process_time()
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        reader.read()
+    return time.process_time() - cpu_start
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100.0))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serial read latency benchmark on a pty")
+    parser.add_argument('--count', type=int, default=200, help='Round trips per reader (default: 200)')
+    parser.add_argument('--idle', type=float, default=1.0, help='Idle CPU measurement in seconds (default: 1.0)')
+    args = parser.parse_args()
+
+    if os.name != 'posix':
+        print("This benchmark needs a POSIX pty")
+        return 1
+
+    device = EchoDevice()
+    port = serial.Serial(device.port_name, 115200, timeout=DEFAULT_TIMEOUT)
+    try:
+        readers = [
+            ('poll + sleep(0.01) (old)', PollingReader(port)),
+            ('blocking read', SerialReader(port, use_select=False)),
+            ('select', SerialReader(port, use_select=True)),
+        ]
+
+        print(f"\n{args.count} round trips per reader, pty echo device")
+        print("-" * 78)
+        print(f"{'reader':28s} {'median ms':>10s} {'p95 ms':>10s} {'max ms':>10s} {'idle CPU %':>12s}")
+        for name, reader in readers:
+            port.reset_input_buffer()
+            samples = round_trips(port, reader, args.count)
+            cpu = idle_cpu(reader, args.idle)
+            print(f"{name:28s} {statistics.median(samples):10.3f} {percentile(samples, 95):10.3f} "
+                  f"{max(samples):10.3f} {100.0 * cpu / args.idle:12.2f}")
+    finally:
+        port.close()
+        device.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
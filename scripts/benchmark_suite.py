@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Protocol Benchmark Suite
+========================
+
+Measure the host protocol stack and catch performance regressions:
+
+- ``FrameBuilder.build_frame`` operations per second
+- CRC-16/XMODEM throughput
+- ``FrameDecoder`` throughput on a synthetic capture with noise and
+  frames split across reads
+- Query round-trip time and full parameter readout time against the
+  pty-backed firmware simulator (POSIX only)
+
+Results are written as JSON. With ``--compare`` the run is checked
+against a previous result file and the exit code is 1 if any metric got
+worse by more than ``--threshold`` percent.
+
+Usage:
+    python benchmark_suite.py [--output FILE] [--compare BASELINE] [--threshold PCT]
+
+Example:
+    python benchmark_suite.py --output baseline.json
+    python benchmark_suite.py --compare baseline.json --threshold 15
+
+Author: Assistant
+Date: October 2025
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import timeit
+from datetime import datetime
+from typing import Dict, List
+
+# Shared host protocol layer lives in utils/ at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.crc16 import crc16_xmodem
+from utils.protocol import FrameBuilder, FrameDecoder
+
+# Parameters the firmware answers (see transmitLoraSettingResponse)
+READOUT_PARAMETERS = ['tx_freq', 'rx_freq', 'bandwidth', 'spread_factor', 'coding_rate']
+
+
+class BenchmarkSuite:
+    """Runs the benchmarks and collects metrics."""
+
+    def __init__(self, quick: bool = False, seed: int = 1234):
+        self.quick = quick
+        self.random = random.Random(seed)
+        self.metrics: Dict[str, dict] = {}
+
+    def record(self, name: str, value: float, unit: str, higher_is_better: bool):
+        """Store one metric and print it."""
+        self.metrics[name] = {'value': value, 'unit': unit, 'higher_is_better': higher_is_better}
+        print(f"  {name:32s} {value:14.3f} {unit}")
+
+    def best_rate(self, func, number: int) -> float:
+        """Return calls per second of func, best of three runs."""
+        seconds = min(timeit.repeat(func, number=number, repeat=3))
+        return number / seconds
+
+    def bench_frame_builder(self):
+        builder = FrameBuilder()
+        payload = bytes(range(16))
+        number = 20000 if self.quick else 100000
+        self.record('build_frame_empty', self.best_rate(lambda: builder.build_frame(0, 0, 0x20), number),
+                    'ops/s', True)
+        self.record('build_frame_16b', self.best_rate(lambda: builder.build_frame(0, 0, 0xB0, payload), number),
+                    'ops/s', True)
+
+    def bench_crc(self):
+        data = bytes(self.random.getrandbits(8) for _ in range(4096))
+        number = 500 if self.quick else 2000
+        self.record('crc16_xmodem_4k', self.best_rate(lambda: crc16_xmodem(data), number) * len(data) / 1e6,
+                    'MB/s', True)
+
+    def synthetic_capture(self, frames: int) -> List[bytes]:
+        """Build a capture with noise between frames, cut into random-sized reads."""
+        builder = FrameBuilder()
+        rng = self.random
+        stream = bytearray()
+        for _ in range(frames):
+            if rng.random() < 0.1:
+                # Line noise, including stray start marks
+                stream += bytes(rng.choice((0x7E, rng.getrandbits(8))) for _ in range(rng.randint(1, 8)))
+            payload = bytes(rng.getrandbits(8) for _ in range(rng.randint(0, 64)))
+            stream += builder.build_frame(0x00, 0x00, rng.choice((0x17, 0x18, 0x20, 0x24)), payload)
+
+        chunks = []
+        pos = 0
+        while pos < len(stream):
+            size = rng.randint(1, 256)
+            chunks.append(bytes(stream[pos:pos + size]))
+            pos += size
+        return chunks
+
+    def bench_decoder(self):
+        frames = 5000 if self.quick else 20000
+        chunks = self.synthetic_capture(frames)
+        total = sum(len(c) for c in chunks)
+
+        def run():
+            decoder = FrameDecoder()
+            for chunk in chunks:
+                decoder.feed(chunk)
+            return decoder
+
+        seconds = min(timeit.repeat(run, number=1, repeat=3))
+        decoded = run().frames_decoded
+        self.record('decoder_throughput', total / seconds / 1e6, 'MB/s', True)
+        self.record('decoder_frames', decoded / seconds, 'frames/s', True)
+        self.record('decoder_recovered', 100.0 * decoded / frames, '%', True)
+
+    def bench_end_to_end(self):
+        if os.name != 'posix':
+            print("  end-to-end benchmarks need a POSIX pty - skipped")
+            return
+        from utils.async_transport import AsyncGateway
+        from utils.simulator import GatewaySimulator
+
+        queries = 100 if self.quick else 500
+        readouts = 20 if self.quick else 100
+
+        async def run(port: str):
+            async with AsyncGateway(port, timeout=0.5, retries=0) as gateway:
+                rtts = []
+                for _ in range(queries):
+                    start = time.perf_counter()
+                    await gateway.query('spread_factor')
+                    rtts.append((time.perf_counter() - start) * 1000.0)
+
+                readout_times = []
+                for _ in range(readouts):
+                    start = time.perf_counter()
+                    for key in READOUT_PARAMETERS:
+                        await gateway.query(key)
+                    readout_times.append((time.perf_counter() - start) * 1000.0)
+                return rtts, readout_times
+
+        with GatewaySimulator(seed=1) as simulator:
+            rtts, readout_times = asyncio.run(run(simulator.port))
+
+        rtts.sort()
+        self.record('query_rtt_median', statistics.median(rtts), 'ms', False)
+        self.record('query_rtt_p95', rtts[int(len(rtts) * 0.95) - 1], 'ms', False)
+        self.record('parameter_readout', statistics.median(readout_times), 'ms', False)
+
+    def run(self, skip_e2e: bool = False) -> dict:
+        print("\nFrame builder")
+        self.bench_frame_builder()
+        print("CRC")
+        self.bench_crc()
+        print("Decoder")
+        self.bench_decoder()
+        if not skip_e2e:
+            print("End-to-end (simulator)")
+            self.bench_end_to_end()
+
+        return {
+            'metadata': {
+                'timestamp': datetime.now().isoformat(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'quick': self.quick,
+            },
+            'metrics': self.metrics,
+        }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> bool:
+    """
+    Print a comparison table and check for regressions.
+
+    Returns:
+        True if no metric regressed by more than threshold percent
+    """
+    ok = True
+    print(f"\nComparison against baseline (threshold {threshold:.1f}%)")
+    print("-" * 80)
+    print(f"{'metric':32s} {'baseline':>12s} {'current':>12s} {'change':>9s}  status")
+    for name, metric in results['metrics'].items():
+        base = baseline.get('metrics', {}).get(name)
+        if base is None or not base['value']:
+            print(f"{name:32s} {'-':>12s} {metric['value']:12.3f} {'':>9s}  new")
+            continue
+        change = 100.0 * (metric['value'] - base['value']) / base['value']
+        regression = -change if metric['higher_is_better'] else change
+        status = 'ok'
+        if regression > threshold:
+            status = 'REGRESSION'
+            ok = False
+        print(f"{name:32s} {base['value']:12.3f} {metric['value']:12.3f} {change:+8.1f}%  {status}")
+    return ok
+
+
+def main():
+    """Main application entry point."""
+    parser = argparse.ArgumentParser(description="Host protocol benchmark suite")
+    parser.add_argument('-o', '--output', help='Write results to this JSON file')
+    parser.add_argument('-c', '--compare', help='Baseline JSON file to compare against')
+    parser.add_argument('-t', '--threshold', type=float, default=10.0,
+                        help='Allowed regression in percent (default: 10)')
+    parser.add_argument('--quick', action='store_true', help='Fewer iterations, for CI smoke runs')
+    parser.add_argument('--skip-e2e', action='store_true', help='Skip simulator round-trip benchmarks')
+    args = parser.parse_args()
+
+    results = BenchmarkSuite(quick=args.quick).run(skip_e2e=args.skip_e2e)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        if not compare(results, baseline, args.threshold):
+            print("\nPerformance regression detected")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
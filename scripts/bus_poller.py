@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+RS485 Bus Poller
+================
+
+Poll several modules sharing one RS485 bus with the bus scheduler and
+report per-module round trips, timeouts and dead nodes.
+
+Targets are given as ``FUNC:ID[:COMMAND[:INTERVAL[:PRIORITY]]]``:
+COMMAND is a code (``0x20``) or name (``QUERY_TX_FREQ``),
+INTERVAL is in seconds and PRIORITY is ``high``, ``normal`` or ``low``.
+Omitted fields use ``--command``, ``--interval`` and ``--priority``.
+
+Usage:
+    python bus_poller.py PORT --targets TARGET [TARGET ...] [--duration S]
+
+Example:
+    python bus_poller.py COM5 --targets 5:1 5:2 5:3:0x20:0.5:high --duration 60
+
+Author: Assistant
+Date: October 2025
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Shared host protocol layer lives in utils/ at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.bus_scheduler import PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL, BusScheduler, PollTarget
+from utils.command_registry import REGISTRY
+from utils.fleet import GatewaySession
+from utils.protocol import Frame
+from utils.tracing import TRACER
+
+PRIORITY_NAMES = {'high': PRIORITY_HIGH, 'normal': PRIORITY_NORMAL, 'low': PRIORITY_LOW}
+
+
+def parse_command(text: str) -> int:
+    """Command code or registry name."""
+    spec = REGISTRY.by_name(text)
+    if spec is not None:
+        return spec.command
+    return int(text, 0)
+
+
+def parse_target(text: str, command: int, interval: float, priority: int):
+    """Parse FUNC:ID[:COMMAND[:INTERVAL[:PRIORITY]]]."""
+    fields = text.split(':')
+    if not 2 <= len(fields) <= 5:
+        raise argparse.ArgumentTypeError(f"Invalid target '{text}'")
+    try:
+        module_function = int(fields[0], 0)
+        module_id = int(fields[1], 0)
+        if len(fields) > 2 and fields[2]:
+            command = parse_command(fields[2])
+        if len(fields) > 3 and fields[3]:
+            interval = float(fields[3])
+        if len(fields) > 4:
+            priority = PRIORITY_NAMES[fields[4].lower()]
+    except (ValueError, KeyError):
+        raise argparse.ArgumentTypeError(f"Invalid target '{text}'")
+    return module_function, module_id, command, interval, priority
+
+
+def main():
+    """Main application entry point."""
+    parser = argparse.ArgumentParser(description="Poll many modules on one RS485 bus")
+    parser.add_argument('port', help='Serial port of the bus')
+    parser.add_argument('--targets', nargs='+', required=True, help='FUNC:ID[:COMMAND[:INTERVAL[:PRIORITY]]]')
+    parser.add_argument('-b', '--baudrate', type=int, default=115200, help='Baudrate (default: 115200)')
+    parser.add_argument('--command', default='QUERY_SPREAD_FACTOR', help='Default command (default: QUERY_SPREAD_FACTOR)')
+    parser.add_argument('--interval', type=float, default=1.0, help='Default poll interval in seconds (default: 1.0)')
+    parser.add_argument('--priority', choices=list(PRIORITY_NAMES), default='normal', help='Default priority class')
+    parser.add_argument('--dead-after', type=int, default=3, help='Timeouts before a module is considered dead')
+    parser.add_argument('--duration', type=float, help='Stop after this many seconds (default: until Ctrl+C)')
+    parser.add_argument('-q', '--quiet', action='store_true', help='Only print state changes and the summary')
+    parser.add_argument('--metrics', help='Write link counters and per-command latency percentiles to this JSON file')
+    parser.add_argument('--trace', metavar='FILE', help='Write a Chrome trace (Perfetto) of every command to FILE')
+    args = parser.parse_args()
+    if args.trace:
+        TRACER.enable(args.trace)
+
+    try:
+        command = parse_command(args.command)
+        targets = [parse_target(t, command, args.interval, PRIORITY_NAMES[args.priority]) for t in args.targets]
+    except (ValueError, argparse.ArgumentTypeError) as e:
+        parser.error(str(e))
+
+    def on_response(target: PollTarget, frame: Frame):
+        if not args.quiet:
+            print(f"{time.strftime('%H:%M:%S')} {target.name:20s} {frame.payload.hex(' ').upper()}")
+
+    def on_state_change(target: PollTarget, alive: bool):
+        print(f"{time.strftime('%H:%M:%S')} {target.name:20s} {'ALIVE' if alive else 'DEAD (backing off)'}")
+
+    with GatewaySession(args.port, args.baudrate, retries=0) as session:
+        scheduler = BusScheduler(session.request, on_response, on_state_change, dead_after=args.dead_after)
+        for module_function, module_id, cmd, interval, priority in targets:
+            scheduler.add(module_function, module_id, cmd, interval=interval, priority=priority)
+
+        started = time.monotonic()
+        scheduler.start()
+        try:
+            while args.duration is None or time.monotonic() - started < args.duration:
+                time.sleep(0.2)
+        except KeyboardInterrupt:
+            pass
+        scheduler.stop()
+        elapsed = time.monotonic() - started
+        snapshot = session.metrics.snapshot()
+        if args.metrics:
+            session.metrics.dump(args.metrics)
+
+    print("-" * 78)
+    print(f"{'Target':20s} {'State':6s} {'Polls':>6s} {'Answers':>8s} {'Timeouts':>8s} {'SRTT ms':>8s} {'Timeout ms':>10s}")
+    for target in scheduler.targets:
+        srtt = f"{target.srtt * 1000:8.2f}" if target.srtt is not None else f"{'-':>8s}"
+        print(f"{target.name:20s} {'dead' if target.dead else 'alive':6s} {target.polls:6d} {target.responses:8d} "
+              f"{target.timeouts:8d} {srtt} {target.timeout * 1000:10.1f}")
+    print(f"{scheduler.polls} polls in {elapsed:.1f} s, bus busy {100.0 * scheduler.busy_time / elapsed:.0f}%")
+    counters = snapshot['counters']
+    print(f"TX {counters['bytes_tx']} B, RX {counters['bytes_rx']} B, CRC errors {counters['crc_errors']}, "
+          f"resyncs {counters['resyncs']}")
+    for name, stats in snapshot['commands'].items():
+        if stats['count']:
+            print(f"  {name:28s} p50 {stats['p50_ms']:7.2f} ms  p95 {stats['p95_ms']:7.2f} ms  "
+                  f"p99 {stats['p99_ms']:7.2f} ms")
+    if args.metrics:
+        print(f"Metrics written to {args.metrics}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
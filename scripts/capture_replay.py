@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Serial Capture Replay
+=====================
+
+Inspect and replay binary captures recorded by the GUI ("Start Capture")
+or any tool using utils/capture.py.
+
+Usage:
+    python capture_replay.py CAPTURE [--speed X] [--start S] [--end S] [--tx] [--summary]
+
+Example:
+    python capture_replay.py lora_capture_20251016_101500.lgcap --summary
+    python capture_replay.py lora_capture_20251016_101500.lgcap --start 30 --speed 1
+
+Author: Assistant
+Date: October 2025
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+
+# Shared host protocol layer lives in utils/ at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.capture import DIRECTION_RX, DIRECTION_TX, CaptureReader, CaptureReplayer
+from utils.command_registry import REGISTRY, RequestKinds, request_kind
+
+
+def main():
+    """Main application entry point."""
+    parser = argparse.ArgumentParser(description="Replay a binary serial capture through the frame decoder")
+    parser.add_argument('capture', help='Capture file')
+    parser.add_argument('--speed', type=float, help='Real-time factor (default: as fast as possible)')
+    parser.add_argument('--start', type=float, help='Start offset in seconds')
+    parser.add_argument('--end', type=float, help='End offset in seconds')
+    parser.add_argument('--port-id', type=int, help='Only replay this port id')
+    parser.add_argument('--tx', action='store_true', help='Replay transmitted instead of received bytes')
+    parser.add_argument('--summary', action='store_true', help='Only print frame counts per command')
+    args = parser.parse_args()
+
+    with CaptureReader(args.capture) as reader:
+        created = datetime.fromtimestamp(reader.wall_time_ns / 1e9)
+        print(f"Capture: {args.capture}")
+        print(f"Created: {created.strftime('%Y-%m-%d %H:%M:%S')} | Records: {reader.record_count} "
+              f"| Duration: {reader.duration:.3f} s | Blocks: {len(reader.index)}")
+        if not reader.index:
+            return 0
+
+        origin = reader.start_time
+        start = origin + int(args.start * 1e9) if args.start is not None else None
+        end = origin + int(args.end * 1e9) if args.end is not None else None
+        # Both directions are decoded so responses can be named after their requests
+        replayer = CaptureReplayer(reader, speed=args.speed, direction=None, port_id=args.port_id)
+        direction = DIRECTION_TX if args.tx else DIRECTION_RX
+        kinds = RequestKinds()
+
+        counts = Counter()
+        started = time.perf_counter()
+        for record, frame in replayer.frames(start, end):
+            key = (record.port_id, frame.module_function, frame.module_id, frame.command)
+            if record.direction == DIRECTION_TX:
+                kind = kinds.request(key, request_kind(frame.payload))
+            else:
+                kind = kinds.response(key)
+            if record.direction != direction:
+                continue
+            name = REGISTRY.command_name(frame.command, frame.module_function, kind)
+            counts[name] += 1
+            if not args.summary:
+                offset = (record.timestamp - origin) / 1e9
+                print(f"[{offset:12.6f}] port {record.port_id} {name:28s} {frame.raw.hex(' ').upper()}")
+        elapsed = time.perf_counter() - started
+
+        print("-" * 60)
+        for name, count in counts.most_common():
+            print(f"{name:40s} {count:8d}")
+        errors = sum(decoder.crc_errors for (_, side), decoder in replayer.decoders.items() if side == direction)
+        print(f"{sum(counts.values())} frames, {errors} CRC errors, replayed in {elapsed:.3f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Gateway Fleet Configurator
+==========================
+
+Query, apply or verify a configuration profile on many gateways at once,
+one serial port per gateway, and print one aggregated table.
+
+Ports are handled concurrently and independently: a unit that does not
+answer fails its own row without delaying the others.
+
+Usage:
+    python fleet_configurator.py query  --ports PORT [PORT ...] [--params KEY ...]
+    python fleet_configurator.py apply  PROFILE --ports PORT [PORT ...]
+    python fleet_configurator.py verify PROFILE --all-ports
+
+Example:
+    python fleet_configurator.py apply lora_config_20251016_101500.json --ports COM3 COM4 COM5
+    python fleet_configurator.py query --all-ports --params tx_freq rx_freq spread_factor
+
+Author: Assistant
+Date: October 2025
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import serial.tools.list_ports
+
+# Shared host protocol layer lives in utils/ at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.command_registry import GATEWAY_PARAMETERS
+from utils.config_apply import load_profile
+from utils.fleet import ACTION_APPLY, ACTION_QUERY, ACTION_VERIFY, FleetResult, FleetRunner
+from utils.tracing import TRACER
+
+
+def print_results(action: str, results, keys):
+    """Print one row per port."""
+    if action == ACTION_QUERY:
+        header = f"{'Port':16s} {'Status':6s} " + " ".join(f"{key[:12]:>12s}" for key in keys) + f" {'Time':>7s}"
+        print(header)
+        print("-" * len(header))
+        for result in results:
+            status = 'ok' if result.ok else 'FAIL'
+            if result.error is not None and not result.values:
+                print(f"{result.port:16s} {status:6s} {result.error}")
+                continue
+            cells = " ".join(f"{'-' if result.values.get(key) is None else result.values[key]:>12}" for key in keys)
+            print(f"{result.port:16s} {status:6s} {cells} {result.elapsed:6.2f}s")
+        return
+
+    header = (f"{'Port':16s} {'Status':6s} {'Written':>7s} {'Same':>5s} {'Failed':>6s} "
+              f"{'Mismatch':>8s} {'Time':>7s}  Details")
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        status = 'ok' if result.ok else 'FAIL'
+        report = result.report
+        if report is None:
+            print(f"{result.port:16s} {status:6s} {'':>7s} {'':>5s} {'':>6s} {'':>8s} "
+                  f"{result.elapsed:6.2f}s  {result.error}")
+            continue
+        details = [f"{key}={actual} (want {expected})" for key, (actual, expected) in report.mismatched.items()]
+        details += [f"{key}: {error}" for key, error in report.failed.items()]
+        if result.error is not None:
+            details.append(result.error)
+        print(f"{result.port:16s} {status:6s} {len(report.written):7d} {report.writes_avoided:5d} "
+              f"{len(report.failed):6d} {len(report.mismatched):8d} {result.elapsed:6.2f}s  {'; '.join(details)}")
+
+
+def main():
+    """Main application entry point."""
+    parser = argparse.ArgumentParser(description="Query, apply or verify a profile on many gateways at once")
+    parser.add_argument('action', choices=[ACTION_QUERY, ACTION_APPLY, ACTION_VERIFY])
+    parser.add_argument('profile', nargs='?', help='Configuration JSON saved by the GUI (apply/verify)')
+    ports = parser.add_mutually_exclusive_group(required=True)
+    ports.add_argument('--ports', nargs='+', help='Serial ports, one gateway each')
+    ports.add_argument('--all-ports', action='store_true', help='Use every serial port found')
+    parser.add_argument('--params', nargs='+', help='Parameters to query (default: all the gateway answers)')
+    parser.add_argument('-b', '--baudrate', type=int, default=115200, help='Baudrate (default: 115200)')
+    parser.add_argument('--module-function', type=int, help='Target module function (default: from profile or 0)')
+    parser.add_argument('--module-id', type=int, help='Target module id (default: from profile or 0)')
+    parser.add_argument('--timeout', type=float,
+                        help='Fixed response timeout in seconds (default: adaptive to baudrate and round trips)')
+    parser.add_argument('--retries', type=int, default=2, help='Retries after a timeout (default: 2)')
+    parser.add_argument('-j', '--workers', type=int, help='Ports handled at once (default: all)')
+    parser.add_argument('--json', help='Also write the results to this JSON file')
+    parser.add_argument('--trace', metavar='FILE', help='Write a Chrome trace (Perfetto) of every command to FILE')
+    args = parser.parse_args()
+    if args.trace:
+        TRACER.enable(args.trace)
+
+    profile = {}
+    if args.action != ACTION_QUERY:
+        if not args.profile:
+            parser.error(f"{args.action} needs a PROFILE")
+        profile = load_profile(args.profile)
+
+    port_names = args.ports or [port.device for port in serial.tools.list_ports.comports()]
+    if not port_names:
+        print("No serial ports found")
+        return 1
+
+    module_function = args.module_function if args.module_function is not None else \
+        int(profile.get('module_function', 0))
+    module_id = args.module_id if args.module_id is not None else int(profile.get('module_id', 0))
+
+    print_lock = threading.Lock()
+
+    def on_result(result: FleetResult):
+        # Called from the worker threads as each port finishes
+        with print_lock:
+            print(f"  {result.port}: {result.summary()}", flush=True)
+
+    runner = FleetRunner(port_names, args.baudrate, module_function, module_id, args.timeout, args.retries,
+                         args.workers, on_result=on_result)
+    parameters = profile.get('parameters') if args.action != ACTION_QUERY else args.params
+    keys = args.params or GATEWAY_PARAMETERS
+
+    print(f"{args.action} on {len(runner.ports)} ports (function {module_function}, id {module_id})")
+    started = time.perf_counter()
+    try:
+        results = runner.run(args.action, parameters)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    except KeyboardInterrupt:
+        runner.cancel()
+        return 1
+    elapsed = time.perf_counter() - started
+
+    print()
+    print_results(args.action, results, keys)
+    ok = sum(1 for result in results if result.ok)
+    slowest = max(result.elapsed for result in results)
+    print(f"\n{ok}/{len(results)} ports ok in {elapsed:.2f} s (slowest port {slowest:.2f} s)")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump([to_json(result) for result in results], f, indent=2)
+        print(f"Results written to {args.json}")
+    return 0 if ok == len(results) else 1
+
+
+def to_json(result: FleetResult) -> dict:
+    """Flatten one result for the JSON report."""
+    data = {'port': result.port, 'ok': result.ok, 'error': result.error,
+            'values': result.values, 'elapsed': round(result.elapsed, 3)}
+    if result.report is not None:
+        report = result.report
+        data.update({
+            'written': report.written,
+            'skipped': report.plan.skipped,
+            'unchanged': report.plan.unchanged,
+            'failed': report.failed,
+            'mismatched': {key: {'actual': actual, 'expected': expected}
+                           for key, (actual, expected) in report.mismatched.items()},
+            'time_saved': round(report.time_saved, 3),
+        })
+    return data
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+LoRa Gateway Simulator
+======================
+
+Run the firmware simulator from utils/simulator.py on a pty pair so the
+GUI, test_fase1.py and logger_monitor.py can be used without hardware.
+
+Usage:
+    python gateway_simulator.py [--eeprom FILE] [--delay MS] [--loss PERCENT]
+
+Example:
+    python gateway_simulator.py --eeprom sim_eeprom.json --delay 5
+    python lora_gui_config.py          # connect to the printed port
+    python logger_monitor.py /dev/pts/N
+
+Author: Assistant
+Date: October 2025
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Shared host protocol layer lives in utils/ at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.simulator import GatewaySimulator
+
+
+def main():
+    """Main application entry point."""
+    parser = argparse.ArgumentParser(description="Simulate the LoRa Gateway on a pty pair")
+    parser.add_argument('--eeprom', help='JSON file persisting the simulated EEPROM')
+    parser.add_argument('--delay', type=float, default=0.0, help='Response delay in ms (default: 0)')
+    parser.add_argument('--loss', type=float, default=0.0, help='Response loss in percent (default: 0)')
+    parser.add_argument('--module-function', type=lambda x: int(x, 0), default=0x00,
+                        help='Module function the device answers to (default: 0x00)')
+    parser.add_argument('--module-id', type=lambda x: int(x, 0), default=0x00,
+                        help='Module id the device answers to (default: 0x00)')
+    parser.add_argument('--seed', type=int, help='Random seed for loss and detections')
+    args = parser.parse_args()
+
+    if os.name != 'posix':
+        print("The simulator needs a POSIX pty (Linux/macOS)")
+        return 1
+
+    simulator = GatewaySimulator(eeprom_path=args.eeprom, response_delay=args.delay / 1000.0,
+                                 loss_rate=args.loss / 100.0, module_function=args.module_function,
+                                 module_id=args.module_id, seed=args.seed)
+    with simulator:
+        print(f"Gateway port: {simulator.port}")
+        print(f"Logger port:  {simulator.log_port}")
+        print("Press Ctrl+C to stop")
+        try:
+            while True:
+                time.sleep(1.0)
+        except KeyboardInterrupt:
+            pass
+        print(f"\nFrames received: {simulator.frames_received} | Responses sent: {simulator.responses_sent} "
+              f"| Dropped: {simulator.responses_dropped} | Retransmitted: {simulator.frames_retransmitted}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
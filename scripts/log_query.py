@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Firmware Log Query
+==================
+
+Query a log database written by ``logger_monitor.py --store``.
+
+Filters are given as LVL:SRC specs (either side may be empty or ``*``),
+a host-time window and an optional message substring. Times are ISO
+dates (``2025-10-16 15:30``), times of day (``15:30:05``, today), Unix
+timestamps, or with --last a duration back from now (``90s``, ``15m``,
+``2h``, ``3d``).
+
+Usage:
+    python log_query.py DATABASE [SPEC ...] [--from T] [--to T | --last D] [--grep TEXT]
+                        [--limit N] [--newest] [--count | --summary]
+
+Example:
+    python log_query.py gateway.db ERR:LRX --from "2025-10-16 14:00" --to "2025-10-16 15:00"
+    python log_query.py gateway.db ERR CRT --last 2h
+    python log_query.py gateway.db :CMD --grep "0x20" --count
+    python log_query.py gateway.db --summary
+
+Author: Assistant
+Date: October 2025
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from datetime import datetime
+
+# Shared host protocol layer lives in utils/ at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.log_parser import format_timestamp
+from utils.log_store import LogStore, parse_time
+
+DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_duration(text):
+    """Seconds from ``90``, ``90s``, ``15m``, ``2h`` or ``3d``."""
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)([smhd]?)', text.strip())
+    if match is None:
+        raise argparse.ArgumentTypeError(f"invalid duration: {text}")
+    return float(match.group(1)) * DURATION_UNITS[match.group(2) or 's']
+
+
+def parse_specs(specs):
+    """Split LVL:SRC specs into level and source lists (empty means any)."""
+    levels, sources = set(), set()
+    for spec in specs:
+        level, _, source = spec.upper().partition(':')
+        if level not in ('', '*'):
+            levels.add(level)
+        if source not in ('', '*'):
+            sources.add(source)
+    return sorted(levels), sorted(sources)
+
+
+def format_record(record):
+    """One record as ``host time [firmware time] LVL:SRC message``."""
+    host = datetime.fromtimestamp(record.host_time).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+    if record.level is None:
+        return f"{host} {'':14s} {record.message}"
+    return f"{host} [{format_timestamp(record.tick)}] {record.level}:{record.source:3s} {record.message}"
+
+
+def main():
+    """Main application entry point."""
+    parser = argparse.ArgumentParser(description="Query a firmware log database")
+    parser.add_argument('database', help='Log database (logger_monitor.py --store)')
+    parser.add_argument('specs', nargs='*', metavar='SPEC', help='LVL:SRC filters, e.g. ERR:LRX, ERR, :CMD')
+    parser.add_argument('--from', dest='start', type=parse_time, help='Earliest host time')
+    window = parser.add_mutually_exclusive_group()
+    window.add_argument('--to', dest='end', type=parse_time, help='Latest host time')
+    window.add_argument('--last', type=parse_duration, help='Only the last duration, e.g. 15m or 2h')
+    parser.add_argument('--grep', help='Message must contain this text')
+    parser.add_argument('--limit', type=int, help='Maximum records printed')
+    parser.add_argument('--newest', action='store_true', help='Newest records first')
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument('--count', action='store_true', help='Only print the number of matching records')
+    output.add_argument('--summary', action='store_true', help='Record counts per level and source')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.database):
+        print(f"✗ No such database: {args.database}", file=sys.stderr)
+        return 1
+
+    start, end = args.start, args.end
+    if args.last is not None:
+        start, end = time.time() - args.last, None
+    levels, sources = parse_specs(args.specs)
+
+    store = LogStore(args.database, readonly=True)
+    try:
+        started = time.perf_counter()
+        if args.summary:
+            rows = store.summary(start, end)
+            elapsed = time.perf_counter() - started
+            first, last = store.time_range()
+            if first is not None:
+                print(f"From {datetime.fromtimestamp(first):%Y-%m-%d %H:%M:%S} "
+                      f"to {datetime.fromtimestamp(last):%Y-%m-%d %H:%M:%S}")
+            for level, source, count in rows:
+                label = f"{level}:{source}" if level else "(other)"
+                print(f"{label:12s} {count:10d}")
+            matched = sum(row[2] for row in rows)
+        elif args.count:
+            matched = store.count(start, end, levels, sources, args.grep)
+            elapsed = time.perf_counter() - started
+            print(matched)
+        else:
+            records = store.query(start, end, levels, sources, args.grep, args.limit, args.newest)
+            elapsed = time.perf_counter() - started
+            for record in records:
+                print(format_record(record))
+            matched = len(records)
+    finally:
+        store.close()
+
+    print(f"{matched} records in {elapsed * 1000:.1f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,52 +8,84 @@ Monitor serial logger output from LoRa Gateway via RS485.
 This script connects to the RS485 output (UART3) of the LoRa Gateway
 to monitor real-time logging information.
 
+Output is written in batches every refresh interval and limited to a
+display rate; lines over the limit are summarised per source. With
+--record the complete raw stream is saved regardless of the limit, and
+with --store every parsed line goes to a SQLite database that
+log_query.py can search.
+
 Usage:
-    python logger_monitor.py [COM_PORT] [BAUDRATE]
+    python logger_monitor.py [COM_PORT] [BAUDRATE] [--max-rate N] [--record FILE] [--store DB]
     
 Example:
     python logger_monitor.py COM5 115200
+    python logger_monitor.py COM5 --max-rate 50 --record gateway.log
+    python logger_monitor.py COM5 --store gateway.db
 
 Author: Assistant
 Date: October 2025
 """
 
+import os
 import sys
 import serial
 import serial.tools.list_ports
 import time
 from datetime import datetime
 import argparse
-import re
+
+# Shared host protocol layer lives in utils/ at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.log_parser import LogParser
+from utils.log_renderer import DEFAULT_INTERVAL, DEFAULT_MAX_RATE, LogRenderer
+from utils.log_store import LogStore
+from utils.serial_reader import DEFAULT_TIMEOUT, SerialReader
 
 class LoggerMonitor:
     """Monitor for LoRa Gateway logger output."""
     
-    def __init__(self, port, baudrate=115200):
+    def __init__(self, port, baudrate=115200, max_rate=DEFAULT_MAX_RATE, refresh=DEFAULT_INTERVAL,
+                 record_path=None, store_path=None):
         self.port = port
         self.baudrate = baudrate
         self.serial_conn = None
+        self.reader = None
         self.running = False
+        self.record_path = record_path
+        self.record_file = None
+        self.store_path = store_path
+        self.store = None
         
-        # Log message pattern
-        self.log_pattern = re.compile(r'\[(\d+)\] (\w+):(\w+) (.+)')
+        # Splits whole read chunks into lines and formats them in one batch
+        self.parser = LogParser()
+        
+        # Reader thread queues lines; the main thread writes them every refresh
+        self.renderer = LogRenderer(self.parser, interval=refresh, max_rate=max_rate)
         
         # Statistics
-        self.message_count = 0
+        self.bytes_received = 0
         self.start_time = time.time()
         
+    @property
+    def message_count(self):
+        """Log lines received so far."""
+        return self.parser.lines
+    
     def connect(self):
         """Connect to serial port."""
         try:
             print(f"Connecting to {self.port} at {self.baudrate} baud...")
-            self.serial_conn = serial.Serial(
-                port=self.port,
+            # Also accepts socket://host:port to share a port through serial_bridge.py
+            self.serial_conn = serial.serial_for_url(
+                self.port,
                 baudrate=self.baudrate,
                 bytesize=serial.EIGHTBITS,
                 parity=serial.PARITY_NONE,
                 stopbits=serial.STOPBITS_ONE,
-                timeout=1.0
+                timeout=DEFAULT_TIMEOUT
             )
+            self.reader = SerialReader(self.serial_conn)
             print(f"✓ Connected to {self.port}")
             return True
         except Exception as e:
@@ -68,46 +100,11 @@ class LoggerMonitor:
     
     def parse_log_message(self, line):
         """Parse log message and return formatted output."""
-        match = self.log_pattern.match(line.strip())
-        if match:
-            timestamp_ms = int(match.group(1))
-            level = match.group(2)
-            source = match.group(3)
-            message = match.group(4)
-            
-            # Convert timestamp to seconds and format
-            timestamp_sec = timestamp_ms / 1000.0
-            hours = int(timestamp_sec // 3600)
-            minutes = int((timestamp_sec % 3600) // 60)
-            seconds = timestamp_sec % 60
-            
-            # Color coding for different levels
-            colors = {
-                'DBG': '\033[36m',  # Cyan
-                'INF': '\033[32m',  # Green
-                'WRN': '\033[33m',  # Yellow
-                'ERR': '\033[31m',  # Red
-                'CRT': '\033[91m',  # Bright Red
-            }
-            
-            source_colors = {
-                'SYS': '\033[94m',  # Blue
-                'U2': '\033[95m',   # Magenta
-                'LRX': '\033[92m',  # Bright Green
-                'LTX': '\033[93m',  # Bright Yellow
-                'CMD': '\033[96m',  # Bright Cyan
-                'CFG': '\033[97m',  # White
-            }
-            
-            reset = '\033[0m'
-            level_color = colors.get(level, '')
-            source_color = source_colors.get(source, '')
-            
-            formatted_time = f"{hours:02d}:{minutes:02d}:{seconds:06.3f}"
-            
-            return f"[{formatted_time}] {level_color}{level}{reset}:{source_color}{source}{reset} {message}"
-        
-        return line.strip()
+        return self.parser.format(line)
+    
+    def annotate_command(self, message):
+        """Append the command name to command and frame log messages."""
+        return self.parser.annotate_command(message)
     
     def monitor(self):
         """Monitor logger output."""
@@ -121,32 +118,57 @@ class LoggerMonitor:
         print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print("="*80 + "\n")
         
+        if self.record_path:
+            self.record_file = open(self.record_path, 'ab')
+            print(f"Recording raw log to {self.record_path}\n")
+        if self.store_path:
+            self.store = LogStore(self.store_path)
+            print(f"Storing parsed log in {self.store_path}\n")
+        
         self.running = True
         
         try:
-            while self.running:
-                if self.serial_conn.in_waiting > 0:
-                    try:
-                        line = self.serial_conn.readline().decode('utf-8', errors='ignore')
-                        if line.strip():
-                            formatted_line = self.parse_log_message(line)
-                            print(formatted_line)
-                            self.message_count += 1
-                    except UnicodeDecodeError:
-                        # Handle binary data or corrupted messages
-                        raw_data = self.serial_conn.readline()
-                        print(f"[RAW] {raw_data.hex().upper()}")
-                
-                time.sleep(0.01)  # Small delay to prevent high CPU usage
+            # A slow terminal only delays flush(); the reader thread keeps draining the port
+            self.reader.start(self.on_data, self.on_error)
+            while self.running and self.reader.running:
+                time.sleep(self.renderer.interval)
+                self.renderer.flush()
+                if self.store:
+                    self.store.commit_if_due()
                 
         except KeyboardInterrupt:
             print("\n\nStopping monitor...")
             self.running = False
             
         finally:
+            self.reader.stop()
+            tail = self.parser.splitter.flush()
+            if self.store:
+                self.store.add_lines(tail)
+                self.store.close()
+            self.renderer.add(tail)
+            self.renderer.flush(final=True)
+            if self.record_file:
+                self.record_file.close()
             self.disconnect()
             self.print_statistics()
     
+    def on_data(self, data):
+        """Handle a chunk from the reader thread."""
+        self.bytes_received += len(data)
+        # The recorder gets every byte, whatever the display suppresses
+        if self.record_file:
+            self.record_file.write(data)
+        lines = self.parser.splitter.feed(data)
+        if self.store:
+            self.store.add_lines(lines)
+        self.renderer.add(lines)
+    
+    def on_error(self, error):
+        """Stop monitoring when the port fails."""
+        print(f"\n✗ Serial error: {error}")
+        self.running = False
+    
     def print_statistics(self):
         """Print monitoring statistics."""
         duration = time.time() - self.start_time
@@ -155,8 +177,21 @@ class LoggerMonitor:
         print("="*50)
         print(f"Duration: {duration:.1f} seconds")
         print(f"Messages received: {self.message_count}")
+        print(f"Bytes received: {self.bytes_received}")
         if duration > 0:
-            print(f"Average rate: {self.message_count/duration:.1f} messages/second")
+            print(f"Average rate: {self.message_count/duration:.1f} messages/second, "
+                  f"{self.bytes_received/duration:.0f} bytes/second")
+        if self.store:
+            print(f"Stored: {self.store.records} records in {self.store_path}")
+        if self.renderer.suppressed:
+            print(f"Displayed: {self.renderer.shown}, suppressed: {self.renderer.suppressed} "
+                  f"(display limit {self.renderer.max_rate:g} lines/second)")
+        if self.parser.level_counts:
+            print("By level: " + ", ".join(f"{level} {count}" for level, count in self.parser.level_counts.most_common()))
+        if self.parser.command_counts:
+            print("Commands processed:")
+            for name, count in self.parser.command_counts.most_common():
+                print(f"  {name:32s} {count}")
         print("="*50)
 
 def list_serial_ports():
@@ -177,9 +212,15 @@ def main():
     parser = argparse.ArgumentParser(
         description="Monitor LoRa Gateway logger output via RS485"
     )
-    parser.add_argument('port', nargs='?', help='Serial port (e.g., COM5, /dev/ttyUSB0)')
+    parser.add_argument('port', nargs='?', help='Serial port (e.g., COM5, /dev/ttyUSB0, socket://localhost:7001)')
     parser.add_argument('baudrate', nargs='?', type=int, default=115200, help='Baudrate (default: 115200)')
     parser.add_argument('-l', '--list', action='store_true', help='List available serial ports')
+    parser.add_argument('--max-rate', type=float, default=DEFAULT_MAX_RATE,
+                        help=f'Lines per second displayed, 0 for no limit (default: {DEFAULT_MAX_RATE})')
+    parser.add_argument('--refresh', type=float, default=DEFAULT_INTERVAL * 1000,
+                        help=f'Terminal refresh interval in ms (default: {DEFAULT_INTERVAL * 1000:.0f})')
+    parser.add_argument('--record', metavar='FILE', help='Append the complete raw log stream to FILE')
+    parser.add_argument('--store', metavar='DB', help='Store parsed log lines in a SQLite database (see log_query.py)')
     
     args = parser.parse_args()
     
@@ -215,7 +256,8 @@ def main():
         return
     
     # Create and start monitor
-    monitor = LoggerMonitor(args.port, args.baudrate)
+    monitor = LoggerMonitor(args.port, args.baudrate, max_rate=args.max_rate, refresh=args.refresh / 1000,
+                            record_path=args.record, store_path=args.store)
     monitor.monitor()
 
 if __name__ == "__main__":
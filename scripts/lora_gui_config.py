@@ -10,89 +10,58 @@ Author: Assistant
 Date: October 2025
 """
 
+import argparse
+import os
+import sys
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 import serial.tools.list_ports
 import threading
 import time
 import queue
-import struct
-from typing import Dict, List, Optional, Tuple
-from crccheck.crc import Crc16Xmodem
+from concurrent.futures import Future
+from typing import Callable, List, Optional
 import json
 import logging
 from datetime import datetime
 
-# Protocol Constants
-START_MARK = 0x7E
-END_MARK = 0x7F
-MIN_FRAME_HEADER_SIZE = 9
+# Shared host protocol layer lives in utils/ at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Module Functions
-MODULE_FUNCTION_SERVER = 0x00
-MODULE_FUNCTION_VLAD = 0x05
-MODULE_FUNCTION_SNIFFER = 0x10
+from utils.capture import DIRECTION_RX, DIRECTION_TX, CaptureWriter
+from utils.config_apply import ConfigApplier, load_profile
+from utils.fleet import ACTION_APPLY, ACTION_QUERY, ACTION_VERIFY, FleetResult, FleetRunner
+from utils.line_buffer import LineBuffer
+from utils.log_config import setup_logging
+from utils.metrics import ProtocolMetrics
+from utils.parameter_cache import ParameterCache
+from utils.protocol import Frame, FrameBuilder, FrameDecoder
+from utils.command_registry import GATEWAY_PARAMETERS, KIND_SET, PARAMETERS, REGISTRY, CommandDispatcher, CommandSpec
+from utils.request_correlator import RequestCorrelator
+from utils.request_job import JobProgress, JobStep, RequestJob
+from utils.serial_reader import DEFAULT_TIMEOUT, SerialReader
+from utils.tracing import TRACER
 
-# Command Codes - Query Commands
-QUERY_MODULE_ID = 0x10
-QUERY_PARAMETER_LTEL = 0x11
-QUERY_PARAMETER_SIGMA = 0x12
-QUERY_UART1 = 0x15
-QUERY_PARAMETER_ADC = 0x16
-QUERY_TX_FREQ = 0x20
-QUERY_RX_FREQ = 0x21
-QUERY_UART_BAUDRATE = 0x22
-QUERY_BANDWIDTH = 0x23
-QUERY_SPREAD_FACTOR = 0x24
-QUERY_CODING_RATE = 0x25
-QUERY_PARAMETER_PdBm = 0x26
-
-# Command Codes - Set Commands
-SET_MODULE_ID = 0x90
-SET_TX_FREQ = 0xB0
-SET_RX_FREQ = 0xB1
-SET_UART_BAUDRATE = 0xB2
-SET_BANDWIDTH = 0xB3
-SET_SPREAD_FACTOR = 0xB4
-SET_CODING_RATE = 0xB5
-SET_ATT_LTEL = 0x20
-SET_POUT_MAX = 0x24
-SET_POUT_MIN = 0x23
-SET_VLAD_SERIAL_FISICA = 0x92
-
-# Special Commands
-ONE_DETECTION = 0x17
-MULTIPLE_DETECTION = 0x18
-
-class FrameBuilder:
-    """Frame builder for serial communication protocol."""
-    
-    def __init__(self):
-        self.logger = logging.getLogger(self.__class__.__name__)
-    
-    def _calculate_crc(self, data: bytes) -> bytes:
-        """Calculate CRC16 XMODEM checksum."""
-        return struct.pack("<H", Crc16Xmodem.calc(data))
-    
-    def build_frame(self, module_function: int, module_id: int, command_id: int, data: Optional[bytes] = None) -> bytes:
-        """Build generic frame with CRC."""
-        frame = bytearray([START_MARK, module_function, module_id, command_id, 0, len(data or [])])
-        frame.extend(data or b"")
-        frame += self._calculate_crc(frame[1:])
-        frame.append(END_MARK)
-        return bytes(frame)
 
 class SerialManager:
     """Manages serial communication with the LoRa Gateway."""
     
-    def __init__(self):
+    def __init__(self, max_outstanding: int = 1, timeout: Optional[float] = None, retries: int = 2):
         self.serial_port = None
         self.is_connected = False
         self.frame_builder = FrameBuilder()
+        self.frame_decoder = FrameDecoder()
+        self.metrics = ProtocolMetrics(self.frame_decoder)
+        self.correlator = RequestCorrelator(self.send_frame, max_outstanding, timeout, retries, metrics=self.metrics)
+        self.cache = ParameterCache()
         self.logger = logging.getLogger(self.__class__.__name__)
         self.response_queue = queue.Queue()
-        self.read_thread = None
-        self.stop_reading = False
+        self.on_wakeup: Optional[Callable[[], None]] = None
+        self._wakeup_pending = False
+        self._wakeup_lock = threading.Lock()
+        self.reader = None
+        self.capture: Optional[CaptureWriter] = None
+        self._rx_started: Optional[float] = None   # First byte of the frame being received (tracing)
     
     def get_available_ports(self) -> List[str]:
         """Get list of available serial ports."""
@@ -105,19 +74,25 @@ class SerialManager:
             if self.is_connected:
                 self.disconnect()
             
-            self.serial_port = serial.Serial(
-                port=port,
+            # Also accepts socket://host:port to share a port through serial_bridge.py
+            self.serial_port = serial.serial_for_url(
+                port,
                 baudrate=baudrate,
                 bytesize=serial.EIGHTBITS,
                 parity=serial.PARITY_NONE,
                 stopbits=serial.STOPBITS_ONE,
-                timeout=1.0
+                timeout=DEFAULT_TIMEOUT
             )
             
+            self.frame_decoder.reset()
+            # A different port may be a different gateway
+            self.cache.invalidate()
+            self.correlator.estimator.reset()
+            self.correlator.estimator.baudrate = baudrate
+            self.metrics.reset()
             self.is_connected = True
-            self.stop_reading = False
-            self.read_thread = threading.Thread(target=self._read_serial_data, daemon=True)
-            self.read_thread.start()
+            self.reader = SerialReader(self.serial_port)
+            self.reader.start(self._handle_serial_data, self._handle_read_error)
             
             self.logger.info(f"Connected to {port} at {baudrate} baud")
             return True
@@ -129,27 +104,55 @@ class SerialManager:
     def disconnect(self):
         """Disconnect from serial port."""
         self.is_connected = False
-        self.stop_reading = True
+        self.correlator.cancel_all("Serial port disconnected")
         
-        if self.read_thread and self.read_thread.is_alive():
-            self.read_thread.join(timeout=2.0)
+        if self.reader:
+            self.reader.stop()
+            self.reader = None
         
         if self.serial_port and self.serial_port.is_open:
             self.serial_port.close()
             self.logger.info("Serial port disconnected")
     
-    def _read_serial_data(self):
-        """Read data from serial port in background thread."""
-        while not self.stop_reading and self.is_connected:
-            try:
-                if self.serial_port and self.serial_port.in_waiting > 0:
-                    data = self.serial_port.read(self.serial_port.in_waiting)
-                    self.response_queue.put(('data', data))
-                time.sleep(0.01)
-            except Exception as e:
-                self.logger.error(f"Error reading serial data: {e}")
-                self.response_queue.put(('error', str(e)))
-                break
+    def _handle_serial_data(self, data: bytes):
+        """Decode bytes on the reader thread as soon as they arrive."""
+        capture = self.capture
+        if capture is not None:
+            capture.write(data, DIRECTION_RX)
+        self.metrics.record_rx(len(data))
+        self.post('data', data)
+        rx_at = TRACER.now() if TRACER.enabled else None
+        if not self.frame_decoder.pending:
+            self._rx_started = rx_at
+        # Resolve pending requests here rather than on the GUI thread
+        frames = self.frame_decoder.feed(data)
+        self.metrics.record_frames(frames)
+        for frame in frames:
+            # The kind of the request it answers tells e.g. a 0x20 TX freq reply from a VLAD 0x20 ack
+            kind = self.correlator.pending_kind(frame)
+            # Cache first, so code woken by the response future sees the new value
+            self.cache.on_frame(frame, kind)
+            self.correlator.on_frame(frame, self._rx_started)
+            self._rx_started = rx_at
+            self.post('frame', (frame, kind))
+    
+    def _handle_read_error(self, error: Exception):
+        """Report a reader failure to the GUI."""
+        self.post('error', str(error))
+    
+    def post(self, msg_type: str, data):
+        """Queue a message for the GUI and wake it unless a wakeup is already pending."""
+        self.response_queue.put((msg_type, data))
+        with self._wakeup_lock:
+            if self._wakeup_pending or self.on_wakeup is None:
+                return
+            self._wakeup_pending = True
+        self.on_wakeup()
+    
+    def wakeup_handled(self):
+        """Called by the consumer before draining, so later messages wake it again."""
+        with self._wakeup_lock:
+            self._wakeup_pending = False
     
     def send_frame(self, frame: bytes) -> bool:
         """Send frame to device."""
@@ -158,105 +161,172 @@ class SerialManager:
         
         try:
             self.serial_port.write(frame)
+            self.metrics.record_tx(len(frame))
+            capture = self.capture
+            if capture is not None:
+                capture.write(frame, DIRECTION_TX)
             self.logger.debug(f"Sent frame: {frame.hex().upper()}")
             return True
         except Exception as e:
             self.logger.error(f"Error sending frame: {e}")
             return False
     
-    def query_parameter(self, module_function: int, module_id: int, command: int) -> bool:
+    def start_capture(self, path: str):
+        """Record all received and sent bytes to a binary capture file."""
+        self.stop_capture()
+        self.capture = CaptureWriter(path)
+        self.logger.info(f"Capturing serial traffic to {path}")
+    
+    def stop_capture(self):
+        """Finish the current capture, writing its index."""
+        capture, self.capture = self.capture, None
+        if capture is not None:
+            capture.close()
+    
+    def request(self, module_function: int, module_id: int, command: int, data: Optional[bytes] = None,
+                timeout: Optional[float] = None, retries: Optional[int] = None) -> Optional[Future]:
+        """
+        Send a command and track its response.
+
+        Returns:
+            Future resolving to the response Frame, or None if not connected
+        """
+        if not self.is_connected:
+            return None
+        return self.correlator.submit(module_function, module_id, command, data, timeout, retries)
+    
+    def query_parameter(self, module_function: int, module_id: int, command: int) -> Optional[Future]:
         """Send query parameter command."""
-        frame = self.frame_builder.build_frame(module_function, module_id, command)
-        return self.send_frame(frame)
+        return self.request(module_function, module_id, command)
+    
+    def set_parameter(self, module_function: int, module_id: int, command: int, data: bytes) -> Optional[Future]:
+        """Send set parameter command; the gateway acknowledges with the same command code."""
+        spec = REGISTRY.lookup(module_function, command, KIND_SET)
+        retries = None
+        if spec is not None and spec.parameter is not None and \
+                not PARAMETERS[spec.parameter].get('set_acknowledged', True):
+            # Never repeat a SET without an ack: SET_UART_BAUDRATE resets the device each time
+            retries = 0
+        future = self.request(module_function, module_id, command, data, retries=retries)
+        if future is not None and spec is not None and spec.parameter is not None:
+            # The ack writes the new value through; without one the device state is unknown
+            def forget(fut: Future, device=(module_function, module_id), key=spec.parameter):
+                if fut.cancelled() or fut.exception() is not None:
+                    self.cache.invalidate(device, key)
+            future.add_done_callback(forget)
+        return future
     
-    def set_parameter(self, module_function: int, module_id: int, command: int, data: bytes) -> bool:
-        """Send set parameter command."""
-        frame = self.frame_builder.build_frame(module_function, module_id, command, data)
-        return self.send_frame(frame)
+    def query_parameters(self, module_function: int, module_id: int, commands: List[int]) -> List[Future]:
+        """Pipeline several queries; each is sent as soon as a request slot frees up."""
+        futures = []
+        for command in commands:
+            future = self.request(module_function, module_id, command)
+            if future is None:
+                break
+            futures.append(future)
+        return futures
 
 class ParameterConfig:
     """Configuration for device parameters."""
     
-    PARAMETERS = {
-        # Query Parameters
-        'module_id': {
-            'name': 'Module ID',
-            'query_cmd': QUERY_MODULE_ID,
-            'set_cmd': SET_MODULE_ID,
-            'data_type': 'uint8',
-            'range': (1, 255),
-            'description': 'Unique module identifier'
-        },
-        'tx_freq': {
-            'name': 'TX Frequency',
-            'query_cmd': QUERY_TX_FREQ,
-            'set_cmd': SET_TX_FREQ,
-            'data_type': 'uint32',
-            'range': (860000000, 930000000),
-            'description': 'Transmit frequency in Hz'
-        },
-        'rx_freq': {
-            'name': 'RX Frequency',
-            'query_cmd': QUERY_RX_FREQ,
-            'set_cmd': SET_RX_FREQ,
-            'data_type': 'uint32',
-            'range': (860000000, 930000000),
-            'description': 'Receive frequency in Hz'
-        },
-        'uart_baudrate': {
-            'name': 'UART Baudrate',
-            'query_cmd': QUERY_UART_BAUDRATE,
-            'set_cmd': SET_UART_BAUDRATE,
-            'data_type': 'uint32',
-            'options': [9600, 19200, 38400, 57600, 115200, 230400],
-            'description': 'UART communication speed'
-        },
-        'bandwidth': {
-            'name': 'Bandwidth',
-            'query_cmd': QUERY_BANDWIDTH,
-            'set_cmd': SET_BANDWIDTH,
-            'data_type': 'uint8',
-            'options': [0, 1, 2, 3, 4, 5, 6, 7, 8, 9],
-            'description': 'LoRa bandwidth setting'
-        },
-        'spread_factor': {
-            'name': 'Spread Factor',
-            'query_cmd': QUERY_SPREAD_FACTOR,
-            'set_cmd': SET_SPREAD_FACTOR,
-            'data_type': 'uint8',
-            'range': (6, 12),
-            'description': 'LoRa spreading factor'
-        },
-        'coding_rate': {
-            'name': 'Coding Rate',
-            'query_cmd': QUERY_CODING_RATE,
-            'set_cmd': SET_CODING_RATE,
-            'data_type': 'uint8',
-            'options': [1, 2, 3, 4],
-            'description': 'LoRa coding rate'
-        },
-        'output_power': {
-            'name': 'Output Power (dBm)',
-            'query_cmd': QUERY_PARAMETER_PdBm,
-            'set_cmd': None,  # No direct set command
-            'data_type': 'int8',
-            'range': (-20, 20),
-            'description': 'RF output power in dBm'
-        },
-        'ltel_attenuation': {
-            'name': 'LTEL Attenuation',
-            'query_cmd': QUERY_PARAMETER_LTEL,
-            'set_cmd': SET_ATT_LTEL,
-            'data_type': 'uint8',
-            'range': (0, 63),
-            'description': 'LTEL attenuation value'
-        }
-    }
+    PARAMETERS = PARAMETERS
+
+class BufferedTextView:
+    """
+    Text widget fed from a LineBuffer.
+    
+    Appends only schedule a refresh; at most one refresh runs per frame
+    interval and draws every line added since the previous one. The widget
+    is trimmed to the buffer size. While paused, lines keep being recorded
+    but nothing is drawn until the view is resumed.
+    """
+    
+    REFRESH_INTERVAL_MS = 50
+    
+    def __init__(self, text_widget: scrolledtext.ScrolledText, max_lines: int = 5000):
+        self.text_widget = text_widget
+        self.buffer = LineBuffer(max_lines)
+        self.paused = False
+        self.filter_text = ""
+        self._scheduled = False
+        self._lock = threading.Lock()
+    
+    def append(self, line: str):
+        """Record a line and schedule a refresh. Safe to call from any thread."""
+        self.buffer.append(line)
+        self.schedule()
+    
+    def schedule(self):
+        """Schedule one refresh unless one is pending or the view is paused."""
+        with self._lock:
+            if self._scheduled or self.paused:
+                return
+            self._scheduled = True
+        self.text_widget.after(self.REFRESH_INTERVAL_MS, self.refresh)
+    
+    def set_paused(self, paused: bool):
+        """Stop or resume drawing; resuming redraws everything recorded meanwhile."""
+        self.paused = paused
+        if not paused:
+            self.redraw()
+    
+    def set_filter(self, text: str):
+        """Only show lines containing text (case-insensitive); empty shows all."""
+        self.filter_text = text.lower()
+        if not self.paused:
+            self.redraw()
+    
+    def matches(self, line: str) -> bool:
+        return self.filter_text in line.lower()
+    
+    def refresh(self):
+        """Draw pending lines in a single widget update."""
+        with self._lock:
+            self._scheduled = False
+        if self.paused:
+            return
+        
+        lines, reset = self.buffer.take_pending()
+        if self.filter_text:
+            lines = [line for line in lines if self.matches(line)]
+        if reset:
+            self.text_widget.delete(1.0, tk.END)
+        if lines:
+            self._insert(lines)
+    
+    def redraw(self):
+        """Replace the widget contents with the (filtered) buffer."""
+        lines = self.buffer.snapshot(self.matches if self.filter_text else None, mark_rendered=True)
+        self.text_widget.delete(1.0, tk.END)
+        self._insert(lines)
+    
+    def clear(self):
+        self.buffer.clear()
+        self.text_widget.delete(1.0, tk.END)
+    
+    def _insert(self, lines: List[str]):
+        # Only follow the output if the user has not scrolled up
+        at_bottom = self.text_widget.yview()[1] >= 0.999
+        self.text_widget.insert(tk.END, '\n'.join(lines) + '\n')
+        
+        excess = int(self.text_widget.index('end-1c').split('.')[0]) - 1 - self.buffer.max_lines
+        if excess > 0:
+            self.text_widget.delete(1.0, f"{excess + 1}.0")
+        if at_bottom:
+            self.text_widget.see(tk.END)
 
 class LoRaGatewayGUI:
     """Main GUI application for LoRa Gateway configuration."""
     
-    def __init__(self):
+    WAKEUP_EVENT = '<<SerialData>>'
+    PUMP_BUDGET = 0.02   # Seconds of queue processing per Tk tick
+    STATS_INTERVAL_MS = 1000
+    LOG_MAX_BYTES = 10 * 1024 * 1024
+    LOG_ROTATE_INTERVAL = 24 * 3600
+    
+    def __init__(self, log_dir: Optional[str] = None, json_log: bool = False):
+        self.log_dir = log_dir
+        self.json_log = json_log
         self.root = tk.Tk()
         self.root.title("LoRa Gateway Configuration Tool")
         self.root.geometry("1200x800")
@@ -267,19 +337,35 @@ class LoRaGatewayGUI:
         # Initialize components
         self.serial_manager = SerialManager()
         self.parameter_config = ParameterConfig()
-        self.parameter_values = {}
+        self.job: Optional[RequestJob] = None
+        self._pump_continuation = None
+        self.fleet_runner: Optional[FleetRunner] = None
+        
+        # Route decoded frames to parameter widgets
+        self.dispatcher = CommandDispatcher()
+        for param_key in self.parameter_config.PARAMETERS:
+            self.dispatcher.on(param_key, self.update_parameter_value)
         
         # GUI Components
         self.setup_gui()
         
-        # Start response processing
+        # Process responses when the reader thread posts them, not on a timer
+        self.root.bind(self.WAKEUP_EVENT, lambda event: self.process_responses())
+        self.serial_manager.on_wakeup = self.wake_gui
         self.process_responses()
+        self.refresh_statistics()
     
     def setup_logging(self):
         """Setup logging configuration."""
-        logging.basicConfig(
-            level=logging.DEBUG,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        # Console and file output happen on a listener thread, never on the serial threads
+        setup_logging(
+            log_level=logging.DEBUG,
+            log_to_file=self.log_dir is not None,
+            log_dir=self.log_dir or "logs",
+            asynchronous=True,
+            max_bytes=self.LOG_MAX_BYTES,
+            rotate_interval=self.LOG_ROTATE_INTERVAL,
+            json_lines=self.json_log
         )
         self.logger = logging.getLogger(self.__class__.__name__)
     
@@ -299,6 +385,9 @@ class LoRaGatewayGUI:
         # Parameters tab
         self.setup_parameters_tab(notebook)
         
+        # Fleet tab
+        self.setup_fleet_tab(notebook)
+        
         # Advanced tab
         self.setup_advanced_tab(notebook)
         
@@ -317,7 +406,8 @@ class LoRaGatewayGUI:
         # Port selection
         ttk.Label(settings_frame, text="Port:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=5)
         self.port_var = tk.StringVar()
-        self.port_combo = ttk.Combobox(settings_frame, textvariable=self.port_var, state="readonly")
+        # Editable so a shared port can be entered as socket://localhost:7000
+        self.port_combo = ttk.Combobox(settings_frame, textvariable=self.port_var)
         self.port_combo.grid(row=0, column=1, sticky=tk.EW, padx=5, pady=5)
         
         # Refresh ports button
@@ -385,11 +475,24 @@ class LoRaGatewayGUI:
         
         ttk.Button(controls_frame, text="Query All Parameters", 
                   command=self.query_all_parameters).pack(side=tk.LEFT, padx=5)
+        ttk.Button(controls_frame, text="Apply Configuration", 
+                  command=self.apply_configuration).pack(side=tk.LEFT, padx=5)
         ttk.Button(controls_frame, text="Save Configuration", 
                   command=self.save_configuration).pack(side=tk.LEFT, padx=5)
         ttk.Button(controls_frame, text="Load Configuration", 
                   command=self.load_configuration).pack(side=tk.LEFT, padx=5)
         
+        # Background job progress
+        job_frame = ttk.Frame(param_frame)
+        job_frame.pack(fill=tk.X, padx=5, pady=(0, 5))
+        
+        self.job_progress = ttk.Progressbar(job_frame, mode='determinate', length=300)
+        self.job_progress.pack(side=tk.LEFT, padx=5)
+        self.job_cancel_btn = ttk.Button(job_frame, text="Cancel", command=self.cancel_job, state=tk.DISABLED)
+        self.job_cancel_btn.pack(side=tk.LEFT, padx=5)
+        self.job_label = ttk.Label(job_frame, text="")
+        self.job_label.pack(side=tk.LEFT, padx=5)
+        
         # Create parameter entries
         self.parameter_entries = {}
         self.setup_parameter_entries(scrollable_frame)
@@ -454,6 +557,52 @@ class LoRaGatewayGUI:
             
             row += 1
     
+    def setup_fleet_tab(self, notebook):
+        """Setup multi-gateway fleet tab."""
+        fleet_frame = ttk.Frame(notebook)
+        notebook.add(fleet_frame, text="Fleet")
+        
+        # Port selection
+        ports_frame = ttk.LabelFrame(fleet_frame, text="Gateways (one per port)")
+        ports_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        self.fleet_ports_list = tk.Listbox(ports_frame, selectmode=tk.EXTENDED, height=6, exportselection=False)
+        self.fleet_ports_list.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5, pady=5)
+        
+        ports_buttons = ttk.Frame(ports_frame)
+        ports_buttons.pack(side=tk.LEFT, padx=5, pady=5)
+        ttk.Button(ports_buttons, text="Refresh", command=self.refresh_fleet_ports).pack(fill=tk.X, pady=2)
+        ttk.Button(ports_buttons, text="Select All",
+                  command=lambda: self.fleet_ports_list.select_set(0, tk.END)).pack(fill=tk.X, pady=2)
+        
+        # Actions
+        controls_frame = ttk.Frame(fleet_frame)
+        controls_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        ttk.Button(controls_frame, text="Query",
+                  command=lambda: self.run_fleet(ACTION_QUERY)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(controls_frame, text="Apply Profile...",
+                  command=lambda: self.run_fleet(ACTION_APPLY)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(controls_frame, text="Verify Profile...",
+                  command=lambda: self.run_fleet(ACTION_VERIFY)).pack(side=tk.LEFT, padx=5)
+        self.fleet_cancel_btn = ttk.Button(controls_frame, text="Cancel", state=tk.DISABLED,
+                                           command=lambda: self.fleet_runner and self.fleet_runner.cancel())
+        self.fleet_cancel_btn.pack(side=tk.LEFT, padx=5)
+        self.fleet_label = ttk.Label(controls_frame, text="")
+        self.fleet_label.pack(side=tk.LEFT, padx=10)
+        
+        # Results table, one row per port
+        columns = ('status', 'written', 'unchanged', 'failed', 'mismatched', 'time', 'details')
+        self.fleet_table = ttk.Treeview(fleet_frame, columns=columns, show='tree headings')
+        self.fleet_table.heading('#0', text='Port')
+        self.fleet_table.column('#0', width=140)
+        for column, width in zip(columns, (60, 60, 70, 60, 80, 60, 500)):
+            self.fleet_table.heading(column, text=column.capitalize())
+            self.fleet_table.column(column, width=width, anchor=tk.W if column == 'details' else tk.CENTER)
+        self.fleet_table.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        self.refresh_fleet_ports()
+    
     def setup_advanced_tab(self, notebook):
         """Setup advanced configuration tab."""
         adv_frame = ttk.Frame(notebook)
@@ -483,11 +632,41 @@ class LoRaGatewayGUI:
         ttk.Button(custom_frame, text="Send Custom Command", 
                   command=self.send_custom_command).grid(row=2, column=0, columnspan=4, pady=10)
         
+        # Link statistics
+        stats_frame = ttk.LabelFrame(adv_frame, text="Link Statistics")
+        stats_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        stats_controls = ttk.Frame(stats_frame)
+        stats_controls.pack(fill=tk.X, padx=5, pady=2)
+        ttk.Button(stats_controls, text="Reset", command=self.reset_statistics).pack(side=tk.LEFT, padx=5)
+        ttk.Button(stats_controls, text="Export JSON", command=self.export_statistics).pack(side=tk.LEFT, padx=5)
+        self.stats_label = ttk.Label(stats_controls, text="")
+        self.stats_label.pack(side=tk.LEFT, padx=10)
+        
+        columns = ('responses', 'p50', 'p95', 'p99', 'max', 'retries', 'timeouts')
+        self.stats_table = ttk.Treeview(stats_frame, columns=columns, show='tree headings', height=5)
+        self.stats_table.heading('#0', text='Command')
+        self.stats_table.column('#0', width=260)
+        for column in columns:
+            heading = f"{column} (ms)" if column.startswith('p') or column == 'max' else column.capitalize()
+            self.stats_table.heading(column, text=heading)
+            self.stats_table.column(column, width=90, anchor=tk.CENTER)
+        self.stats_table.pack(fill=tk.X, padx=5, pady=5)
+        
         # Raw data viewer
         raw_frame = ttk.LabelFrame(adv_frame, text="Raw Data")
         raw_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
+        capture_controls = ttk.Frame(raw_frame)
+        capture_controls.pack(fill=tk.X, padx=5, pady=2)
+        self.capture_btn = ttk.Button(capture_controls, text="Start Capture", command=self.toggle_capture)
+        self.capture_btn.pack(side=tk.LEFT, padx=5)
+        self.capture_label = ttk.Label(capture_controls, text="")
+        self.capture_label.pack(side=tk.LEFT, padx=5)
+        
         self.raw_text = scrolledtext.ScrolledText(raw_frame, height=15, font=('Courier', 9))
+        self.raw_view = BufferedTextView(self.raw_text)
+        self.setup_view_controls(capture_controls, self.raw_view)
         self.raw_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
     
     def setup_log_tab(self, notebook):
@@ -504,26 +683,36 @@ class LoRaGatewayGUI:
         
         # Log text area
         self.log_text = scrolledtext.ScrolledText(log_frame, height=25, font=('Courier', 9))
+        self.log_view = BufferedTextView(self.log_text)
+        self.setup_view_controls(controls_frame, self.log_view)
         self.log_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         # Redirect logging to GUI
         self.setup_log_handler()
     
+    def setup_view_controls(self, parent, view: BufferedTextView):
+        """Add pause and filter controls for a buffered text view."""
+        filter_var = tk.StringVar()
+        filter_var.trace_add('write', lambda *args: view.set_filter(filter_var.get()))
+        ttk.Entry(parent, textvariable=filter_var, width=20).pack(side=tk.RIGHT, padx=5)
+        ttk.Label(parent, text="Filter:").pack(side=tk.RIGHT)
+        
+        paused_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(parent, text="Pause", variable=paused_var,
+                        command=lambda: view.set_paused(paused_var.get())).pack(side=tk.RIGHT, padx=5)
+    
     def setup_log_handler(self):
         """Setup custom log handler for GUI."""
         class GUILogHandler(logging.Handler):
-            def __init__(self, text_widget):
+            def __init__(self, view):
                 super().__init__()
-                self.text_widget = text_widget
+                self.view = view
             
             def emit(self, record):
-                msg = self.format(record)
-                def append():
-                    self.text_widget.insert(tk.END, msg + '\n')
-                    self.text_widget.see(tk.END)
-                self.text_widget.after(0, append)
+                # Recorded immediately, drawn on the view's next refresh
+                self.view.append(self.format(record))
         
-        handler = GUILogHandler(self.log_text)
+        handler = GUILogHandler(self.log_view)
         handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
         logging.getLogger().addHandler(handler)
     
@@ -555,6 +744,105 @@ class LoRaGatewayGUI:
             self.connect_btn.config(text="Connect")
             self.status_label.config(text="Disconnected", foreground="red")
     
+    def refresh_fleet_ports(self):
+        """Refresh the fleet port list."""
+        self.fleet_ports_list.delete(0, tk.END)
+        for port in self.serial_manager.get_available_ports():
+            self.fleet_ports_list.insert(tk.END, port)
+    
+    def run_fleet(self, action: str):
+        """Run a query, apply or verify on every selected port in the background."""
+        if self.fleet_runner is not None:
+            messagebox.showerror("Error", "A fleet operation is still running")
+            return
+        
+        ports = [self.fleet_ports_list.get(i) for i in self.fleet_ports_list.curselection()]
+        if self.serial_manager.is_connected and self.port_var.get() in ports:
+            # Our own connection holds that port open
+            ports.remove(self.port_var.get())
+            self.log_message(f"Fleet: skipping {self.port_var.get()}, connected in this window")
+        if not ports:
+            messagebox.showerror("Error", "Select one or more ports")
+            return
+        
+        parameters = None
+        module_func = int(self.module_func_var.get())
+        module_id = int(self.module_id_var.get())
+        if action != ACTION_QUERY:
+            from tkinter import filedialog
+            filename = filedialog.askopenfilename(
+                title="Configuration Profile",
+                filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+            )
+            if not filename:
+                return
+            try:
+                profile = load_profile(filename)
+                parameters = profile['parameters']
+                module_func = int(profile.get('module_function', module_func))
+                module_id = int(profile.get('module_id', module_id))
+                # Reject bad values before any port is opened
+                ConfigApplier(lambda *args: None).targets(parameters)
+            except (OSError, ValueError) as e:
+                messagebox.showerror("Error", f"Invalid profile: {e}")
+                return
+        
+        self.fleet_table.delete(*self.fleet_table.get_children())
+        for port in ports:
+            self.fleet_table.insert('', tk.END, iid=port, text=port, values=('...',))
+        
+        self.fleet_runner = FleetRunner(ports, int(self.baudrate_var.get()), module_func, module_id,
+                                        on_result=lambda result: self.serial_manager.post('fleet', result))
+        self.fleet_cancel_btn.config(state=tk.NORMAL)
+        self.fleet_label.config(text=f"{action}: 0/{len(ports)} ports")
+        self.log_message(f"Fleet {action} on {len(ports)} ports")
+        
+        runner = self.fleet_runner
+        def run():
+            try:
+                results = runner.run(action, parameters)
+            except Exception as e:
+                self.serial_manager.post('error', f"Fleet {action} failed: {e}")
+                results = []
+            self.serial_manager.post('fleet_done', (action, results))
+        threading.Thread(target=run, daemon=True).start()
+    
+    def update_fleet_row(self, result: FleetResult):
+        """Fill in the table row of a port that finished."""
+        if not self.fleet_table.exists(result.port):
+            return
+        report = result.report
+        status = 'ok' if result.ok else 'FAIL'
+        if report is None:
+            values = (status, '', '', '', '', f"{result.elapsed:.2f}s", result.summary())
+        else:
+            details = [f"{key}={actual} (want {expected})" for key, (actual, expected) in report.mismatched.items()]
+            details += list(report.failed.values())
+            if result.error is not None:
+                details.append(result.error)
+            values = (status, len(report.written), report.writes_avoided, len(report.failed),
+                      len(report.mismatched), f"{result.elapsed:.2f}s", '; '.join(details))
+        self.fleet_table.item(result.port, values=values)
+        
+        if result.values and report is None:
+            # Query: one child row per parameter
+            for key, value in result.values.items():
+                name = self.parameter_config.PARAMETERS[key]['name']
+                self.fleet_table.insert(result.port, tk.END, text=name,
+                                        values=('', '', '', '', '', '', '-' if value is None else value))
+        
+        done = sum(1 for port in self.fleet_table.get_children() if self.fleet_table.set(port, 'status') != '...')
+        self.fleet_label.config(text=f"{done}/{len(self.fleet_table.get_children())} ports")
+    
+    def finish_fleet(self, action: str, results: List[FleetResult]):
+        """Summarize a finished fleet operation."""
+        self.fleet_runner = None
+        self.fleet_cancel_btn.config(state=tk.DISABLED)
+        ok = sum(1 for result in results if result.ok)
+        summary = f"Fleet {action}: {ok}/{len(results)} ports ok"
+        self.fleet_label.config(text=summary)
+        self.log_message(summary, "INFO" if ok == len(results) else "ERROR")
+    
     def query_parameter(self, param_key: str):
         """Query specific parameter."""
         if not self.serial_manager.is_connected:
@@ -565,8 +853,9 @@ class LoRaGatewayGUI:
         module_func = int(self.module_func_var.get())
         module_id = int(self.module_id_var.get())
         
-        success = self.serial_manager.query_parameter(module_func, module_id, param_info['query_cmd'])
-        if success:
+        future = self.serial_manager.query_parameter(module_func, module_id, param_info['query_cmd'])
+        if future is not None:
+            self.watch_request(future, f"Query {param_info['name']}")
             self.log_message(f"Queried {param_info['name']}")
         else:
             self.log_message(f"Failed to query {param_info['name']}", "ERROR")
@@ -589,66 +878,167 @@ class LoRaGatewayGUI:
         
         try:
             # Convert value to appropriate data type
-            data = self.encode_parameter_value(param_info, new_value_str)
+            data = self.encode_parameter_value(param_key, new_value_str)
             
             module_func = int(self.module_func_var.get())
             module_id = int(self.module_id_var.get())
             
-            success = self.serial_manager.set_parameter(module_func, module_id, param_info['set_cmd'], data)
-            if success:
+            future = self.serial_manager.set_parameter(module_func, module_id, param_info['set_cmd'], data)
+            if future is not None:
+                self.watch_request(future, f"Set {param_info['name']}")
                 self.log_message(f"Set {param_info['name']} to {new_value_str}")
-                # Query the parameter again to confirm
-                self.query_parameter(param_key)
+                if ConfigApplier.applicable(param_key):
+                    # Query the parameter again to confirm
+                    self.query_parameter(param_key)
             else:
                 self.log_message(f"Failed to set {param_info['name']}", "ERROR")
                 
         except ValueError as e:
             messagebox.showerror("Error", f"Invalid value: {e}")
     
-    def encode_parameter_value(self, param_info: dict, value_str: str) -> bytes:
+    def encode_parameter_value(self, param_key: str, value_str: str) -> bytes:
         """Encode parameter value according to data type."""
-        data_type = param_info['data_type']
-        
-        try:
-            if data_type == 'uint8':
-                value = int(value_str)
-                if 'range' in param_info:
-                    min_val, max_val = param_info['range']
-                    if not (min_val <= value <= max_val):
-                        raise ValueError(f"Value must be between {min_val} and {max_val}")
-                return struct.pack('B', value)
-            
-            elif data_type == 'int8':
-                value = int(value_str)
-                if 'range' in param_info:
-                    min_val, max_val = param_info['range']
-                    if not (min_val <= value <= max_val):
-                        raise ValueError(f"Value must be between {min_val} and {max_val}")
-                return struct.pack('b', value)
-            
-            elif data_type == 'uint32':
-                value = int(value_str)
-                if 'range' in param_info:
-                    min_val, max_val = param_info['range']
-                    if not (min_val <= value <= max_val):
-                        raise ValueError(f"Value must be between {min_val} and {max_val}")
-                return struct.pack('<I', value)
-            
-            else:
-                raise ValueError(f"Unsupported data type: {data_type}")
-                
-        except ValueError:
-            raise ValueError(f"Cannot convert '{value_str}' to {data_type}")
+        codec = REGISTRY.codecs[param_key]
+        return codec.encode(codec.parse(value_str))
     
     def query_all_parameters(self):
-        """Query all available parameters."""
+        """Query all available parameters as a background job, skipping fresh cached values."""
+        module_func = int(self.module_func_var.get())
+        module_id = int(self.module_id_var.get())
+        device = (module_func, module_id)
+        
+        steps = []
+        for param_key in GATEWAY_PARAMETERS:
+            param_info = self.parameter_config.PARAMETERS[param_key]
+            value = self.serial_manager.cache.get(device, param_key)
+            if value is not None:
+                self.parameter_entries[param_key]['current_var'].set(str(value))
+                continue
+            steps.append(JobStep(f"Query {param_info['name']}", module_func, module_id, param_info['query_cmd']))
+        
+        cached = len(GATEWAY_PARAMETERS) - len(steps)
+        if cached:
+            self.log_message(f"{cached} parameters shown from cache")
+        if steps:
+            self.start_job("Query all parameters", steps)
+    
+    def apply_configuration(self):
+        """Write the entered new values that differ from the device, in the background."""
         if not self.serial_manager.is_connected:
             messagebox.showerror("Error", "Not connected to device")
             return
+        if self.job is not None and not self.job.done:
+            messagebox.showerror("Error", f"'{self.job.name}' is still running")
+            return
         
-        for param_key in self.parameter_config.PARAMETERS:
-            self.query_parameter(param_key)
-            time.sleep(0.1)  # Small delay between commands
+        parameters = {}
+        for param_key, entry in self.parameter_entries.items():
+            param_info = self.parameter_config.PARAMETERS[param_key]
+            new_value_str = entry['new_var'].get()
+            if not new_value_str or param_info['set_cmd'] is None:
+                continue
+            try:
+                ConfigApplier.normalize(param_key, new_value_str)
+            except ValueError as e:
+                messagebox.showerror("Error", f"Invalid value for {param_info['name']}: {e}")
+                return
+            parameters[param_key] = new_value_str
+        
+        if not parameters:
+            messagebox.showinfo("Apply Configuration", "No new values entered")
+            return
+        
+        applier = ConfigApplier(self.serial_manager.request, self.serial_manager.cache,
+                                int(self.module_func_var.get()), int(self.module_id_var.get()),
+                                lambda progress: self.serial_manager.post('job', progress))
+        self.job = applier
+        self.job_progress.config(value=0)
+        self.job_cancel_btn.config(state=tk.NORMAL)
+        self.job_label.config(text=f"{applier.name}: reading current values")
+        self.log_message(f"{applier.name}: {len(parameters)} parameters")
+        
+        def run():
+            try:
+                self.serial_manager.post('apply', applier.apply(parameters))
+            except Exception as e:
+                self.serial_manager.post('error', f"{applier.name} failed: {e}")
+                self.serial_manager.post('apply', None)
+        threading.Thread(target=run, daemon=True).start()
+    
+    def show_apply_report(self, report):
+        """Show the outcome of a configuration apply."""
+        self.job_cancel_btn.config(state=tk.DISABLED)
+        if report is None:
+            self.job_label.config(text="Apply configuration failed")
+            return
+        
+        self.job_progress.config(maximum=1, value=1)
+        self.job_label.config(text=report.summary())
+        self.log_message(f"Apply configuration: {report.summary()}", "INFO" if report.ok else "ERROR")
+        for key, error in report.failed.items():
+            self.log_message(f"  {error}", "ERROR")
+        for key, (actual, expected) in report.mismatched.items():
+            self.log_message(f"  {self.parameter_config.PARAMETERS[key]['name']} reads back {actual}, "
+                             f"expected {expected}", "ERROR")
+        for key in report.plan.skipped:
+            self.log_message(f"  {self.parameter_config.PARAMETERS[key]['name']} not written: "
+                             f"cannot be verified or resets the device", "WARNING")
+    
+    def start_job(self, name: str, steps: List[JobStep]):
+        """Run a batch of requests in the background with progress and cancel."""
+        if not self.serial_manager.is_connected:
+            messagebox.showerror("Error", "Not connected to device")
+            return
+        if self.job is not None and not self.job.done:
+            messagebox.showerror("Error", f"'{self.job.name}' is still running")
+            return
+        
+        self.job_progress.config(maximum=len(steps), value=0)
+        self.job_cancel_btn.config(state=tk.NORMAL)
+        self.job_label.config(text=f"{name}: 0/{len(steps)}")
+        self.log_message(f"{name}: {len(steps)} requests")
+        
+        # Progress arrives on the serial/timeout threads: hand over via the queue
+        self.job = RequestJob(name, steps, self.serial_manager.request,
+                              lambda progress: self.serial_manager.post('job', progress))
+        self.job.start()
+    
+    def cancel_job(self):
+        """Cancel the running background job."""
+        if self.job is not None and not self.job.done:
+            self.job.cancel()
+    
+    def update_job_progress(self, progress: JobProgress):
+        """Show the latest progress of a background job."""
+        job = progress.job
+        if job is not self.job:
+            # A batch of a configuration apply: drawn while running, its report ends it
+            if job is not getattr(self.job, 'current_job', None) or progress.finished:
+                return
+        elif job.done and not progress.finished:
+            return
+        done = progress.completed + progress.failed
+        self.job_progress.config(maximum=progress.total, value=done)
+        
+        if not progress.finished:
+            self.job_label.config(text=f"{job.name}: {done}/{progress.total}")
+            return
+        
+        self.job_cancel_btn.config(state=tk.DISABLED)
+        state = "cancelled" if job.cancelled else "done"
+        summary = f"{job.name} {state}: {progress.completed}/{progress.total} ok"
+        if progress.failed:
+            summary += f", {progress.failed} failed"
+        self.job_label.config(text=summary)
+        self.log_message(summary, "ERROR" if progress.failed and not job.cancelled else "INFO")
+    
+    def watch_request(self, future: Future, description: str):
+        """Report a request that fails or times out in the log."""
+        def done(fut: Future):
+            # Runs on the serial/timeout thread: hand over to the GUI via the queue
+            if not fut.cancelled() and fut.exception() is not None:
+                self.serial_manager.post('error', f"{description}: {fut.exception()}")
+        future.add_done_callback(done)
     
     def send_custom_command(self):
         """Send custom command."""
@@ -736,21 +1126,65 @@ class LoRaGatewayGUI:
             messagebox.showerror("Error", f"Failed to load configuration: {e}")
     
     def process_responses(self):
-        """Process responses from serial port."""
+        """
+        Process responses from serial port.
+        
+        Runs when the serial thread posts a message. Processing stops after
+        PUMP_BUDGET seconds and continues on the next tick, so a burst of
+        frames cannot starve redraws and user input.
+        """
+        if self._pump_continuation is not None:
+            # Woken before the continuation ran: keep only one pending
+            self.root.after_cancel(self._pump_continuation)
+            self._pump_continuation = None
+        self.serial_manager.wakeup_handled()
+        deadline = time.perf_counter() + self.PUMP_BUDGET
+        job_progress = None
         try:
             while True:
                 msg_type, data = self.serial_manager.response_queue.get_nowait()
                 
                 if msg_type == 'data':
                     self.handle_serial_data(data)
+                elif msg_type == 'frame':
+                    frame, kind = data
+                    self.parse_response(frame, kind)
+                    if TRACER.enabled:
+                        TRACER.dispatched((frame.module_function, frame.module_id, frame.command))
                 elif msg_type == 'error':
                     self.log_message(f"Serial error: {data}", "ERROR")
+                elif msg_type == 'fleet':
+                    self.update_fleet_row(data)
+                elif msg_type == 'fleet_done':
+                    self.finish_fleet(*data)
+                elif msg_type == 'apply':
+                    self.show_apply_report(data)
+                elif msg_type == 'job':
+                    if data.error is not None and not data.job.cancelled:
+                        self.log_message(data.error, "ERROR")
+                    # Only the latest progress of this batch is drawn; a step update
+                    # from another thread can arrive after the final one
+                    if job_progress is None or not job_progress.finished:
+                        job_progress = data
+                
+                if time.perf_counter() >= deadline:
+                    # Budget spent: let Tk handle pending events, then carry on
+                    self._pump_continuation = self.root.after(1, self.process_responses)
+                    break
                     
         except queue.Empty:
             pass
         
-        # Schedule next check
-        self.root.after(100, self.process_responses)
+        if job_progress is not None:
+            self.update_job_progress(job_progress)
+    
+    def wake_gui(self):
+        """Wake the Tk loop from the serial thread to process new messages."""
+        try:
+            self.root.event_generate(self.WAKEUP_EVENT, when='tail')
+        except (tk.TclError, RuntimeError):
+            # Window already destroyed
+            pass
     
     def handle_serial_data(self, data: bytes):
         """Handle incoming serial data."""
@@ -759,58 +1193,22 @@ class LoRaGatewayGUI:
         
         # Add to raw data viewer
         timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-        self.raw_text.insert(tk.END, f"[{timestamp}] RX: {hex_data}\n")
-        self.raw_text.see(tk.END)
-        
-        # Try to parse response
-        self.parse_response(data)
+        self.raw_view.append(f"[{timestamp}] RX: {hex_data}")
     
-    def parse_response(self, data: bytes):
+    def parse_response(self, frame: Frame, kind: Optional[str] = None):
         """Parse device response and update parameter values."""
-        if len(data) < 8:  # Minimum frame size
-            return
-        
         try:
-            # Basic frame parsing
-            if data[0] == START_MARK and data[-1] == END_MARK:
-                module_func = data[1]
-                module_id = data[2]
-                command = data[3]
-                data_len = data[5]
-                payload = data[6:6+data_len]
-                
-                # Find matching parameter
-                for param_key, param_info in self.parameter_config.PARAMETERS.items():
-                    if param_info['query_cmd'] == command:
-                        value = self.decode_parameter_value(param_info, payload)
-                        if value is not None:
-                            self.parameter_entries[param_key]['current_var'].set(str(value))
-                            self.log_message(f"Updated {param_info['name']}: {value}")
-                        break
-                        
+            self.dispatcher.dispatch(frame, kind)
         except Exception as e:
             self.log_message(f"Error parsing response: {e}", "ERROR")
     
-    def decode_parameter_value(self, param_info: dict, payload: bytes):
-        """Decode parameter value from payload."""
-        if not payload:
-            return None
-        
-        try:
-            data_type = param_info['data_type']
-            
-            if data_type == 'uint8':
-                return struct.unpack('B', payload[:1])[0]
-            elif data_type == 'int8':
-                return struct.unpack('b', payload[:1])[0]
-            elif data_type == 'uint32':
-                if len(payload) >= 4:
-                    return struct.unpack('<I', payload[:4])[0]
-            
-        except struct.error:
-            pass
-        
-        return None
+    def update_parameter_value(self, frame: Frame, spec: CommandSpec, value: Optional[int]):
+        """Show a decoded query response or SET acknowledgement."""
+        if value is None:
+            return
+        param_info = self.parameter_config.PARAMETERS[spec.parameter]
+        self.parameter_entries[spec.parameter]['current_var'].set(str(value))
+        self.log_message(f"Updated {param_info['name']}: {value}")
     
     def log_message(self, message: str, level: str = "INFO"):
         """Log message to GUI and logger."""
@@ -822,17 +1220,75 @@ class LoRaGatewayGUI:
         else:
             self.logger.info(message)
     
+    def toggle_capture(self):
+        """Start or stop recording serial traffic to a binary capture."""
+        if self.serial_manager.capture is None:
+            filename = f"lora_capture_{datetime.now().strftime('%Y%m%d_%H%M%S')}.lgcap"
+            try:
+                self.serial_manager.start_capture(filename)
+            except OSError as e:
+                messagebox.showerror("Error", f"Failed to start capture: {e}")
+                return
+            self.capture_btn.config(text="Stop Capture")
+            self.capture_label.config(text=filename)
+            self.log_message(f"Capturing serial traffic to {filename}")
+        else:
+            capture = self.serial_manager.capture
+            self.serial_manager.stop_capture()
+            self.capture_btn.config(text="Start Capture")
+            self.capture_label.config(text="")
+            self.log_message(f"Capture saved: {capture.path} ({capture.records} records)")
+    
+    def refresh_statistics(self):
+        """Show the link counters and per-command latencies; reschedules itself."""
+        snapshot = self.serial_manager.metrics.snapshot()
+        counters = snapshot['counters']
+        self.stats_label.config(text=(
+            f"TX {counters['frames_tx']} frames / {counters['bytes_tx']} B   "
+            f"RX {counters['frames_rx']} frames / {counters['bytes_rx']} B   "
+            f"CRC errors {counters['crc_errors']}   Resyncs {counters['resyncs']}   "
+            f"Retries {counters['retries']}   Timeouts {counters['timeouts']}"))
+        
+        for name, stats in snapshot['commands'].items():
+            values = (stats['responses'], stats['p50_ms'], stats['p95_ms'], stats['p99_ms'], stats['max_ms'],
+                      stats['retries'], stats['timeouts'])
+            values = tuple('-' if value is None else value for value in values)
+            if self.stats_table.exists(name):
+                self.stats_table.item(name, values=values)
+            else:
+                self.stats_table.insert('', tk.END, iid=name, text=name, values=values)
+        for name in self.stats_table.get_children():
+            if name not in snapshot['commands']:
+                self.stats_table.delete(name)
+        
+        self.root.after(self.STATS_INTERVAL_MS, self.refresh_statistics)
+    
+    def reset_statistics(self):
+        """Zero the link counters and latency histograms."""
+        self.serial_manager.metrics.reset()
+        self.stats_table.delete(*self.stats_table.get_children())
+    
+    def export_statistics(self):
+        """Write the link statistics snapshot to a JSON file."""
+        try:
+            filename = f"lora_stats_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            self.serial_manager.metrics.dump(filename)
+            self.log_message(f"Statistics saved to {filename}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save statistics: {e}")
+    
     def clear_log(self):
         """Clear log text area."""
-        self.log_text.delete(1.0, tk.END)
-        self.raw_text.delete(1.0, tk.END)
+        self.log_view.clear()
+        self.raw_view.clear()
     
     def save_log(self):
         """Save log to file."""
         try:
             filename = f"lora_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+            # Everything recorded, including lines hidden by pause or filter
             with open(filename, 'w') as f:
-                f.write(self.log_text.get(1.0, tk.END))
+                f.writelines(line + '\n' for line in self.log_view.buffer.snapshot())
             
             messagebox.showinfo("Success", f"Log saved to {filename}")
             
@@ -849,13 +1305,28 @@ class LoRaGatewayGUI:
     
     def on_closing(self):
         """Handle application closing."""
+        self.cancel_job()
+        if self.fleet_runner is not None:
+            self.fleet_runner.cancel()
+        self.serial_manager.on_wakeup = None
         if self.serial_manager.is_connected:
             self.serial_manager.disconnect()
+        self.serial_manager.stop_capture()
         self.root.destroy()
 
 def main():
     """Main application entry point."""
-    app = LoRaGatewayGUI()
+    parser = argparse.ArgumentParser(description="LoRa Gateway Configuration Tool")
+    parser.add_argument('--trace', metavar='FILE',
+                        help='Write a Chrome trace (Perfetto) of every command to FILE on exit')
+    parser.add_argument('--log-dir', metavar='DIR',
+                        help='Also log to DIR/lora_gateway.log (rotated daily or at 10 MB, gzipped)')
+    parser.add_argument('--json-log', action='store_true', help='Write the log file as JSON lines')
+    args = parser.parse_args()
+    if args.trace:
+        TRACER.enable(args.trace)
+    
+    app = LoRaGatewayGUI(log_dir=args.log_dir, json_log=args.json_log)
     app.run()
 
 if __name__ == "__main__":
@@ -9,6 +9,15 @@ Author: Assistant
 Date: October 2025
 """
 
+import os
+import sys
+from typing import Optional
+
+# Shared host protocol layer lives in utils/ at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.command_registry import REGISTRY
+
 class RadioCommandCodes:
     """Command codes for radio communication protocol."""
     
@@ -171,53 +180,15 @@ class FrameConstants:
     DATA_LEN_INDEX = 5
     DATA_START_INDEX = 6
 
-def get_command_name(command_code: int) -> str:
-    """Get human-readable name for command code."""
-    command_names = {
-        # Query commands
-        0x10: "QUERY_MODULE_ID",
-        0x11: "QUERY_PARAMETER_LTEL",
-        0x12: "QUERY_PARAMETER_SIGMA",
-        0x14: "QUERY_MASTER_STATUS",
-        0x15: "QUERY_PARAMETER_STR",
-        0x16: "QUERY_PARAMETER_ADC",
-        0x17: "ONE_DETECTION",
-        0x18: "MULTIPLE_DETECTION",
-        0x20: "QUERY_TX_FREQ",
-        0x21: "QUERY_RX_FREQ",
-        0x22: "QUERY_UART_BAUDRATE",
-        0x23: "QUERY_BANDWIDTH",
-        0x24: "QUERY_SPREAD_FACTOR",
-        0x25: "QUERY_CODING_RATE",
-        0x26: "QUERY_PARAMETER_PdBm",
-        0x27: "QUERY_OPERATION_MODE",
-        
-        # Set commands
-        0x90: "SET_MODULE_ID",
-        0x92: "SET_VLAD_SERIAL_FISICA",
-        0xB0: "SET_TX_FREQ",
-        0xB1: "SET_RX_FREQ",
-        0xB2: "SET_UART_BAUDRATE",
-        0xB3: "SET_BANDWIDTH",
-        0xB4: "SET_SPREAD_FACTOR",
-        0xB5: "SET_CODING_RATE",
-        0xB6: "SET_OUT",
-        0xB7: "SET_AOUT_0_10V",
-        0xB8: "SET_AOUT_4_20mA",
-        0xB9: "SET_AOUT_0_20mA",
-        0xBA: "SET_DOUT1",
-        
-        # Special commands
-        0x20: "SET_ATT_LTEL",
-        0x23: "SET_POUT_MIN",
-        0x24: "SET_POUT_MAX",
-        0x40: "SET_OPERATION_MODE",
-        0xC0: "SET_VLAD_MODE",
-        0xC2: "SET_PARAMETERS",
-        0xC3: "SET_PARAMETER_FREQBASE",
-    }
-    
-    return command_names.get(command_code, f"UNKNOWN_0x{command_code:02X}")
+def get_command_name(command_code: int, module_function: Optional[int] = None, kind: Optional[str] = None) -> str:
+    """
+    Get human-readable name for command code.
+    
+    Command codes 0x20, 0x23 and 0x24 are LoRa queries on the gateway and
+    LTEL settings on VLAD modules, so pass module_function and the request
+    kind ('query' or 'set') to resolve them.
+    """
+    return REGISTRY.command_name(command_code, module_function, kind)
 
 def get_bandwidth_name(bw_value: int) -> str:
     """Get human-readable name for bandwidth value."""
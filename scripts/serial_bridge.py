@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Gateway Serial Bridge
+=====================
+
+Own the gateway's serial port and share it with several local tools over
+TCP, so the GUI, a fleet or bus poller and a recorder can run against
+the same device at once.
+
+Tools connect with ``socket://HOST:PORT`` as their port name. Responses
+go to the tool that sent the request; unsolicited frames go to every
+tool. With ``--log-port`` the text log UART is shared too, for
+``logger_monitor.py``.
+
+Usage:
+    python serial_bridge.py PORT [-b BAUD] [--tcp-port 7000] [--log-port PORT] [--capture FILE]
+
+Example:
+    python serial_bridge.py /dev/ttyUSB0 --log-port /dev/ttyUSB1
+    python lora_gui_config.py                     # connect to socket://localhost:7000
+    python logger_monitor.py socket://localhost:7001
+
+Author: Assistant
+Date: October 2025
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+# Shared host protocol layer lives in utils/ at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.bridge import DEFAULT_LOG_TCP_PORT, DEFAULT_MAX_TIMEOUT, DEFAULT_TCP_PORT, SerialBridge
+
+
+async def run(bridge: SerialBridge, status_interval: float):
+    async with bridge:
+        while True:
+            try:
+                await asyncio.wait_for(bridge.serve_forever(), status_interval)
+                return
+            except asyncio.TimeoutError:
+                dropped = sum(client.frames_dropped for client in bridge.clients)
+                print(f"{len(bridge.clients)} clients, {bridge.requests} requests, {bridge.responses} answered, "
+                      f"{bridge.timeouts} unanswered, {bridge.unsolicited} unsolicited, {dropped} dropped",
+                      flush=True)
+
+
+def main():
+    """Main application entry point."""
+    parser = argparse.ArgumentParser(description="Share the gateway serial port with several tools over TCP")
+    parser.add_argument('port', help='Gateway protocol serial port')
+    parser.add_argument('-b', '--baudrate', type=int, default=115200, help='Baudrate (default: 115200)')
+    parser.add_argument('--host', default='127.0.0.1', help='Listen address (default: 127.0.0.1)')
+    parser.add_argument('--tcp-port', type=int, default=DEFAULT_TCP_PORT,
+                        help=f'TCP port for protocol clients (default: {DEFAULT_TCP_PORT})')
+    parser.add_argument('--log-port', help='Also share this text log serial port')
+    parser.add_argument('--log-baudrate', type=int, default=115200, help='Log port baudrate (default: 115200)')
+    parser.add_argument('--log-tcp-port', type=int, default=DEFAULT_LOG_TCP_PORT,
+                        help=f'TCP port for log clients (default: {DEFAULT_LOG_TCP_PORT})')
+    parser.add_argument('--max-pending', type=int, default=16,
+                        help='Requests per client queued in the bridge before it stops reading the client')
+    parser.add_argument('--client-queue', type=int, default=1000,
+                        help='Frames queued per client before the oldest is dropped')
+    parser.add_argument('--max-timeout', type=float, default=DEFAULT_MAX_TIMEOUT,
+                        help=f'Longest wait for a response before the next request (default: {DEFAULT_MAX_TIMEOUT})')
+    parser.add_argument('--capture', help='Record all protocol port traffic to this capture file')
+    parser.add_argument('--status', type=float, default=30.0, help='Seconds between status lines (default: 30)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    bridge = SerialBridge(args.port, args.baudrate, args.host, args.tcp_port, args.log_port, args.log_baudrate,
+                          args.log_tcp_port, args.client_queue, args.max_pending, args.max_timeout, args.capture)
+    try:
+        asyncio.run(run(bridge, args.status))
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"Error: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
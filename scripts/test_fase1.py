@@ -12,12 +12,23 @@ Uso:
 import serial
 import time
 import argparse
+import os
 import sys
 from typing import Tuple
 
+# Shared host protocol layer lives in utils/ at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.command_registry import REGISTRY
+from utils.crc16 import crc16_modbus
+from utils.timeouts import DEFAULT_GRANULARITY, TimeoutEstimator, wire_time
+
 # Configuración
 BAUDRATE = 115200
-TIMEOUT = 2
+TIMEOUT = 2  # Límite superior de espera de respuesta
+
+# Espera de respuesta según baudrate y RTT medido, en vez de un retardo fijo
+ESTIMATOR = TimeoutEstimator(BAUDRATE, max_timeout=TIMEOUT)
 
 # Command IDs (según CommandMessage.hpp)
 CMD_SET_UART_MODE = 0x60
@@ -43,15 +54,7 @@ class Colors:
 
 def calculate_crc16(data: bytes) -> int:
     """Calcula CRC-16/MODBUS"""
-    crc = 0xFFFF
-    for byte in data:
-        crc ^= byte
-        for _ in range(8):
-            if crc & 0x0001:
-                crc = (crc >> 1) ^ 0xA001
-            else:
-                crc >>= 1
-    return crc
+    return crc16_modbus(data)
 
 def build_frame(cmd_id: int, data: bytes = b'') -> bytes:
     """Construye un frame de comando completo con CRC"""
@@ -60,9 +63,30 @@ def build_frame(cmd_id: int, data: bytes = b'') -> bytes:
     frame += bytes([crc & 0xFF, (crc >> 8) & 0xFF])
     return frame
 
+def read_response(ser: serial.Serial, deadline: float) -> Tuple[bytes, float]:
+    """
+    Lee hasta el deadline o hasta que la línea quede en silencio tras el
+    último byte. Devuelve la respuesta y el instante del último byte.
+    """
+    response = bytearray()
+    last_rx = 0.0
+    # Silencio de ~4 caracteres = fin de trama (mínimo: latencia del adaptador USB)
+    idle_gap = max(wire_time(4, ser.baudrate), DEFAULT_GRANULARITY)
+    while True:
+        limit = last_rx + idle_gap if response else deadline
+        remaining = limit - time.monotonic()
+        if remaining <= 0:
+            return bytes(response), last_rx
+        ser.timeout = remaining
+        chunk = ser.read(ser.in_waiting or 1)
+        if chunk:
+            response += chunk
+            last_rx = time.monotonic()
+
 def send_command(ser: serial.Serial, cmd_id: int, data: bytes = b'') -> Tuple[bool, bytes]:
     """Envía un comando y espera respuesta"""
     frame = build_frame(cmd_id, data)
+    key = (0, 0, cmd_id)
     
     print(f"  {Colors.BLUE}→ Enviando:{Colors.RESET} {frame.hex().upper()}")
     
@@ -72,12 +96,15 @@ def send_command(ser: serial.Serial, cmd_id: int, data: bytes = b'') -> Tuple[bo
     # Enviar comando
     ser.write(frame)
     ser.flush()
+    sent_at = time.monotonic()
     
-    # Esperar respuesta
-    time.sleep(0.2)
+    # Esperar respuesta (se asume que el dispositivo responde con una trama del mismo largo)
+    ESTIMATOR.baudrate = ser.baudrate
+    deadline = sent_at + ESTIMATOR.timeout(key, len(frame), response_len=len(frame))
+    response, received_at = read_response(ser, deadline)
     
-    if ser.in_waiting > 0:
-        response = ser.read(ser.in_waiting)
+    if response:
+        ESTIMATOR.observe(key, received_at - sent_at, len(frame), len(response))
         print(f"  {Colors.BLUE}← Respuesta:{Colors.RESET} {response.hex().upper()}")
         return True, response
     else:
@@ -205,18 +232,22 @@ def test_memory_map(ser: serial.Serial) -> bool:
     print(f"{Colors.BOLD}Test 4: Mapa de Memoria Sin Conflictos{Colors.RESET}")
     print(f"{Colors.BOLD}{'='*60}{Colors.RESET}\n")
     
+    # Codecs del registro de comandos (validan rango y empaquetan el valor)
+    sf_codec = REGISTRY.codecs['spread_factor']
+    bw_codec = REGISTRY.codecs['bandwidth']
+    
     configs = [
-        ("Spreading Factor", CMD_SET_SF, CMD_QUERY_SF, 10, 0x0A),
-        ("Bandwidth", CMD_SET_BW, CMD_QUERY_BW, 7, 0x07),
-        ("UART Mode", CMD_SET_UART_MODE, CMD_QUERY_UART_MODE, 1, 0x01),
-        ("Radio Mode", CMD_SET_RADIO_MODE, CMD_QUERY_RADIO_MODE, 0, 0x00),
+        ("Spreading Factor", CMD_SET_SF, CMD_QUERY_SF, sf_codec.encode(10), 0x0A),
+        ("Bandwidth", CMD_SET_BW, CMD_QUERY_BW, bw_codec.encode(7), 0x07),
+        ("UART Mode", CMD_SET_UART_MODE, CMD_QUERY_UART_MODE, bytes([1]), 0x01),
+        ("Radio Mode", CMD_SET_RADIO_MODE, CMD_QUERY_RADIO_MODE, bytes([0]), 0x00),
     ]
     
     # Configurar todos los parámetros
     print(f"{Colors.YELLOW}1. Configurando todos los parámetros...{Colors.RESET}\n")
-    for name, set_cmd, _, value, _ in configs:
-        print(f"  → Configurando {name} = {value}")
-        success, _ = send_command(ser, set_cmd, bytes([value]))
+    for name, set_cmd, _, data, _ in configs:
+        print(f"  → Configurando {name} = {data[0]}")
+        success, _ = send_command(ser, set_cmd, data)
         if not success:
             print(f"{Colors.RED}✗ FALLO configurando {name}{Colors.RESET}")
             return False
@@ -236,7 +267,7 @@ def test_memory_map(ser: serial.Serial) -> bool:
     print(f"\n{Colors.YELLOW}3. Verificando persistencia de TODOS los parámetros...{Colors.RESET}\n")
     all_ok = True
     
-    for name, _, query_cmd, expected, expected_hex in configs:
+    for name, _, query_cmd, _, expected_hex in configs:
         print(f"  → Verificando {name}...")
         success, response = send_command(ser, query_cmd)
         
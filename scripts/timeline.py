@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Correlated Timeline
+===================
+
+Merge firmware log lines, host frame captures and GUI actions into one
+timeline on the host clock.
+
+Firmware ticks are mapped to host time per boot by utils/clock_align.py:
+reboots are found from tick resets and the start-up line, and each
+boot's drift is fitted against the log reception times and, with
+--capture, against the UART2 frames the firmware logged on reception.
+
+Usage:
+    python timeline.py --logs DB [--capture FILE ...] [--gui-log FILE ...]
+                       [--from T] [--to T] [--baudrate BAUD] [--fit]
+
+Example:
+    python timeline.py --logs gateway.db --capture lora_capture_20251016_101500.lgcap \\
+                       --gui-log logs/lora_gateway.log --from "2025-10-16 10:15" --to "2025-10-16 10:20"
+    python timeline.py --logs gateway.db --fit
+
+Author: Assistant
+Date: October 2025
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+
+# Shared host protocol layer lives in utils/ at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.capture import CaptureReader
+from utils.clock_align import (ClockAligner, capture_frames, frame_events, host_log_events, log_events,
+                               merge_timelines)
+from utils.log_store import LogStore, parse_time
+
+
+def format_time(host_time):
+    return datetime.fromtimestamp(host_time).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+
+
+def print_fit(aligner):
+    """Print the tick-to-host mapping of every boot."""
+    print(f"{'Boot':>4s}  {'Boot time (tick 0)':23s}  {'Last tick':>12s}  {'Samples':>8s}  "
+          f"{'Drift':>10s}  {'Max residual':>12s}")
+    for segment in aligner.segments:
+        if segment.first_tick is None:
+            continue
+        residual = max(segment.residuals(), default=0.0)
+        print(f"{segment.boot:4d}  {format_time(segment.boot_time):23s}  {segment.last_tick:12d}  "
+              f"{segment.samples:8d}  {segment.drift_ppm:+8.1f}ppm  {residual * 1000:10.1f}ms")
+    print(f"{aligner.reboots} reboots, {aligner.wraps} tick wraps, {aligner.frame_matches} frame matches")
+
+
+def main():
+    """Main application entry point."""
+    parser = argparse.ArgumentParser(description="Merge firmware log, captures and GUI log into one timeline")
+    parser.add_argument('--logs', metavar='DB', help='Log database (logger_monitor.py --store)')
+    parser.add_argument('--capture', metavar='FILE', action='append', default=[], help='Binary serial capture')
+    parser.add_argument('--gui-log', metavar='FILE', action='append', default=[],
+                        help='GUI log file (text or JSON lines)')
+    parser.add_argument('--from', dest='start', type=parse_time, help='Earliest host time shown')
+    parser.add_argument('--to', dest='end', type=parse_time, help='Latest host time shown')
+    parser.add_argument('--baudrate', type=int, default=115200, help='UART2 baudrate of the captures (default: 115200)')
+    parser.add_argument('--log-baudrate', type=int, default=115200, help='Log UART baudrate (default: 115200)')
+    parser.add_argument('--fit', action='store_true', help='Only print the clock fit per boot')
+    args = parser.parse_args()
+
+    if not (args.logs or args.capture or args.gui_log):
+        parser.error("nothing to merge: give --logs, --capture or --gui-log")
+
+    streams = []
+    readers = [CaptureReader(path) for path in args.capture]
+    try:
+        frames = {}
+        for reader in readers:
+            for key, times in capture_frames(reader, args.baudrate).items():
+                frames.setdefault(key, []).extend(times)
+        for times in frames.values():
+            times.sort()
+
+        if args.logs:
+            store = LogStore(args.logs, readonly=True)
+            try:
+                # Drift is fitted over the whole database; the window only limits the output
+                records = store.query()
+            finally:
+                store.close()
+            aligner = ClockAligner(log_baudrate=args.log_baudrate)
+            host_times = aligner.align(records, frames)
+            if args.fit:
+                print_fit(aligner)
+                return 0
+            streams.append(log_events(records, host_times, aligner.boots))
+        elif args.fit:
+            parser.error("--fit needs --logs")
+
+        streams.extend(frame_events(reader) for reader in readers)
+        streams.extend(host_log_events(path) for path in args.gui_log)
+
+        for event in merge_timelines(*streams):
+            if args.start is not None and event.host_time < args.start:
+                continue
+            if args.end is not None and event.host_time >= args.end:
+                break
+            print(f"{format_time(event.host_time)}  {event.origin:6s}  {event.text}")
+    finally:
+        for reader in readers:
+            reader.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
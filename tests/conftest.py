@@ -0,0 +1,26 @@
+"""
+Shared pytest setup for the host tooling tests.
+
+The tests drive the host layer against ``GatewaySimulator`` on pty pairs,
+so they only run on Linux/macOS.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Shared host protocol layer lives in utils/ at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if os.name != 'posix':
+    collect_ignore_glob = ['test_*.py']
+
+from utils.simulator import GatewaySimulator  # noqa: E402
+
+
+@pytest.fixture
+def simulator():
+    """A simulated gateway answering module function 0, id 0 without LoRa blocking."""
+    with GatewaySimulator(block_duration=0.0, seed=1) as sim:
+        yield sim
@@ -0,0 +1,167 @@
+"""Tests for utils/async_transport.py against the pty gateway simulator."""
+
+import asyncio
+
+import pytest
+
+from utils.async_transport import AsyncGateway
+from utils.simulator import DEFAULT_SETTINGS, SNIFFER_IO_DATA, TRIGGER_SNIFFER_SIMULATION, GatewaySimulator
+
+# Fixed per-attempt timeout: the simulator answers within milliseconds
+TIMEOUT = 0.5
+
+
+def run(coro, timeout=10.0):
+    return asyncio.run(asyncio.wait_for(coro, timeout))
+
+
+def test_query_parameters(simulator):
+    async def main():
+        async with AsyncGateway(simulator.port, timeout=TIMEOUT) as gateway:
+            return [await gateway.query(key) for key in ('tx_freq', 'rx_freq', 'bandwidth', 'spread_factor',
+                                                         'coding_rate')]
+
+    assert run(main()) == [DEFAULT_SETTINGS['downlink_frequency'], DEFAULT_SETTINGS['uplink_frequency'],
+                           DEFAULT_SETTINGS['bandwidth'], DEFAULT_SETTINGS['spread_factor'],
+                           DEFAULT_SETTINGS['coding_rate']]
+
+
+def test_query_on_vlad_module_function():
+    # 0x20/0x23/0x24 are VLAD SET commands too: replies to queries must still decode as LoRa settings
+    async def main(port):
+        async with AsyncGateway(port, module_function=0x05, timeout=TIMEOUT) as gateway:
+            values = [await gateway.query(key) for key in ('tx_freq', 'bandwidth', 'spread_factor')]
+            return values, gateway.cache.values((0x05, 0x00))
+
+    with GatewaySimulator(module_function=0x05, block_duration=0.0) as sim:
+        values, cached = run(main(sim.port))
+    assert values == [DEFAULT_SETTINGS['downlink_frequency'], DEFAULT_SETTINGS['bandwidth'],
+                      DEFAULT_SETTINGS['spread_factor']]
+    assert cached == {'tx_freq': values[0], 'bandwidth': values[1], 'spread_factor': values[2]}
+
+
+def test_set_is_acknowledged_and_cached(simulator):
+    async def main():
+        async with AsyncGateway(simulator.port, timeout=TIMEOUT) as gateway:
+            ack = await gateway.set('spread_factor', 9)
+            cached = gateway.cache.get((0x00, 0x00), 'spread_factor')
+            return ack, cached, await gateway.query('spread_factor')
+
+    assert run(main()) == (9, 9, 9)
+    assert simulator.eeprom.values['spread_factor'] == 9
+
+
+def test_set_frequency_round_trip(simulator):
+    async def main():
+        async with AsyncGateway(simulator.port, timeout=TIMEOUT) as gateway:
+            return await gateway.set('tx_freq', 150125000)
+
+    assert run(main()) == 150125000
+
+
+def test_set_rejects_out_of_range_value(simulator):
+    async def main():
+        async with AsyncGateway(simulator.port, timeout=TIMEOUT) as gateway:
+            await gateway.set('spread_factor', 13)
+
+    with pytest.raises(ValueError):
+        run(main())
+    assert simulator.frames_received == 0
+
+
+def test_timeout_after_retries():
+    async def main(port):
+        async with AsyncGateway(port, timeout=0.05, retries=2) as gateway:
+            with pytest.raises(TimeoutError):
+                await gateway.query('spread_factor')
+            return gateway.retransmits, gateway.timeouts
+
+    with GatewaySimulator(loss_rate=1.0, block_duration=0.0) as sim:
+        assert run(main(sim.port)) == (2, 1)
+        assert sim.frames_received == 3
+        assert sim.responses_dropped == 3
+
+
+def test_retry_recovers_lost_response():
+    async def main(port):
+        async with AsyncGateway(port, timeout=0.1, retries=2) as gateway:
+            value = await gateway.query('spread_factor')
+            return value, gateway.retransmits, gateway.timeouts
+
+    # Seed 1 drops the first response and delivers the second
+    with GatewaySimulator(loss_rate=0.5, block_duration=0.0, seed=1) as sim:
+        assert run(main(sim.port)) == (DEFAULT_SETTINGS['spread_factor'], 1, 0)
+        assert sim.frames_received == 2
+
+
+def test_unsolicited_frames():
+    async def main(port):
+        async with AsyncGateway(port, timeout=TIMEOUT) as gateway:
+            await gateway.request(TRIGGER_SNIFFER_SIMULATION, bytes([1]))
+            frames = []
+            async for frame in gateway.unsolicited():
+                frames.append(frame)
+                if len(frames) == 2:
+                    break
+            return frames, gateway.cache.values((0x00, 0x00))
+
+    with GatewaySimulator(block_duration=0.0, simulation_interval=0.05, seed=1) as sim:
+        frames, cached = run(main(sim.port))
+    assert [frame.command for frame in frames] == [SNIFFER_IO_DATA, SNIFFER_IO_DATA]
+    assert all(len(frame.payload) == 33 for frame in frames)
+    # SNIFFER_IO_DATA shares its code with QUERY_BANDWIDTH but answers no request
+    assert cached == {}
+
+
+def test_unsolicited_ends_when_port_closes(simulator):
+    async def main():
+        gateway = AsyncGateway(simulator.port, timeout=TIMEOUT)
+        await gateway.open()
+        received = []
+
+        async def consume():
+            async for frame in gateway.unsolicited():
+                received.append(frame)
+
+        consumer = asyncio.ensure_future(consume())
+        await asyncio.sleep(0.05)
+        await gateway.close()
+        await consumer
+        return received
+
+    assert run(main()) == []
+
+
+def test_query_cached_answers_fresh_values_locally(simulator):
+    async def main():
+        async with AsyncGateway(simulator.port, timeout=TIMEOUT) as gateway:
+            first = await gateway.query_cached('coding_rate')
+            sent = simulator.frames_received
+            second = await gateway.query_cached('coding_rate')
+            return first, second, sent, gateway.cache.hits
+
+    first, second, sent, hits = run(main())
+    assert first == second == DEFAULT_SETTINGS['coding_rate']
+    assert sent == 1
+    assert simulator.frames_received == 1
+    assert hits == 1
+
+
+def test_query_cached_revalidates_stale_values(simulator):
+    async def main():
+        async with AsyncGateway(simulator.port, timeout=TIMEOUT) as gateway:
+            gateway.cache.ttls['spread_factor'] = 0.0
+            await gateway.query_cached('spread_factor')
+            # Changed behind the cache's back: the stale value is served while it is refreshed
+            simulator.eeprom.values['spread_factor'] = 11
+            stale = await gateway.query_cached('spread_factor', stale_ok=True)
+            for _ in range(100):
+                if gateway.cache.peek((0x00, 0x00), 'spread_factor').value == 11:
+                    break
+                await asyncio.sleep(0.01)
+            refreshed = gateway.cache.peek((0x00, 0x00), 'spread_factor').value
+            fetched = await gateway.query_cached('spread_factor')
+            return stale, refreshed, fetched, gateway.cache.revalidations
+
+    assert run(main()) == (DEFAULT_SETTINGS['spread_factor'], 11, 11, 1)
+    assert simulator.frames_received == 3
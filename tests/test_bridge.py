@@ -0,0 +1,197 @@
+"""Tests for utils/bridge.py against the pty gateway simulator."""
+
+import asyncio
+import socket
+
+from utils.bridge import MAX_LOG_LINE, BridgeClient, SerialBridge
+from utils.protocol import FrameBuilder, FrameDecoder
+from utils.simulator import (QUERY_SPREAD_FACTOR, QUERY_TX_FREQ, SNIFFER_IO_DATA, TRIGGER_SNIFFER_SIMULATION,
+                             GatewaySimulator)
+
+BUILDER = FrameBuilder()
+
+
+def run(coro, timeout=10.0):
+    return asyncio.run(asyncio.wait_for(coro, timeout))
+
+
+class Client:
+    """Raw TCP client of the bridge, speaking frames."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.decoder = FrameDecoder()
+        self.frames = []
+
+    @classmethod
+    async def connect(cls, bridge: SerialBridge) -> 'Client':
+        connected = len(bridge.clients)
+        port = bridge._servers[0].sockets[0].getsockname()[1]
+        client = cls(*await asyncio.open_connection('127.0.0.1', port))
+        while len(bridge.clients) == connected:
+            await asyncio.sleep(0.01)
+        return client
+
+    def send(self, command: int, data: bytes = None):
+        self.writer.write(BUILDER.build_frame(0x00, 0x00, command, data))
+
+    async def receive(self, count: int) -> list:
+        """Read until ``count`` frames arrived in total."""
+        while len(self.frames) < count:
+            data = await self.reader.read(4096)
+            if not data:
+                break
+            self.frames.extend(self.decoder.feed(data))
+        return self.frames
+
+    async def idle(self, duration: float = 0.2) -> list:
+        """Collect whatever else arrives within ``duration``."""
+        try:
+            await asyncio.wait_for(self.receive(len(self.frames) + 1), duration)
+        except asyncio.TimeoutError:
+            pass
+        return self.frames
+
+    def close(self):
+        self.writer.close()
+
+
+def commands(frames) -> list:
+    return [frame.command for frame in frames]
+
+
+def test_responses_go_to_the_requesting_client():
+    async def main(port):
+        async with SerialBridge(port, tcp_port=0) as bridge:
+            first = await Client.connect(bridge)
+            second = await Client.connect(bridge)
+            first.send(QUERY_TX_FREQ)
+            second.send(QUERY_SPREAD_FACTOR)
+            await first.receive(1)
+            await second.receive(1)
+            await first.idle()
+            await second.idle()
+            first.close()
+            second.close()
+            return first.frames, second.frames, bridge.requests, bridge.unsolicited
+
+    with GatewaySimulator(block_duration=0.0, response_delay=0.05) as sim:
+        first, second, requests, unsolicited = run(main(sim.port))
+    assert commands(first) == [QUERY_TX_FREQ]
+    assert commands(second) == [QUERY_SPREAD_FACTOR]
+    assert (requests, unsolicited) == (2, 0)
+
+
+def test_unsolicited_frames_go_to_every_client():
+    async def main(port):
+        async with SerialBridge(port, tcp_port=0) as bridge:
+            first = await Client.connect(bridge)
+            second = await Client.connect(bridge)
+            first.send(TRIGGER_SNIFFER_SIMULATION, bytes([1]))
+            # The trigger's ack, then two sniffer IO frames
+            await first.receive(3)
+            await second.receive(2)
+            first.close()
+            second.close()
+            return first.frames[:3], second.frames[:2]
+
+    with GatewaySimulator(block_duration=0.0, simulation_interval=0.05, seed=1) as sim:
+        first, second = run(main(sim.port))
+    assert commands(first) == [TRIGGER_SNIFFER_SIMULATION, SNIFFER_IO_DATA, SNIFFER_IO_DATA]
+    assert commands(second) == [SNIFFER_IO_DATA, SNIFFER_IO_DATA]
+    assert [frame.raw for frame in second] == [frame.raw for frame in first[1:]]
+
+
+def test_slow_client_drops_oldest_frames_without_stalling_others():
+    async def main(sim):
+        async with SerialBridge(sim.port, tcp_port=0, client_queue=20) as bridge:
+            fast = await Client.connect(bridge)
+            fast_state = next(iter(bridge.clients))
+            # Never reads, with small socket buffers so its send queue backs up quickly
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1024)
+            sock.connect(bridge._servers[0].sockets[0].getsockname())
+            while len(bridge.clients) < 2:
+                await asyncio.sleep(0.01)
+            slow_state = next(client for client in bridge.clients if client is not fast_state)
+            slow_state.writer.transport.set_write_buffer_limits(high=256)
+            slow_state.writer.get_extra_info('socket').setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1024)
+
+            fast.send(TRIGGER_SNIFFER_SIMULATION, bytes([1]))
+            while slow_state.frames_dropped < 20:
+                await fast.receive(len(fast.frames) + 1)
+            fast.send(TRIGGER_SNIFFER_SIMULATION, bytes([0]))
+            while commands(fast.frames).count(TRIGGER_SNIFFER_SIMULATION) < 2:
+                await fast.receive(len(fast.frames) + 1)
+            await fast.idle()
+            queued = [slow_state.queue.get_nowait() for _ in range(slow_state.queue.qsize())]
+            sock.close()
+            fast.close()
+            return fast.frames, fast_state.frames_dropped, slow_state.frames_dropped, queued
+
+    with GatewaySimulator(block_duration=0.0, simulation_interval=0.001, seed=1) as sim:
+        frames, fast_dropped, slow_dropped, queued = run(main(sim))
+        sent = sim.simulation_frames
+    detections = [frame.raw for frame in frames if frame.command == SNIFFER_IO_DATA]
+    assert len(detections) == sent
+    assert fast_dropped == 0
+    assert slow_dropped >= 20
+    # The slow client keeps the newest frames
+    assert len(queued) == 20
+    assert queued == detections[-20:]
+
+
+def test_max_pending_pushes_back_on_the_client():
+    async def main(port):
+        async with SerialBridge(port, tcp_port=0, max_pending=2) as bridge:
+            client = await Client.connect(bridge)
+            state = next(iter(bridge.clients))
+            for _ in range(5):
+                client.send(QUERY_SPREAD_FACTOR)
+            await asyncio.sleep(0.1)
+            # One request on the wire, one queued; the rest stay unread in the socket
+            accepted = state.requests, bridge.requests
+            await client.receive(5)
+            client.close()
+            return accepted, state.requests, commands(client.frames)
+
+    with GatewaySimulator(block_duration=0.0, response_delay=0.2) as sim:
+        accepted, requests, received = run(main(sim.port))
+    assert accepted == (2, 1)
+    assert requests == 5
+    assert received == [QUERY_SPREAD_FACTOR] * 5
+
+
+def test_log_lines_are_shared_whole():
+    async def main(sim):
+        async with SerialBridge(sim.port, tcp_port=0, log_port=sim.log_port, log_tcp_port=0) as bridge:
+            port = bridge._servers[1].sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            while not bridge.log_clients:
+                await asyncio.sleep(0.01)
+            sim.log('INF', 'SYS', "hello")
+            line = await reader.readline()
+            writer.close()
+            return line
+
+    with GatewaySimulator(block_duration=0.0) as sim:
+        line = run(main(sim))
+    assert line.endswith(b'INF:SYS hello\r\n')
+
+
+def test_log_without_line_ends_is_not_buffered_forever():
+    async def main():
+        bridge = SerialBridge('/dev/null')
+        client = BridgeClient('log', None, None, queue_size=100, max_pending=1)
+        bridge.log_clients.add(client)
+        bridge._on_log_data(b'partial')
+        buffered = client.queue.qsize()
+        for _ in range(MAX_LOG_LINE // 1024):
+            bridge._on_log_data(b'\x55' * 1024)
+        return buffered, client.queue.get_nowait(), len(bridge._log_pending), bridge.log_overflows
+
+    buffered, sent, pending, overflows = run(main())
+    assert buffered == 0
+    assert sent.startswith(b'partial') and len(sent) > MAX_LOG_LINE
+    assert (pending, overflows) == (0, 1)
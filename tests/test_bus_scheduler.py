@@ -0,0 +1,125 @@
+"""Tests for utils/bus_scheduler.py on a simulated clock."""
+
+import types
+from concurrent.futures import Future
+
+import pytest
+
+from utils import bus_scheduler
+from utils.bus_scheduler import PRIORITY_HIGH, PRIORITY_LOW, BusScheduler
+from utils.protocol import FrameBuilder, FrameDecoder
+
+BUILDER = FrameBuilder()
+
+
+class Bus:
+    """Answers polls at once unless the target module is marked missing."""
+
+    def __init__(self):
+        self.missing = set()
+        self.polls = []
+        self.retries = []
+
+    def submit(self, module_function, module_id, command, data, timeout, retries):
+        self.polls.append((module_function, module_id))
+        self.retries.append(retries)
+        future = Future()
+        if (module_function, module_id) in self.missing:
+            future.set_exception(TimeoutError("no response"))
+        else:
+            raw = BUILDER.build_frame(module_function, module_id, command, b'\x07')
+            future.set_result(FrameDecoder().feed(raw)[0])
+        return future
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the scheduler's clock; advance it with ``clock.now += seconds``."""
+    fake = types.SimpleNamespace(now=1000.0)
+    fake.monotonic = lambda: fake.now
+    monkeypatch.setattr(bus_scheduler, 'time', fake)
+    return fake
+
+
+@pytest.fixture
+def bus():
+    return Bus()
+
+
+def poll_times(scheduler, clock, duration, step=0.25):
+    """Run the scheduler for ``duration`` simulated seconds; returns when each poll happened."""
+    times = []
+    end = clock.now + duration
+    while clock.now < end:
+        target = scheduler.run_once(block=False)
+        if target is None:
+            clock.now += step
+        else:
+            times.append((clock.now, target.address))
+    return times
+
+
+def test_polls_on_interval_one_request_at_a_time(bus, clock):
+    scheduler = BusScheduler(bus.submit)
+    target = scheduler.add(0x05, 1, 0x20, interval=1.0)
+    times = poll_times(scheduler, clock, 5.0)
+    assert [t for t, _ in times] == [1000.0, 1001.0, 1002.0, 1003.0, 1004.0]
+    # The scheduler owns the timing: the correlator must not retry on its own
+    assert set(bus.retries) == {0}
+    assert (target.polls, target.responses, target.dead) == (5, 5, False)
+    assert target.srtt is not None
+
+
+def test_dead_target_backs_off_exponentially(bus, clock):
+    bus.missing.add((0x05, 2))
+    changes = []
+    scheduler = BusScheduler(bus.submit, on_state_change=lambda target, alive: changes.append(alive),
+                             dead_after=3, max_backoff=8.0)
+    alive = scheduler.add(0x05, 1, 0x20, interval=1.0)
+    dead = scheduler.add(0x05, 2, 0x20, interval=1.0)
+
+    times = poll_times(scheduler, clock, 40.0)
+    dead_times = [t - 1000.0 for t, address in times if address == dead.address]
+    # Three misses one interval apart, then gaps of 1, 2, 4 and 8 (max_backoff) seconds
+    assert dead_times[:8] == [0.0, 1.0, 2.0, 3.0, 5.0, 9.0, 17.0, 25.0]
+    assert dead.dead and changes == [False]
+    assert dead.timeouts == len(dead_times)
+    # The healthy module keeps its interval
+    assert len([t for t, address in times if address == alive.address]) == 40
+
+
+def test_dead_target_recovers(bus, clock):
+    bus.missing.add((0x05, 2))
+    changes = []
+    scheduler = BusScheduler(bus.submit, on_state_change=lambda target, alive: changes.append(alive),
+                             dead_after=2)
+    target = scheduler.add(0x05, 2, 0x20, interval=1.0)
+    poll_times(scheduler, clock, 4.0)
+    assert target.dead
+
+    bus.missing.clear()
+    times = poll_times(scheduler, clock, 10.0)
+    assert not target.dead and changes == [False, True]
+    assert target.failures == 0
+    # Back on its normal interval after the first answer
+    gaps = [b - a for (a, _), (b, _) in zip(times, times[1:])]
+    assert set(gaps) == {1.0}
+
+
+def test_priority_classes(bus, clock):
+    scheduler = BusScheduler(bus.submit)
+    low = scheduler.add(0x05, 3, 0x20, priority=PRIORITY_LOW)
+    normal = scheduler.add(0x05, 2, 0x20)
+    high = scheduler.add(0x05, 1, 0x20, priority=PRIORITY_HIGH)
+    assert [scheduler.run_once(block=False) for _ in range(3)] == [high, normal, low]
+    with pytest.raises(ValueError):
+        scheduler.add(0x05, 4, 0x20, priority=7)
+
+
+def test_removed_target_is_not_polled(bus, clock):
+    scheduler = BusScheduler(bus.submit)
+    target = scheduler.add(0x05, 1, 0x20)
+    scheduler.remove(target)
+    assert scheduler.run_once(block=False) is None
+    assert scheduler.run_once() is None      # Nothing registered: returns instead of blocking
+    assert bus.polls == []
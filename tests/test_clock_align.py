@@ -0,0 +1,83 @@
+"""Tests for utils/clock_align.py on synthetic firmware logs."""
+
+import random
+
+import pytest
+
+from utils.capture import DIRECTION_TX
+from utils.clock_align import BOOT_MARKER, LINE_OVERHEAD, TICK_WRAP, ClockAligner
+from utils.log_store import LogRecord
+from utils.timeouts import wire_time
+
+BOOT = 1760600000.0
+
+
+def log(tick: int, host_time: float, message: str = 'Heartbeat', source: str = 'SYS') -> LogRecord:
+    """A record as stored on reception: host time plus the line's own wire time."""
+    return LogRecord(host_time + wire_time(len(message) + LINE_OVERHEAD, 115200), tick, 'INF', source, message)
+
+
+def drifting_log(ppm: float, seconds: int, boot: float = BOOT, first_tick: int = 0, seed: int = 1):
+    """One line per second from a firmware clock ``ppm`` slow, each delayed by up to 20 ms."""
+    rng = random.Random(seed)
+    rate = 1e-3 * (1 + ppm / 1e6)
+    records = [log(first_tick, boot + first_tick * rate, BOOT_MARKER)]
+    for second in range(1, seconds):
+        tick = first_tick + second * 1000
+        records.append(log(tick, boot + tick * rate + rng.uniform(0.0, 0.02)))
+    return records
+
+
+def test_drift_is_fitted():
+    records = drifting_log(50.0, 3600)
+    aligner = ClockAligner()
+    host_times = aligner.align(records)
+    segment, = aligner.segments
+    assert segment.drift_ppm == pytest.approx(50.0, abs=2.0)
+    assert segment.boot_time == pytest.approx(BOOT, abs=0.002)
+    # No event is placed after the host received it
+    assert all(aligned <= record.host_time for aligned, record in zip(host_times, records))
+    assert host_times[-1] == pytest.approx(BOOT + 3599 * 1.00005, abs=0.002)
+
+
+def test_reboot_starts_new_segment():
+    first = drifting_log(0.0, 600)
+    second = drifting_log(0.0, 600, boot=BOOT + 700.0)
+    aligner = ClockAligner()
+    host_times = aligner.align(first + second)
+    assert len(aligner.segments) == 2 and aligner.reboots == 1
+    assert aligner.boots[599:601] == [0, 1]
+    assert aligner.segments[1].boot_time == pytest.approx(BOOT + 700.0, abs=0.002)
+    assert host_times[600] == pytest.approx(BOOT + 700.0, abs=0.002)
+
+
+def test_boot_marker_after_first_lines_keeps_segment():
+    aligner = ClockAligner()
+    assert aligner.track(5) == (0, 5)
+    assert aligner.track(40, boot_marker=True) == (0, 40)
+    # A second marker without a tick reset is a reboot that was too quick to see
+    assert aligner.track(60000, boot_marker=True) == (1, 60000)
+    assert aligner.reboots == 1
+
+
+def test_tick_wrap_is_unwrapped():
+    aligner = ClockAligner()
+    assert aligner.track(TICK_WRAP - 500) == (0, TICK_WRAP - 500)
+    assert aligner.track(500) == (0, TICK_WRAP + 500)
+    assert (aligner.wraps, aligner.reboots) == (1, 0)
+
+
+def test_frame_dump_tightens_alignment():
+    # Log lines arrive 0.5 s late; the UART2 dump of a captured host write pins the clock
+    data = bytes.fromhex('7E 00 00 24 00 00 06 5A 7F')
+    dump = 'RX[9]: ' + ''.join(f'{b:02X} ' for b in data)
+    write_time = BOOT + 10.0
+    records = [log(0, BOOT + 0.5, BOOT_MARKER),
+               log(10000, write_time + 0.5, dump, source='U2'),
+               log(20000, BOOT + 20.5)]
+    frames = {(DIRECTION_TX, data): [write_time]}
+
+    aligner = ClockAligner()
+    host_times = aligner.align(records, frames)
+    assert aligner.frame_matches == 1
+    assert host_times[1] == pytest.approx(write_time, abs=0.002)
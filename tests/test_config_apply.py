@@ -0,0 +1,94 @@
+"""Tests for utils/config_apply.py against the pty gateway simulator."""
+
+import pytest
+
+from utils.config_apply import ConfigApplier
+from utils.fleet import GatewaySession
+from utils.simulator import DEFAULT_SETTINGS, SETTING_LIMITS
+
+# Fixed per-attempt timeout: the simulator answers within milliseconds
+TIMEOUT = 0.3
+
+
+@pytest.fixture
+def session(simulator):
+    with GatewaySession(simulator.port, timeout=TIMEOUT, retries=2) as session:
+        yield session
+
+
+@pytest.fixture
+def applier(session):
+    return ConfigApplier(session.request, session.cache)
+
+
+def test_writes_only_changed_parameters(applier, simulator):
+    report = applier.apply({'tx_freq': DEFAULT_SETTINGS['downlink_frequency'], 'spread_factor': '9',
+                            'coding_rate': DEFAULT_SETTINGS['coding_rate']})
+    assert report.ok
+    assert report.written == ['spread_factor']
+    assert sorted(report.plan.unchanged) == ['coding_rate', 'tx_freq']
+    assert report.plan.changes[0].current == DEFAULT_SETTINGS['spread_factor']
+    assert (report.plan.queried_reads, report.plan.cached_reads) == (3, 0)
+    assert simulator.eeprom.values['spread_factor'] == 9
+    assert simulator.eeprom.writes == 1
+
+
+def test_second_apply_uses_cache_and_writes_nothing(applier, simulator):
+    profile = {'rx_freq': '175000000', 'bandwidth': '7'}
+    assert applier.apply(profile).written == ['rx_freq', 'bandwidth']
+    received = simulator.frames_received
+
+    report = applier.apply(profile)
+    assert report.ok and report.written == []
+    assert report.writes_avoided == 2 and report.plan.cached_reads == 2
+    assert simulator.frames_received == received
+    assert simulator.eeprom.writes == 2
+
+
+def test_readback_reports_values_the_device_did_not_take(applier, simulator, monkeypatch):
+    # A firmware with a narrower range ignores the value but still acknowledges the SET
+    monkeypatch.setitem(SETTING_LIMITS, 'bandwidth', (0, 5))
+    report = applier.apply({'bandwidth': '7'})
+    assert report.written == ['bandwidth']
+    assert report.mismatched == {'bandwidth': (DEFAULT_SETTINGS['bandwidth'], 7)}
+    assert not report.ok
+
+
+def test_verify_reads_the_device_not_the_cache(applier, simulator):
+    assert applier.apply({'spread_factor': '8'}).ok
+    simulator.eeprom.values['spread_factor'] = 10
+
+    report = applier.verify({'spread_factor': '8', 'bandwidth': DEFAULT_SETTINGS['bandwidth']})
+    assert report.verify_only and not report.ok
+    assert report.mismatched == {'spread_factor': (10, 8)}
+    assert report.plan.unchanged == ['bandwidth']
+
+
+def test_unreadable_and_resetting_parameters_are_skipped(applier, simulator):
+    # SET_UART_BAUDRATE would restore the defaults without an ack: it must never be sent
+    report = applier.apply({'tx_freq': '150000000', 'spread_factor': '9', 'uart_baudrate': '9600',
+                            'module_id': '3', 'output_power': '10', 'bogus': 1})
+    assert report.ok
+    assert sorted(report.written) == ['spread_factor', 'tx_freq']
+    assert sorted(report.plan.skipped) == ['module_id', 'uart_baudrate']
+    assert report.plan.read_only == ['output_power'] and report.plan.unknown == ['bogus']
+    assert simulator.eeprom.values['spread_factor'] == 9
+    assert simulator.eeprom.values['downlink_frequency'] == 150000000
+    assert simulator.eeprom.writes == 2
+
+
+def test_invalid_value_sends_nothing(applier, simulator):
+    with pytest.raises(ValueError, match='Spread Factor'):
+        applier.apply({'tx_freq': '150000000', 'spread_factor': '13'})
+    with pytest.raises(ValueError, match='UART Baudrate'):
+        applier.targets({'uart_baudrate': '1234'})
+    assert simulator.frames_received == 0
+
+
+def test_unacknowledged_set_fails_and_invalidates_cache(applier, session, simulator):
+    assert applier.read_values(['coding_rate'])[0] == {'coding_rate': DEFAULT_SETTINGS['coding_rate']}
+    simulator.loss_rate = 1.0
+    report = applier.apply({'coding_rate': '4'})
+    assert not report.ok
+    assert list(report.failed) == ['coding_rate'] and report.written == []
+    assert session.cache.peek((0, 0), 'coding_rate') is None
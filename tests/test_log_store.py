@@ -0,0 +1,76 @@
+"""Tests for utils/log_store.py."""
+
+import pytest
+
+from utils.log_store import LogRecord, LogStore, parse_time
+
+LINES = [
+    '[00001000] INF:SYS === LoRa Gateway Starting ===',
+    '[00001500] ERR:LRX CRC error on received packet',
+    'garbled line without a header',
+    '',
+    '[00002000] INF:LRX Received 12 bytes',
+    '[00002500] ERR:LTX 100%_done_ failed',
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = LogStore(str(tmp_path / 'gateway.db'), batch_size=100)
+    yield store
+    store.close()
+
+
+def test_lines_are_parsed_and_batched(store):
+    store.add_lines(LINES[:3], host_time=100.0)
+    assert store.pending == 3 and store.count() == 0
+    store.add_lines(LINES[3:], host_time=101.0)
+    store.commit()
+    assert store.pending == 0 and (store.records, store.commits) == (5, 1)
+
+    records = store.query()
+    assert records[0] == LogRecord(100.0, 1000, 'INF', 'SYS', '=== LoRa Gateway Starting ===')
+    assert records[2] == LogRecord(100.0, None, None, None, 'garbled line without a header')
+    assert store.time_range() == (100.0, 101.0)
+
+
+def test_batch_size_commits(tmp_path):
+    with LogStore(str(tmp_path / 'gateway.db'), batch_size=2) as store:
+        store.add_lines(LINES[:2], host_time=1.0)
+        assert store.commits == 1 and store.pending == 0
+        store.add(LogRecord(2.0, 3000, 'WRN', 'SYS', 'single'))
+        assert store.pending == 1
+    with LogStore(str(tmp_path / 'gateway.db'), readonly=True) as store:
+        assert store.count() == 3
+
+
+def test_filtered_queries(store):
+    for offset, line in enumerate(LINES):
+        store.add_lines([line], host_time=100.0 + offset)
+    store.commit()
+
+    assert [r.tick for r in store.query(levels=['ERR'], sources=['LRX'])] == [1500]
+    assert [r.tick for r in store.query(start=101.0, end=104.0)] == [1500, None]
+    assert [r.tick for r in store.query(levels=['ERR'], newest_first=True, limit=1)] == [2500]
+    # LIKE wildcards in the search text are literal
+    assert [r.tick for r in store.query(contains='100%_done_')] == [2500]
+    assert store.count(contains='%') == 1
+    summary = store.summary()
+    assert len(summary) == 5 and ('ERR', 'LRX', 1) in summary and (None, None, 1) in summary
+
+
+def test_readonly_store_sees_committed_rows(store):
+    store.add_lines(LINES[:2], host_time=5.0)
+    store.commit()
+    reader = LogStore(store.path, readonly=True)
+    try:
+        assert reader.count(levels=['ERR']) == 1
+    finally:
+        reader.close()
+
+
+def test_parse_time():
+    assert parse_time('1760628600.5') == 1760628600.5
+    assert parse_time('2025-10-16 15:30') == parse_time('2025-10-16T15:30:00')
+    with pytest.raises(ValueError):
+        parse_time('yesterday')
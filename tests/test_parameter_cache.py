@@ -0,0 +1,80 @@
+"""Tests for utils/parameter_cache.py."""
+
+import struct
+import time
+from concurrent.futures import Future
+
+from utils.command_registry import KIND_QUERY, KIND_SET
+from utils.parameter_cache import ParameterCache
+from utils.protocol import FrameBuilder, FrameDecoder
+
+DEVICE = (0x00, 0x00)
+
+
+def frame(command: int, data: bytes, module_function: int = 0x00, module_id: int = 0x00):
+    return FrameDecoder().feed(FrameBuilder().build_frame(module_function, module_id, command, data))[0]
+
+
+def test_fresh_and_stale_values():
+    cache = ParameterCache(ttls={'spread_factor': 10.0})
+    assert cache.lookup(DEVICE, 'spread_factor') == (None, False)
+
+    cache.update(DEVICE, 'spread_factor', 9)
+    assert cache.get(DEVICE, 'spread_factor') == 9
+    cache.update(DEVICE, 'spread_factor', 8, timestamp=time.monotonic() - 11.0)
+    assert cache.lookup(DEVICE, 'spread_factor') == (8, False)
+    assert cache.get(DEVICE, 'spread_factor') is None
+    assert (cache.hits, cache.stale_hits, cache.misses) == (1, 2, 1)
+    assert cache.values(DEVICE) == {'spread_factor': 8}
+    assert cache.values(DEVICE, fresh_only=True) == {}
+
+
+def test_on_frame_writes_through_answers_only():
+    cache = ParameterCache()
+    tx = frame(0x20, struct.pack('<f', 150.0))
+    assert not cache.on_frame(tx, None)                  # Unsolicited
+    assert cache.peek(DEVICE, 'tx_freq') is None
+
+    assert cache.on_frame(tx, KIND_QUERY)
+    assert cache.get(DEVICE, 'tx_freq') == 150000000
+    assert cache.on_frame(frame(0xB4, b'\x0A'), KIND_SET)  # SET acknowledgement carries the applied value
+    assert cache.get(DEVICE, 'spread_factor') == 10
+    assert not cache.on_frame(frame(0x40, b'\x02'), KIND_SET)
+
+
+def test_vlad_query_response_decodes_as_lora_setting():
+    # 0x20 is also SET_ATT_LTEL on VLAD modules: a query answer must not be taken for the attenuation
+    cache = ParameterCache()
+    assert cache.on_frame(frame(0x20, struct.pack('<f', 150.0), module_function=0x05), KIND_QUERY)
+    assert cache.values((0x05, 0x00)) == {'tx_freq': 150000000}
+
+
+def test_revalidate_runs_one_refresh_at_a_time():
+    cache = ParameterCache()
+    pending = Future()
+    calls = []
+
+    def refresh():
+        calls.append(1)
+        return pending
+
+    assert cache.revalidate(DEVICE, 'tx_freq', refresh)
+    assert not cache.revalidate(DEVICE, 'tx_freq', refresh)
+    pending.set_result(None)
+    assert cache.revalidate(DEVICE, 'tx_freq', lambda: None) is False   # Not sent: ends at once
+    assert cache.revalidate(DEVICE, 'tx_freq', refresh)
+    assert len(calls) == 2 and cache.revalidations == 3
+
+
+def test_invalidate():
+    cache = ParameterCache()
+    cache.update(DEVICE, 'tx_freq', 150000000)
+    cache.update(DEVICE, 'bandwidth', 9)
+    cache.update((0x05, 0x01), 'bandwidth', 7)
+
+    cache.invalidate(DEVICE, 'tx_freq')
+    assert cache.values(DEVICE) == {'bandwidth': 9}
+    cache.invalidate(DEVICE)
+    assert cache.values(DEVICE) == {} and cache.values((0x05, 0x01)) == {'bandwidth': 7}
+    cache.invalidate()
+    assert cache.values((0x05, 0x01)) == {}
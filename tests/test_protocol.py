@@ -0,0 +1,74 @@
+"""Tests for the frame builder and incremental decoder in utils/protocol.py."""
+
+from utils.protocol import FrameBuilder, FrameDecoder
+
+BUILDER = FrameBuilder()
+QUERY = BUILDER.build_frame(0x00, 0x00, 0x24)
+RESPONSE = BUILDER.build_frame(0x00, 0x00, 0x20, bytes.fromhex('00 80 15 43'))
+
+
+def test_build_frame_layout():
+    assert QUERY.hex(' ').upper() == '7E 00 00 24 00 00 06 5A 7F'   # CRC-16/XMODEM 0x5A06, little-endian
+    assert RESPONSE[5] == 4 and RESPONSE[6:10] == bytes.fromhex('00 80 15 43')
+
+
+def test_single_frame():
+    decoder = FrameDecoder()
+    frames = decoder.feed(RESPONSE)
+    assert len(frames) == 1
+    frame = frames[0]
+    assert (frame.module_function, frame.module_id, frame.command) == (0x00, 0x00, 0x20)
+    assert frame.payload == bytes.fromhex('00 80 15 43')
+    assert frame.raw == RESPONSE
+    assert decoder.pending == 0
+
+
+def test_frame_split_across_reads():
+    decoder = FrameDecoder()
+    frames = []
+    for i in range(len(RESPONSE)):
+        frames += decoder.feed(RESPONSE[i:i + 1])
+        if i < len(RESPONSE) - 1:
+            assert not frames
+    assert [frame.raw for frame in frames] == [RESPONSE]
+    assert decoder.bytes_discarded == 0
+
+
+def test_packed_frames_in_one_read():
+    decoder = FrameDecoder()
+    frames = decoder.feed(QUERY + RESPONSE + QUERY[:4])
+    assert [frame.raw for frame in frames] == [QUERY, RESPONSE]
+    assert decoder.pending == 4
+    assert [frame.raw for frame in decoder.feed(QUERY[4:])] == [QUERY]
+    assert decoder.frames_decoded == 3
+
+
+def test_noise_between_frames_is_discarded():
+    decoder = FrameDecoder()
+    frames = decoder.feed(b'\x00\xFFgarbage' + QUERY + b'\x7F\x7F' + RESPONSE)
+    assert [frame.raw for frame in frames] == [QUERY, RESPONSE]
+    assert decoder.bytes_discarded == 11
+    assert decoder.crc_errors == 0
+
+
+def test_crc_error_resyncs_on_next_frame():
+    corrupted = bytearray(RESPONSE)
+    corrupted[7] ^= 0x01
+    decoder = FrameDecoder()
+    frames = decoder.feed(bytes(corrupted) + QUERY)
+    assert [frame.raw for frame in frames] == [QUERY]
+    assert decoder.crc_errors == 1
+    assert decoder.resyncs >= 1
+
+
+def test_false_start_does_not_stall_later_frames():
+    # A stray START_MARK whose length byte claims 255 bytes would otherwise hold back the frame behind it
+    decoder = FrameDecoder()
+    frames = decoder.feed(b'\x7E\x00\x00\x20\x00\xFF' + RESPONSE)
+    assert [frame.raw for frame in frames] == [RESPONSE]
+    assert decoder.pending == 0
+
+
+def test_iter_frames():
+    chunks = [RESPONSE[:3], RESPONSE[3:] + QUERY[:7], QUERY[7:]]
+    assert [frame.command for frame in FrameDecoder().iter_frames(chunks)] == [0x20, 0x24]
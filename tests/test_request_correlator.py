@@ -0,0 +1,168 @@
+"""Tests for utils/request_correlator.py with an in-memory link."""
+
+import threading
+import time
+from concurrent.futures import CancelledError
+
+import pytest
+
+from utils.command_registry import KIND_QUERY, KIND_SET
+from utils.protocol import FrameBuilder, FrameDecoder
+from utils.request_correlator import RequestCorrelator
+
+BUILDER = FrameBuilder()
+
+
+class Link:
+    """Records written frames and builds the device's responses."""
+
+    def __init__(self):
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def send(self, frame: bytes) -> bool:
+        with self._lock:
+            self.sent.append(frame)
+        return True
+
+    def commands(self):
+        with self._lock:
+            return [frame[3] for frame in self.sent]
+
+    @staticmethod
+    def response(command: int, data: bytes = b'\x07', module_function: int = 0x00, module_id: int = 0x00):
+        return FrameDecoder().feed(BUILDER.build_frame(module_function, module_id, command, data))[0]
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def link():
+    return Link()
+
+
+@pytest.fixture
+def correlator(link):
+    correlator = RequestCorrelator(link.send, timeout=1.0, retries=2)
+    yield correlator
+    correlator.close()
+
+
+def test_response_resolves_matching_request(link, correlator):
+    future = correlator.submit(0x00, 0x00, 0x24)
+    assert link.commands() == [0x24]
+    assert correlator.pending_kind(Link.response(0x24)) == KIND_QUERY
+
+    assert not correlator.on_frame(Link.response(0x25))          # Not asked for
+    assert correlator.on_frame(Link.response(0x24))
+    assert future.result(0).payload == b'\x07'
+    assert (correlator.completed, correlator.unmatched, correlator.outstanding) == (1, 1, 0)
+
+
+def test_requests_wait_for_a_free_slot(link, correlator):
+    first = correlator.submit(0x00, 0x00, 0x20)
+    second = correlator.submit(0x00, 0x00, 0xB4, b'\x09')
+    assert link.commands() == [0x20]
+    assert correlator.queued == 1
+
+    correlator.on_frame(Link.response(0x20))
+    assert first.done()
+    assert link.commands() == [0x20, 0xB4]
+    assert correlator.pending_kind(Link.response(0xB4)) == KIND_SET
+    correlator.on_frame(Link.response(0xB4, b'\x09'))
+    assert second.result(0).payload == b'\x09'
+
+
+def test_timeout_after_retries(link):
+    correlator = RequestCorrelator(link.send, timeout=0.05, retries=2)
+    try:
+        future = correlator.submit(0x00, 0x00, 0x24)
+        with pytest.raises(TimeoutError):
+            future.result(2.0)
+        assert link.commands() == [0x24] * 3
+        assert (correlator.retransmits, correlator.timeouts, correlator.outstanding) == (2, 1, 0)
+    finally:
+        correlator.close()
+
+
+def test_retry_recovers_lost_response(link):
+    correlator = RequestCorrelator(link.send, timeout=0.1, retries=2)
+    try:
+        future = correlator.submit(0x00, 0x00, 0x24)
+        wait_for(lambda: len(link.sent) == 2)
+        correlator.on_frame(Link.response(0x24))
+        assert future.result(1.0).command == 0x24
+        time.sleep(0.25)
+        assert len(link.sent) == 2
+        assert (correlator.retransmits, correlator.timeouts) == (1, 0)
+    finally:
+        correlator.close()
+
+
+def test_per_request_retries_override(link):
+    correlator = RequestCorrelator(link.send, timeout=0.05, retries=2)
+    try:
+        future = correlator.submit(0x00, 0x00, 0xB2, b'\x00\xC2\x01\x00', retries=0)
+        with pytest.raises(TimeoutError):
+            future.result(2.0)
+        assert link.commands() == [0xB2]
+    finally:
+        correlator.close()
+
+
+def test_cancel_queued_request_is_never_sent(link, correlator):
+    first = correlator.submit(0x00, 0x00, 0x20)
+    second = correlator.submit(0x00, 0x00, 0x21)
+    third = correlator.submit(0x00, 0x00, 0x23)
+    assert second.cancel()
+
+    correlator.on_frame(Link.response(0x20))
+    assert link.commands() == [0x20, 0x23]
+    correlator.on_frame(Link.response(0x23))
+    assert first.done() and third.done()
+    with pytest.raises(CancelledError):
+        second.result(0)
+
+
+def test_cancel_in_flight_frees_slot_without_retransmit(link):
+    correlator = RequestCorrelator(link.send, timeout=0.1, retries=2)
+    try:
+        first = correlator.submit(0x00, 0x00, 0x20)
+        second = correlator.submit(0x00, 0x00, 0x21)
+        assert first.cancel()
+        assert link.commands() == [0x20, 0x21]
+        correlator.on_frame(Link.response(0x21))
+        assert second.result(0).command == 0x21
+
+        time.sleep(0.25)
+        assert link.commands() == [0x20, 0x21]
+        assert correlator.retransmits == 0 and correlator.outstanding == 0
+        # A late answer to the cancelled request matches nothing
+        assert not correlator.on_frame(Link.response(0x20))
+    finally:
+        correlator.close()
+
+
+def test_send_failure_fails_request():
+    correlator = RequestCorrelator(lambda frame: False, timeout=1.0)
+    try:
+        with pytest.raises(IOError):
+            correlator.submit(0x00, 0x00, 0x24).result(0)
+        assert correlator.outstanding == 0
+    finally:
+        correlator.close()
+
+
+def test_close_fails_outstanding_requests(link):
+    correlator = RequestCorrelator(link.send, timeout=1.0)
+    first = correlator.submit(0x00, 0x00, 0x20)
+    second = correlator.submit(0x00, 0x00, 0x21)
+    correlator.close()
+    for future in (first, second):
+        with pytest.raises(ConnectionError):
+            future.result(0)
@@ -0,0 +1,41 @@
+"""Tests for utils/serial_reader.py on pty and URL ports."""
+
+import serial
+
+from utils.protocol import FrameBuilder, FrameDecoder
+from utils.serial_reader import MIN_READ_SIZE, SerialReader
+
+
+def test_select_mode_on_pty(simulator):
+    port = serial.Serial(simulator.port, 115200, timeout=0)
+    try:
+        reader = SerialReader(port, timeout=0.5)
+        assert reader.uses_select
+        assert reader.read() == b''
+        assert reader.idle_wakeups == 1
+
+        port.write(FrameBuilder().build_frame(0x00, 0x00, 0x24))
+        decoder = FrameDecoder()
+        frames = []
+        while not frames:
+            data = reader.read()
+            assert data, "no response from the simulator"
+            frames = decoder.feed(data)
+        assert frames[0].command == 0x24
+    finally:
+        port.close()
+
+
+def test_loop_url_falls_back_to_blocking_reads():
+    # loop:// has fileno() but raises io.UnsupportedOperation
+    port = serial.serial_for_url('loop://', timeout=0)
+    try:
+        reader = SerialReader(port, timeout=0.05)
+        assert not reader.uses_select
+        assert port.timeout == 0.05
+        port.write(b'abc')
+        assert reader.read() == b'abc'
+        assert reader.read() == b''
+        assert reader.read_size == MIN_READ_SIZE
+    finally:
+        port.close()
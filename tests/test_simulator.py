@@ -0,0 +1,123 @@
+"""Tests for the pty gateway simulator in utils/simulator.py, driven with raw frames."""
+
+import json
+import struct
+import time
+
+import pytest
+import serial
+
+from utils.protocol import FrameBuilder, FrameDecoder
+from utils.simulator import (DEFAULT_SETTINGS, QUERY_SPREAD_FACTOR, QUERY_TX_FREQ, SET_OPERATION_MODE,
+                             SET_SPREAD_FACTOR, SET_TX_FREQ, SET_UART_BAUDRATE, GatewaySimulator)
+
+BUILDER = FrameBuilder()
+
+
+class Device:
+    """Raw request/response access to a simulator port."""
+
+    def __init__(self, port: str):
+        self.serial = serial.Serial(port, 115200, timeout=0.05)
+        self.decoder = FrameDecoder()
+
+    def request(self, command: int, data: bytes = b'', module_function: int = 0x00, module_id: int = 0x00,
+                timeout: float = 0.5):
+        """Send one frame; returns the response Frame, or None if nothing came back in time."""
+        self.serial.write(BUILDER.build_frame(module_function, module_id, command, data))
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            frames = self.decoder.feed(self.serial.read(64))
+            if frames:
+                return frames[0]
+        return None
+
+    def close(self):
+        self.serial.close()
+
+
+@pytest.fixture
+def device(simulator):
+    device = Device(simulator.port)
+    yield device
+    device.close()
+
+
+def test_query_answers_with_stored_setting(device, simulator):
+    response = device.request(QUERY_SPREAD_FACTOR)
+    assert (response.command, response.payload) == (QUERY_SPREAD_FACTOR, bytes([DEFAULT_SETTINGS['spread_factor']]))
+
+    response = device.request(QUERY_TX_FREQ)
+    assert response.payload == struct.pack('<f', DEFAULT_SETTINGS['downlink_frequency'] / 1e6)
+    assert simulator.eeprom.writes == 0
+
+
+def test_set_echoes_applied_value_and_saves(device, simulator):
+    response = device.request(SET_SPREAD_FACTOR, b'\x09')
+    assert (response.command, response.payload) == (SET_SPREAD_FACTOR, b'\x09')
+    assert simulator.eeprom.values['spread_factor'] == 9
+    assert simulator.eeprom.writes == 1
+
+    response = device.request(SET_TX_FREQ, struct.pack('<f', 152.0))
+    assert simulator.eeprom.values['downlink_frequency'] == 152000000
+    assert response.payload == struct.pack('<f', 152.0)
+
+
+def test_out_of_range_set_keeps_value(device, simulator):
+    # Like Lora::set_*: the value is ignored, but the ack and the EEPROM write still happen
+    response = device.request(SET_SPREAD_FACTOR, b'\x0D')
+    assert response.payload == bytes([DEFAULT_SETTINGS['spread_factor']])
+    assert simulator.eeprom.values == DEFAULT_SETTINGS
+    assert simulator.eeprom.writes == 1
+
+
+def test_set_uart_baudrate_resets_without_response(device, simulator):
+    device.request(SET_SPREAD_FACTOR, b'\x0A')
+    assert device.request(SET_UART_BAUDRATE, struct.pack('<I', 9600), timeout=0.2) is None
+    assert simulator.eeprom.values == DEFAULT_SETTINGS
+    assert simulator.eeprom.writes == 2
+
+
+def test_ignored_and_foreign_commands_get_no_response(device, simulator):
+    assert device.request(0x11, timeout=0.2) is None
+    assert device.request(QUERY_SPREAD_FACTOR, module_function=0x05, module_id=1, timeout=0.2) is None
+    assert simulator.frames_retransmitted == 1
+    assert simulator.frames_received == 2 and simulator.responses_sent == 0
+
+
+def test_operation_mode(device):
+    assert device.request(SET_OPERATION_MODE, b'\x01').payload == b'\x00'   # MODE_RX
+    assert device.request(SET_OPERATION_MODE, b'\x07', timeout=0.2) is None
+
+
+def test_loss_rate_drops_responses():
+    with GatewaySimulator(block_duration=0.0, loss_rate=1.0, seed=1) as sim:
+        device = Device(sim.port)
+        try:
+            assert device.request(QUERY_SPREAD_FACTOR, timeout=0.2) is None
+        finally:
+            device.close()
+    assert (sim.responses_dropped, sim.responses_sent) == (1, 0)
+
+
+def test_eeprom_file_persists_settings(tmp_path):
+    path = tmp_path / 'eeprom.json'
+    with GatewaySimulator(eeprom_path=str(path), block_duration=0.0) as sim:
+        device = Device(sim.port)
+        try:
+            device.request(SET_SPREAD_FACTOR, b'\x0B')
+        finally:
+            device.close()
+    assert json.loads(path.read_text())['spread_factor'] == 11
+
+    with GatewaySimulator(eeprom_path=str(path), block_duration=0.0) as sim:
+        assert sim.eeprom.values['spread_factor'] == 11
+
+
+def test_logger_stream(simulator, device):
+    # Opening a port flushes its input, so open the log before sending
+    with serial.Serial(simulator.log_port, 115200, timeout=0.2) as log:
+        device.request(QUERY_SPREAD_FACTOR)
+        lines = log.read(4096).decode('ascii').splitlines()
+    assert lines[0].startswith('[') and ' DBG:U2  RX[9]: 7E 00 00 24 00 00 06 5A 7F' in lines[0]
+    assert lines[1].endswith('INF:CMD Processing command 0x24')
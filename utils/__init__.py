@@ -8,10 +8,62 @@ Author: Assistant
 Date: October 2025
 """
 
+from .async_transport import AsyncGateway
+from .bridge import SerialBridge
+from .bus_scheduler import BusScheduler
 from .log_config import setup_logging, setup_colored_logging, log_frame_data
+from .capture import CaptureReader, CaptureReplayer, CaptureWriter
+from .clock_align import ClockAligner
+from .command_registry import REGISTRY, CommandDispatcher, CommandRegistry, CommandSpec
+from .config_apply import ConfigApplier
+from .crc16 import Crc16, crc16_modbus, crc16_xmodem, validate_frames
+from .fleet import FleetRunner, GatewaySession
+from .line_buffer import LineBuffer
+from .log_parser import LogParser
+from .log_renderer import LogRenderer
+from .log_store import LogStore
+from .metrics import ProtocolMetrics
+from .parameter_cache import ParameterCache
+from .protocol import Frame, FrameBuilder, FrameDecoder
+from .request_correlator import RequestCorrelator
+from .request_job import JobStep, RequestJob
+from .serial_reader import SerialReader
+from .timeouts import TimeoutEstimator
 
 __all__ = [
+    'AsyncGateway',
+    'SerialBridge',
+    'BusScheduler',
     'setup_logging',
     'setup_colored_logging', 
-    'log_frame_data'
+    'log_frame_data',
+    'CaptureReader',
+    'CaptureReplayer',
+    'CaptureWriter',
+    'ClockAligner',
+    'REGISTRY',
+    'CommandDispatcher',
+    'CommandRegistry',
+    'CommandSpec',
+    'ConfigApplier',
+    'Crc16',
+    'crc16_modbus',
+    'crc16_xmodem',
+    'validate_frames',
+    'FleetRunner',
+    'GatewaySession',
+    'LineBuffer',
+    'LogParser',
+    'LogRenderer',
+    'LogStore',
+    'ProtocolMetrics',
+    'ParameterCache',
+    'Frame',
+    'FrameBuilder',
+    'FrameDecoder',
+    'RequestCorrelator',
+    'JobStep',
+    'RequestJob',
+    'SerialReader',
+    'TimeoutEstimator'
 ]
\ No newline at end of file
@@ -0,0 +1,325 @@
+"""
+Asyncio Gateway Transport
+=========================
+
+Event-loop native client for the gateway frame protocol, for tools that
+drive many ports from one thread.
+
+On POSIX the serial file descriptor is registered with
+``loop.add_reader``; elsewhere a ``SerialReader`` thread hands chunks to
+the loop. Responses are matched to requests by
+``(module_function, module_id, command)`` like ``RequestCorrelator``;
+every other frame (ONE_DETECTION, MULTIPLE_DETECTION, ...) is delivered
+through ``unsolicited()``. Parameter values seen in responses are kept
+in ``cache`` for ``query_cached()``. Timeouts are adaptive by default
+(see ``utils.timeouts``).
+
+Example::
+
+    async with AsyncGateway('/dev/ttyUSB0') as gateway:
+        sf = await gateway.query('spread_factor')
+        await gateway.set('spread_factor', 9)
+        async for frame in gateway.unsolicited():
+            print(frame)
+
+Author: Assistant
+Date: October 2025
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import AsyncIterator, Dict, Optional, Tuple, Union
+
+import serial
+
+from .command_registry import KIND_QUERY, KIND_SET, PARAMETERS, REGISTRY, CommandSpec, request_kind
+from .metrics import ProtocolMetrics
+from .parameter_cache import ParameterCache
+from .protocol import Frame, FrameBuilder, FrameDecoder
+from .serial_reader import SerialReader
+from .timeouts import TimeoutEstimator
+
+CommandRef = Union[int, str]
+
+
+class AsyncGateway:
+    """Asyncio client for one gateway serial port."""
+
+    def __init__(self, port: str, baudrate: int = 115200, module_function: int = 0x00, module_id: int = 0x00,
+                 timeout: Optional[float] = None, retries: int = 2, max_outstanding: int = 1, event_queue_size: int = 1000):
+        """
+        Args:
+            port: Serial port name
+            baudrate: Serial baudrate
+            module_function: Default target module function
+            module_id: Default target module id
+            timeout: Per-attempt response timeout in seconds; None derives it
+                from the baudrate and measured round trips
+            retries: Retransmissions after a timeout
+            max_outstanding: Maximum requests awaiting a response at once
+            event_queue_size: Unsolicited frames kept before the oldest is dropped
+        """
+        self.port_name = port
+        self.baudrate = baudrate
+        self.module_function = module_function
+        self.module_id = module_id
+        self.timeout = timeout
+        self.retries = retries
+        self.max_outstanding = max_outstanding
+        self.event_queue_size = event_queue_size
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self.serial_port = None
+        self.frame_builder = FrameBuilder()
+        self.frame_decoder = FrameDecoder()
+        self.cache = ParameterCache()
+        self.estimator = TimeoutEstimator(baudrate)
+        self.metrics = ProtocolMetrics(self.frame_decoder)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._fd = None
+        self._reader: Optional[SerialReader] = None
+        # Key -> (future, request kind) of the attempt awaiting a response
+        self._pending: Dict[Tuple[int, int, int], Tuple[asyncio.Future, str]] = {}
+        self._key_locks: Dict[Tuple[int, int, int], asyncio.Lock] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._events: Optional[asyncio.Queue] = None
+
+        # Statistics
+        self.timeouts = 0
+        self.retransmits = 0
+        self.events_dropped = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self.serial_port is not None and self.serial_port.is_open
+
+    async def open(self):
+        """Open the port and start receiving."""
+        self._loop = asyncio.get_running_loop()
+        self._slots = asyncio.Semaphore(self.max_outstanding)
+        self._events = asyncio.Queue(self.event_queue_size)
+        self.frame_decoder.reset()
+        self.estimator.baudrate = self.baudrate
+        # serial_for_url also accepts socket://host:port, e.g. a serial_bridge.py client
+        self.serial_port = serial.serial_for_url(self.port_name, baudrate=self.baudrate, timeout=0)
+
+        if os.name == 'posix':
+            self._fd = self.serial_port.fileno()
+            self._loop.add_reader(self._fd, self._on_readable)
+        else:
+            self._reader = SerialReader(self.serial_port)
+            self._reader.start(lambda data: self._loop.call_soon_threadsafe(self._on_data, data),
+                               lambda error: self._loop.call_soon_threadsafe(self._on_connection_lost, error))
+        self.logger.info(f"Opened {self.port_name} at {self.baudrate} baud")
+
+    async def close(self):
+        """Stop receiving, fail pending requests and close the port."""
+        self._on_connection_lost(None)
+
+    async def __aenter__(self) -> 'AsyncGateway':
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def request(self, command: int, data: Optional[bytes] = None, module_function: Optional[int] = None,
+                      module_id: Optional[int] = None, timeout: Optional[float] = None,
+                      retries: Optional[int] = None) -> Frame:
+        """
+        Send a command and wait for the frame that answers it.
+
+        Raises:
+            TimeoutError: If no response arrives after all retries
+            ConnectionError: If the port is closed while waiting
+        """
+        if not self.is_open:
+            raise ConnectionError("Port is not open")
+        module_function = self.module_function if module_function is None else module_function
+        module_id = self.module_id if module_id is None else module_id
+        timeout = self.timeout if timeout is None else timeout
+        retries = self.retries if retries is None else retries
+
+        key = (module_function, module_id, command)
+        kind = request_kind(data)
+        frame = self.frame_builder.build_frame(module_function, module_id, command, data)
+        key_lock = self._key_locks.setdefault(key, asyncio.Lock())
+
+        # Same-key requests go one at a time: their responses are indistinguishable
+        async with key_lock, self._slots:
+            for attempt in range(retries + 1):
+                future = self._loop.create_future()
+                self._pending[key] = (future, kind)
+                try:
+                    attempt_timeout = timeout
+                    if attempt_timeout is None:
+                        attempt_timeout = self.estimator.timeout(key, len(frame), attempt=attempt + 1)
+                    sent_at = time.monotonic()
+                    self.serial_port.write(frame)
+                    self.metrics.record_tx(len(frame))
+                    response = await asyncio.wait_for(asyncio.shield(future), attempt_timeout)
+                    rtt = time.monotonic() - sent_at
+                    self.metrics.record_response(key, rtt, kind)
+                    self.estimator.observe(key, rtt, len(frame), len(response.raw), retransmitted=attempt > 0)
+                    return response
+                except asyncio.TimeoutError:
+                    if attempt < retries:
+                        self.retransmits += 1
+                        self.metrics.record_retry(key, kind)
+                finally:
+                    if self._pending.get(key, (None,))[0] is future:
+                        del self._pending[key]
+            self.timeouts += 1
+            self.metrics.record_timeout(key, kind)
+            raise TimeoutError(f"No response to command 0x{command:02X} after {retries + 1} attempts")
+
+    async def query(self, command: CommandRef, **kwargs):
+        """
+        Query a parameter or command.
+
+        Args:
+            command: Parameter key (``'spread_factor'``), command name or code
+
+        Returns:
+            Decoded value for parameters, raw payload bytes otherwise
+        """
+        spec = self._resolve(command, KIND_QUERY)
+        frame = await self.request(spec.command, module_function=self._module_function(spec, kwargs), **kwargs)
+        return self._decode(spec, frame)
+
+    async def set(self, command: CommandRef, value, **kwargs):
+        """
+        Set a parameter and wait for the gateway's acknowledgement.
+
+        Args:
+            command: Parameter key, command name or code
+            value: Host value for parameters, raw bytes otherwise
+
+        Returns:
+            Value echoed by the acknowledgement, decoded like ``query()``
+        """
+        spec = self._resolve(command, KIND_SET)
+        data = spec.codec.encode(value) if spec.codec is not None else value
+        frame = await self.request(spec.command, data, module_function=self._module_function(spec, kwargs), **kwargs)
+        return self._decode(spec, frame)
+
+    async def query_cached(self, command: str, stale_ok: bool = False, **kwargs):
+        """
+        Query a parameter, answering from the cache while its value is fresh.
+
+        Args:
+            command: Parameter key
+            stale_ok: Return an expired value at once and refresh it in the background
+
+        Returns:
+            Decoded value
+        """
+        if command not in PARAMETERS:
+            raise ValueError(f"Not a parameter: {command}")
+        spec = self._resolve(command, KIND_QUERY)
+        module_function = self._module_function(spec, kwargs)
+        device = (module_function, self.module_id if kwargs.get('module_id') is None else kwargs['module_id'])
+
+        value, fresh = self.cache.lookup(device, command)
+        if fresh:
+            return value
+        if value is not None and stale_ok:
+            self.cache.revalidate(device, command, lambda: self._loop.create_task(
+                self._revalidate(command, module_function, kwargs)))
+            return value
+        return await self.query(command, module_function=module_function, **kwargs)
+
+    async def _revalidate(self, command: str, module_function: int, kwargs: dict):
+        try:
+            await self.query(command, module_function=module_function, **kwargs)
+        except (TimeoutError, ConnectionError) as e:
+            self.logger.warning(f"Background refresh of {command} failed: {e}")
+
+    async def unsolicited(self) -> AsyncIterator[Frame]:
+        """Yield frames that did not answer a request, until the port closes."""
+        while True:
+            frame = await self._events.get()
+            if frame is None:
+                # Wake any other consumer too
+                self._events.put_nowait(None)
+                return
+            yield frame
+
+    def _resolve(self, command: CommandRef, kind: str) -> CommandSpec:
+        if isinstance(command, int):
+            spec = REGISTRY.lookup(self.module_function, command, kind)
+            return spec if spec is not None else CommandSpec(f"0x{command:02X}", command, None, kind)
+        if command in PARAMETERS:
+            info = PARAMETERS[command]
+            cmd = info['query_cmd'] if kind == KIND_QUERY else info['set_cmd']
+            if cmd is None:
+                raise ValueError(f"Parameter {command} has no {kind} command")
+            return REGISTRY.lookup(info.get(f'{kind}_module_function'), cmd, kind)
+        spec = REGISTRY.by_name(command)
+        if spec is None:
+            raise ValueError(f"Unknown command: {command}")
+        return spec
+
+    def _module_function(self, spec: CommandSpec, kwargs: dict) -> int:
+        module_function = kwargs.pop('module_function', None)
+        if module_function is not None:
+            return module_function
+        return self.module_function if spec.module_function is None else spec.module_function
+
+    @staticmethod
+    def _decode(spec: CommandSpec, frame: Frame):
+        if spec.codec is not None:
+            return spec.codec.decode(frame.payload)
+        return frame.payload
+
+    def _on_readable(self):
+        try:
+            data = os.read(self._fd, 4096)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self._on_connection_lost(e)
+            return
+        if not data:
+            self._on_connection_lost(ConnectionError("Device returned no data"))
+            return
+        self._on_data(data)
+
+    def _on_data(self, data: bytes):
+        self.metrics.record_rx(len(data))
+        frames = self.frame_decoder.feed(data)
+        self.metrics.record_frames(frames)
+        for frame in frames:
+            future, kind = self._pending.get((frame.module_function, frame.module_id, frame.command), (None, None))
+            if future is not None and not future.done():
+                self.cache.on_frame(frame, kind)
+                future.set_result(frame)
+                continue
+            if self._events.full():
+                self._events.get_nowait()
+                self.events_dropped += 1
+            self._events.put_nowait(frame)
+
+    def _on_connection_lost(self, error: Optional[Exception]):
+        if self.serial_port is None:
+            return
+        if error is not None:
+            self.logger.error(f"Connection to {self.port_name} lost: {error}")
+        if self._fd is not None:
+            self._loop.remove_reader(self._fd)
+            self._fd = None
+        if self._reader is not None:
+            self._reader.stop()
+            self._reader = None
+        self.serial_port.close()
+        self.serial_port = None
+
+        for future, kind in self._pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("Port closed"))
+        self._pending.clear()
+        if self._events.full():
+            self._events.get_nowait()
+        self._events.put_nowait(None)
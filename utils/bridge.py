@@ -0,0 +1,380 @@
+"""
+Serial-to-TCP Bridge
+====================
+
+Share one gateway serial port between several tools.
+
+The bridge owns the port and serves local TCP clients; tools connect to
+``socket://localhost:7000`` instead of the device (every tool opens its
+port with ``serial.serial_for_url``):
+
+- Traffic is frame-aligned with ``FrameDecoder`` in both directions, so
+  a client never sees half a frame or another client's partial write.
+- Requests from all clients go to the gateway one at a time, in arrival
+  order. The bridge remembers which client sent the request on the wire
+  and gives the matching response to that client only.
+- Every other frame from the gateway (detections, late responses, ...)
+  is sent to all clients.
+- Each client has a bounded send queue; when a slow client falls behind,
+  its oldest queued frames are dropped instead of stalling the others.
+  At most ``max_pending`` requests per client wait in the bridge; beyond
+  that the bridge stops reading that client's socket, which pushes back
+  through TCP flow control.
+
+The bridge does not retransmit: clients keep their own timeouts and
+retries. Optionally the text log UART is shared the same way on a second
+TCP port (line-aligned, fan-out only) for ``logger_monitor.py``.
+
+Author: Assistant
+Date: October 2025
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Callable, List, Optional, Set
+
+import serial
+
+from .capture import DIRECTION_RX, DIRECTION_TX, CaptureWriter
+from .protocol import FrameDecoder
+from .serial_reader import SerialReader
+from .timeouts import TimeoutEstimator
+
+DEFAULT_TCP_PORT = 7000
+DEFAULT_LOG_TCP_PORT = 7001
+
+# Longest wait for a response before the next client's request goes out;
+# commands the firmware never answers cost this once per request
+DEFAULT_MAX_TIMEOUT = 1.0
+
+# Log bytes buffered without a line end before they are passed on anyway;
+# firmware lines are at most LOGGER_BUFFER_SIZE (256) bytes
+MAX_LOG_LINE = 4096
+
+
+class BridgeClient:
+    """One connected TCP client."""
+
+    def __init__(self, name: str, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                 queue_size: int, max_pending: int):
+        self.name = name
+        self.reader = reader
+        self.writer = writer
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self.slots = asyncio.Semaphore(max_pending)
+        self.decoder = FrameDecoder()
+        self.closed = False
+
+        # Statistics
+        self.requests = 0
+        self.frames_sent = 0
+        self.frames_dropped = 0
+
+    def send(self, data: bytes):
+        """Queue data for the client, dropping the oldest queued item if it is behind."""
+        if self.closed:
+            return
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.frames_dropped += 1
+        self.queue.put_nowait(data)
+
+
+class _SerialEndpoint:
+    """Non-blocking reads from a serial port into the event loop."""
+
+    def __init__(self, port: str, baudrate: int, on_data: Callable[[bytes], None],
+                 on_error: Callable[[Exception], None]):
+        self.port_name = port
+        self.baudrate = baudrate
+        self.on_data = on_data
+        self.on_error = on_error
+        self.serial_port = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._fd = None
+        self._reader: Optional[SerialReader] = None
+
+    def open(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self.serial_port = serial.serial_for_url(self.port_name, baudrate=self.baudrate, timeout=0)
+        if os.name == 'posix' and hasattr(self.serial_port, 'fileno'):
+            self._fd = self.serial_port.fileno()
+            loop.add_reader(self._fd, self._on_readable)
+        else:
+            self._reader = SerialReader(self.serial_port)
+            self._reader.start(lambda data: loop.call_soon_threadsafe(self.on_data, data),
+                               lambda error: loop.call_soon_threadsafe(self.on_error, error))
+
+    def write(self, data: bytes):
+        self.serial_port.write(data)
+
+    def close(self):
+        if self._fd is not None:
+            self._loop.remove_reader(self._fd)
+            self._fd = None
+        if self._reader is not None:
+            self._reader.stop()
+            self._reader = None
+        if self.serial_port is not None:
+            self.serial_port.close()
+            self.serial_port = None
+
+    def _on_readable(self):
+        try:
+            data = os.read(self._fd, 4096)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self.on_error(e)
+            return
+        if not data:
+            self.on_error(ConnectionError("Device returned no data"))
+            return
+        self.on_data(data)
+
+
+class SerialBridge:
+    """Asyncio daemon multiplexing one gateway port to many TCP clients."""
+
+    def __init__(self, port: str, baudrate: int = 115200, host: str = '127.0.0.1',
+                 tcp_port: int = DEFAULT_TCP_PORT, log_port: Optional[str] = None, log_baudrate: int = 115200,
+                 log_tcp_port: int = DEFAULT_LOG_TCP_PORT, client_queue: int = 1000, max_pending: int = 16,
+                 max_timeout: float = DEFAULT_MAX_TIMEOUT, capture_path: Optional[str] = None):
+        """
+        Args:
+            port: Gateway protocol serial port
+            baudrate: Protocol port baudrate
+            host: Address to listen on; keep it local, the protocol has no authentication
+            tcp_port: TCP port for protocol clients
+            log_port: Optional text log serial port to share as well
+            log_baudrate: Log port baudrate
+            log_tcp_port: TCP port for log clients
+            client_queue: Frames (or log lines) queued per client before the oldest is dropped
+            max_pending: Requests per client waiting in the bridge before its socket is no longer read
+            max_timeout: Longest wait for a response before the next request is sent
+            capture_path: Record all protocol port traffic to this capture file
+        """
+        self.host = host
+        self.tcp_port = tcp_port
+        self.log_tcp_port = log_tcp_port
+        self.client_queue = client_queue
+        self.max_pending = max_pending
+        self.capture_path = capture_path
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self.serial = _SerialEndpoint(port, baudrate, self._on_serial_data, self._on_serial_error)
+        self.log_serial = None
+        if log_port is not None:
+            self.log_serial = _SerialEndpoint(log_port, log_baudrate, self._on_log_data, self._on_serial_error)
+        self.frame_decoder = FrameDecoder()
+        self.estimator = TimeoutEstimator(baudrate, max_timeout=max_timeout)
+        self.capture: Optional[CaptureWriter] = None
+
+        self.clients: Set[BridgeClient] = set()
+        self.log_clients: Set[BridgeClient] = set()
+        self._servers: List[asyncio.AbstractServer] = []
+        self._requests: Optional[asyncio.Queue] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._current = None          # (client, key, future) of the request on the wire
+        self._log_pending = bytearray()
+        self._client_count = 0
+        self._stopped: Optional[asyncio.Event] = None
+        self._closing = False
+
+        # Statistics
+        self.requests = 0
+        self.responses = 0
+        self.timeouts = 0
+        self.unsolicited = 0
+        self.log_overflows = 0
+
+    async def start(self):
+        """Open the serial port(s) and start listening."""
+        loop = asyncio.get_running_loop()
+        self._requests = asyncio.Queue()
+        self._stopped = asyncio.Event()
+        self._closing = False
+        if self.capture_path:
+            self.capture = CaptureWriter(self.capture_path)
+        self.serial.open(loop)
+        self._servers.append(await asyncio.start_server(self._serve_client, self.host, self.tcp_port))
+        self.logger.info(f"Sharing {self.serial.port_name} on {self.host}:{self.tcp_port}")
+        if self.log_serial is not None:
+            self.log_serial.open(loop)
+            self._servers.append(await asyncio.start_server(self._serve_log_client, self.host, self.log_tcp_port))
+            self.logger.info(f"Sharing log port {self.log_serial.port_name} on {self.host}:{self.log_tcp_port}")
+        self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def stop(self):
+        """Disconnect clients, close the servers and the serial port(s)."""
+        if self._stopped is None or self._closing:
+            return
+        self._closing = True
+        for server in self._servers:
+            server.close()
+        for client in list(self.clients | self.log_clients):
+            client.closed = True
+            client.writer.close()
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+        for server in self._servers:
+            await server.wait_closed()
+        self._servers.clear()
+        self.serial.close()
+        if self.log_serial is not None:
+            self.log_serial.close()
+        if self.capture is not None:
+            self.capture.close()
+            self.capture = None
+        self._stopped.set()
+
+    async def serve_forever(self):
+        """Run until ``stop()`` is called or the serial port fails."""
+        await self._stopped.wait()
+
+    async def __aenter__(self) -> 'SerialBridge':
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    # Protocol clients
+
+    def _new_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> BridgeClient:
+        self._client_count += 1
+        peer = writer.get_extra_info('peername')
+        name = f"#{self._client_count} {peer[0]}:{peer[1]}" if peer else f"#{self._client_count}"
+        return BridgeClient(name, reader, writer, self.client_queue, self.max_pending)
+
+    async def _serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        client = self._new_client(reader, writer)
+        self.clients.add(client)
+        self.logger.info(f"Client {client.name} connected ({len(self.clients)} connected)")
+        sender = asyncio.create_task(self._send_loop(client))
+        try:
+            while not client.closed:
+                data = await reader.read(4096)
+                if not data:
+                    break
+                for frame in client.decoder.feed(data):
+                    # Waits while the client has max_pending requests queued: backpressure
+                    await client.slots.acquire()
+                    client.requests += 1
+                    self._requests.put_nowait((client, frame))
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self._drop_client(client, self.clients)
+            sender.cancel()
+
+    async def _serve_log_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        client = self._new_client(reader, writer)
+        self.log_clients.add(client)
+        self.logger.info(f"Log client {client.name} connected")
+        sender = asyncio.create_task(self._send_loop(client))
+        try:
+            # Input is ignored; reading only detects the disconnect
+            while await reader.read(4096):
+                pass
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self._drop_client(client, self.log_clients)
+            sender.cancel()
+
+    async def _send_loop(self, client: BridgeClient):
+        try:
+            while True:
+                data = await client.queue.get()
+                client.writer.write(data)
+                client.frames_sent += 1
+                # Waits only while the socket buffer is above its high-water mark
+                await client.writer.drain()
+        except (ConnectionError, OSError):
+            client.closed = True
+        except asyncio.CancelledError:
+            pass
+
+    def _drop_client(self, client: BridgeClient, clients: Set[BridgeClient]):
+        client.closed = True
+        clients.discard(client)
+        client.writer.close()
+        dropped = f", {client.frames_dropped} frames dropped" if client.frames_dropped else ""
+        self.logger.info(f"Client {client.name} disconnected after {client.requests} requests{dropped}")
+
+    # Request serialisation
+
+    async def _dispatch(self):
+        """Send queued requests one at a time and wait for each response."""
+        loop = asyncio.get_running_loop()
+        while True:
+            client, frame = await self._requests.get()
+            try:
+                if client.closed:
+                    continue
+                key = (frame.module_function, frame.module_id, frame.command)
+                future = loop.create_future()
+                self._current = (client, key, future)
+                sent_at = time.monotonic()
+                try:
+                    self.serial.write(frame.raw)
+                except (serial.SerialException, OSError) as e:
+                    self._on_serial_error(e)
+                    return
+                if self.capture is not None:
+                    self.capture.write(frame.raw, DIRECTION_TX)
+                self.requests += 1
+                try:
+                    response = await asyncio.wait_for(future, self.estimator.timeout(key, len(frame.raw)))
+                    self.responses += 1
+                    self.estimator.observe(key, time.monotonic() - sent_at, len(frame.raw), len(response.raw))
+                except asyncio.TimeoutError:
+                    # Many commands are never answered; the client's own timeout handles it
+                    self.timeouts += 1
+            finally:
+                self._current = None
+                client.slots.release()
+
+    # Serial side
+
+    def _on_serial_data(self, data: bytes):
+        if self.capture is not None:
+            self.capture.write(data, DIRECTION_RX)
+        for frame in self.frame_decoder.feed(data):
+            current = self._current
+            if current is not None:
+                client, key, future = current
+                if key == (frame.module_function, frame.module_id, frame.command) and not future.done():
+                    future.set_result(frame)
+                    client.send(frame.raw)
+                    continue
+            self.unsolicited += 1
+            for client in list(self.clients):
+                client.send(frame.raw)
+
+    def _on_log_data(self, data: bytes):
+        # Fan out whole lines only, so late joiners never start mid-line
+        self._log_pending += data
+        end = self._log_pending.rfind(b'\n')
+        if len(self._log_pending) - end - 1 > MAX_LOG_LINE:
+            # No line end for far longer than any firmware line (wrong baudrate?):
+            # pass the bytes on rather than buffer them without bound
+            end = len(self._log_pending) - 1
+            self.log_overflows += 1
+        if end < 0:
+            return
+        lines = bytes(self._log_pending[:end + 1])
+        del self._log_pending[:end + 1]
+        for client in list(self.log_clients):
+            client.send(lines)
+
+    def _on_serial_error(self, error: Exception):
+        self.logger.error(f"Serial port failed: {error}")
+        asyncio.ensure_future(self.stop())
@@ -0,0 +1,328 @@
+"""
+RS485 Bus Poll Scheduler
+========================
+
+Poll many ``(module_function, module_id)`` targets sharing one
+half-duplex RS485 bus.
+
+- Strictly one request is outstanding at a time: the bus is half-duplex
+  and the modules share it, so the next poll is only sent once the
+  previous one was answered or timed out.
+- Each target has its own poll interval and a priority class; when
+  several targets are due, the highest class goes first, then the one
+  that has been waiting longest.
+- Each target learns its response timeout from observed round trips
+  (smoothed RTT plus four variances, see ``utils.timeouts``), so a slow
+  module does not force a long timeout on fast ones.
+- After ``dead_after`` consecutive timeouts a target is marked dead and
+  polled with exponential backoff, so one missing module costs a single
+  timeout now and then instead of one per interval.
+
+Example (the gateway answers the TX/RX frequency queries 0x20 and 0x21)::
+
+    scheduler = BusScheduler(manager.request, on_response=print)
+    scheduler.add(0x05, 1, 0x20, interval=1.0)
+    scheduler.add(0x05, 2, 0x21, interval=1.0, priority=PRIORITY_LOW)
+    scheduler.start()
+
+Author: Assistant
+Date: October 2025
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import Future, wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .protocol import Frame
+from .timeouts import DEFAULT_GRANULARITY, RttEstimator
+
+# Priority classes, polled in this order when several targets are due
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+PRIORITIES = (PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW)
+
+# Submit signature: (module_function, module_id, command, data, timeout, retries) -> Future or None
+SubmitFunction = Callable[[int, int, int, Optional[bytes], Optional[float], Optional[int]], Optional[Future]]
+
+
+class PollTarget:
+    """One polled module command and what has been learned about it."""
+
+    __slots__ = ('module_function', 'module_id', 'command', 'data', 'interval', 'priority', 'name',
+                 'rtt', 'timeout', 'failures', 'dead', 'next_due', 'removed',
+                 'polls', 'responses', 'timeouts', 'last_frame')
+
+    def __init__(self, module_function: int, module_id: int, command: int, data: Optional[bytes],
+                 interval: float, priority: int, name: str, timeout: float):
+        self.module_function = module_function
+        self.module_id = module_id
+        self.command = command
+        self.data = data
+        self.interval = interval
+        self.priority = priority
+        self.name = name
+
+        self.rtt = RttEstimator()
+        self.timeout = timeout
+        self.failures = 0                      # Consecutive timeouts
+        self.dead = False
+        self.next_due = 0.0
+        self.removed = False
+
+        # Statistics
+        self.polls = 0
+        self.responses = 0
+        self.timeouts = 0
+        self.last_frame: Optional[Frame] = None
+
+    @property
+    def srtt(self) -> Optional[float]:
+        """Smoothed round trip in seconds, None until the target answered."""
+        return self.rtt.srtt
+
+    @property
+    def address(self) -> Tuple[int, int]:
+        return (self.module_function, self.module_id)
+
+    def __repr__(self) -> str:
+        state = 'dead' if self.dead else 'alive'
+        srtt = f"{self.srtt * 1000:.1f} ms" if self.srtt is not None else '-'
+        return f"<PollTarget {self.name} {state} srtt={srtt} timeout={self.timeout * 1000:.0f} ms>"
+
+
+class BusScheduler:
+    """Priority/interval poll scheduler with one outstanding request per bus."""
+
+    def __init__(self, submit: SubmitFunction,
+                 on_response: Optional[Callable[[PollTarget, Frame], None]] = None,
+                 on_state_change: Optional[Callable[[PollTarget, bool], None]] = None,
+                 initial_timeout: float = 0.5, min_timeout: float = 0.02, max_timeout: float = 2.0,
+                 granularity: float = DEFAULT_GRANULARITY, dead_after: int = 3, max_backoff: float = 60.0):
+        """
+        Args:
+            submit: Request function, e.g. ``RequestCorrelator.submit`` or ``SerialManager.request``
+            on_response: Called with each answered poll (scheduler thread)
+            on_state_change: Called with ``(target, alive)`` when a target dies or recovers
+            initial_timeout: Timeout before any round trip was measured
+            min_timeout: Lower bound for learned timeouts
+            max_timeout: Upper bound for learned timeouts
+            granularity: Lower bound for the variance margin of learned timeouts
+            dead_after: Consecutive timeouts before a target is considered dead
+            max_backoff: Longest wait between polls of a dead target, in seconds
+        """
+        self.submit = submit
+        self.on_response = on_response
+        self.on_state_change = on_state_change
+        self.initial_timeout = initial_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.granularity = granularity
+        self.dead_after = dead_after
+        self.max_backoff = max_backoff
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        # One heap per priority class, ordered by due time
+        self._queues: Dict[int, List[Tuple[float, int, PollTarget]]] = {p: [] for p in PRIORITIES}
+        self._order = itertools.count()
+        self._targets: List[PollTarget] = []
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._current: Optional[Future] = None
+
+        # Statistics
+        self.polls = 0
+        self.responses = 0
+        self.timeouts = 0
+        self.busy_time = 0.0
+
+    @property
+    def targets(self) -> List[PollTarget]:
+        return list(self._targets)
+
+    def add(self, module_function: int, module_id: int, command: int, data: Optional[bytes] = None,
+            interval: float = 1.0, priority: int = PRIORITY_NORMAL, name: Optional[str] = None) -> PollTarget:
+        """
+        Add a target; it is first polled right away.
+
+        Args:
+            module_function: Target module function
+            module_id: Target module id
+            command: Command to poll
+            data: Optional payload
+            interval: Seconds between polls while the target answers
+            priority: PRIORITY_HIGH, PRIORITY_NORMAL or PRIORITY_LOW
+            name: Label for logs, defaults to "function:id/0xCMD"
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority class: {priority}")
+        name = name or f"{module_function}:{module_id}/0x{command:02X}"
+        target = PollTarget(module_function, module_id, command, data, interval, priority, name,
+                            self.initial_timeout)
+        with self._cond:
+            self._targets.append(target)
+            self._push(target, time.monotonic())
+            self._cond.notify()
+        return target
+
+    def remove(self, target: PollTarget):
+        """Stop polling a target."""
+        with self._cond:
+            target.removed = True
+            if target in self._targets:
+                self._targets.remove(target)
+
+    def start(self):
+        """Start polling on a background thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='bus-scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        """Stop polling and cancel the outstanding request."""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        current = self._current
+        if current is not None:
+            current.cancel()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def run_once(self, block: bool = True, timeout: Optional[float] = None) -> Optional[PollTarget]:
+        """
+        Poll the next due target, waiting for it if ``block``.
+
+        Args:
+            block: Wait until a target is due
+            timeout: Longest wait in seconds; without one, an empty scheduler
+                returns at once unless the background thread is running
+
+        Returns:
+            The polled target, or None if nothing was due (non-blocking or
+            within ``timeout``), no target is registered, or the scheduler
+            was stopped
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                target, wait_time = self._next_due(now)
+                if target is not None:
+                    break
+                if not block or (self._thread is not None and not self._running):
+                    return None
+                if deadline is not None:
+                    if now >= deadline:
+                        return None
+                    wait_time = deadline - now if wait_time is None else min(wait_time, deadline - now)
+                elif wait_time is None and not self._running:
+                    # Nothing registered and no scheduler thread: nothing would ever become due
+                    return None
+                self._cond.wait(wait_time)
+        self._poll(target)
+        return target
+
+    def _run(self):
+        while self._running:
+            self.run_once()
+
+    def _push(self, target: PollTarget, due: float):
+        target.next_due = due
+        heapq.heappush(self._queues[target.priority], (due, next(self._order), target))
+
+    def _next_due(self, now: float) -> Tuple[Optional[PollTarget], Optional[float]]:
+        """Pop the target to poll now, or return how long to wait. Caller holds the lock."""
+        earliest = None
+        for priority in PRIORITIES:
+            queue = self._queues[priority]
+            while queue and queue[0][2].removed:
+                heapq.heappop(queue)
+            if not queue:
+                continue
+            due = queue[0][0]
+            if due <= now:
+                return heapq.heappop(queue)[2], None
+            earliest = due if earliest is None else min(earliest, due)
+        return None, None if earliest is None else earliest - now
+
+    def _poll(self, target: PollTarget):
+        started = time.monotonic()
+        future = self.submit(target.module_function, target.module_id, target.command, target.data,
+                             target.timeout, 0)
+        if future is None:
+            # Port not available: try again next interval without blaming the target
+            with self._cond:
+                if not target.removed:
+                    self._push(target, started + target.interval)
+            return
+
+        self._current = future
+        target.polls += 1
+        self.polls += 1
+        # The correlator enforces the timeout; the margin only guards against a stuck future
+        wait([future], timeout=target.timeout + 1.0)
+        self._current = None
+        finished = time.monotonic()
+        self.busy_time += finished - started
+
+        frame = None
+        if future.done() and not future.cancelled() and future.exception() is None:
+            frame = future.result()
+        elif future.cancelled() and not self._running:
+            # Stopped mid-poll: poll again first thing if restarted
+            with self._cond:
+                if not target.removed:
+                    self._push(target, finished)
+            return
+
+        if frame is not None:
+            self._on_success(target, frame, finished - started)
+        else:
+            self._on_failure(target)
+
+        with self._cond:
+            if not target.removed:
+                self._push(target, finished + self._delay(target))
+
+    def _delay(self, target: PollTarget) -> float:
+        if not target.dead:
+            return target.interval
+        # Exponential backoff for dead targets
+        exponent = target.failures - self.dead_after
+        return min(target.interval * (2 ** exponent), self.max_backoff)
+
+    def _on_success(self, target: PollTarget, frame: Frame, rtt: float):
+        target.responses += 1
+        self.responses += 1
+        target.last_frame = frame
+        target.rtt.update(rtt)
+        target.timeout = min(max(target.rtt.rto(self.granularity), self.min_timeout), self.max_timeout)
+        target.failures = 0
+        if target.dead:
+            target.dead = False
+            self.logger.info(f"{target.name} is answering again")
+            if self.on_state_change is not None:
+                self.on_state_change(target, True)
+        if self.on_response is not None:
+            self.on_response(target, frame)
+
+    def _on_failure(self, target: PollTarget):
+        target.timeouts += 1
+        self.timeouts += 1
+        target.failures += 1
+        if not target.dead and target.failures >= self.dead_after:
+            target.dead = True
+            self.logger.warning(f"{target.name} did not answer {target.failures} polls, backing off")
+            if self.on_state_change is not None:
+                self.on_state_change(target, False)
+        # The learned timeout is kept: a lost reply says nothing about the round trip,
+        # and widening it would make every poll of a dead module cost more bus time
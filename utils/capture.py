@@ -0,0 +1,354 @@
+"""
+Serial Capture Format
+=====================
+
+Compact binary recording of serial traffic, one record per read or write,
+with a block index so large captures can be opened with ``mmap`` and
+sought by time.
+
+File layout (all integers little-endian)::
+
+    header   magic "LGWCAP\\r\\n", version u16, reserved u16, wall clock ns i64,
+             monotonic ns i64 (version 2)
+    records  timestamp ns i64, direction u8, port id u8, length u32, data
+    index    per block: file offset u64, first/last timestamp i64, record count u32
+    footer   index offset u64, block count u32, magic "LGWCAPIX"
+
+Timestamps come from ``time.monotonic_ns()``; the header keeps the wall
+and monotonic clocks at creation to place them in real time (version 1
+files only have the wall clock, taken as the time of the first record).
+A capture that was not
+closed cleanly has no index and is scanned once on open instead.
+
+Author: Assistant
+Date: October 2025
+"""
+
+import bisect
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import BinaryIO, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from .protocol import Frame, FrameDecoder
+
+MAGIC = b'LGWCAP\r\n'
+INDEX_MAGIC = b'LGWCAPIX'
+VERSION = 2
+
+DIRECTION_RX = 0
+DIRECTION_TX = 1
+
+DEFAULT_BLOCK_SIZE = 64 * 1024
+
+_HEADER_V1 = struct.Struct('<8sHHq')
+_HEADER = struct.Struct('<8sHHqq')
+_RECORD = struct.Struct('<qBBI')
+_INDEX_ENTRY = struct.Struct('<QqqI')
+_FOOTER = struct.Struct('<QI8s')
+
+
+class CaptureRecord(NamedTuple):
+    """One captured read or write."""
+
+    timestamp: int      # time.monotonic_ns() at capture
+    direction: int      # DIRECTION_RX or DIRECTION_TX
+    port_id: int
+    data: bytes
+
+
+class BlockIndexEntry(NamedTuple):
+    """Location and time span of one block of records."""
+
+    offset: int
+    first_timestamp: int
+    last_timestamp: int
+    count: int
+
+
+class CaptureWriter:
+    """Append records to a capture file. Safe to call from several threads."""
+
+    def __init__(self, path: str, block_size: int = DEFAULT_BLOCK_SIZE):
+        """
+        Args:
+            path: Capture file to create (overwritten if it exists)
+            block_size: Bytes of records per index block
+        """
+        self.path = path
+        self.block_size = block_size
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._lock = threading.Lock()
+        self._file: Optional[BinaryIO] = open(path, 'wb')
+        self._file.write(_HEADER.pack(MAGIC, VERSION, 0, time.time_ns(), time.monotonic_ns()))
+        self._offset = _HEADER.size
+        self._index: List[BlockIndexEntry] = []
+        self._block: Optional[List[int]] = None   # [offset, first_ts, last_ts, count]
+
+        # Statistics
+        self.records = 0
+        self.bytes_captured = 0
+
+    def write(self, data: bytes, direction: int = DIRECTION_RX, port_id: int = 0,
+              timestamp: Optional[int] = None):
+        """Append one record; timestamp defaults to ``time.monotonic_ns()``."""
+        if timestamp is None:
+            timestamp = time.monotonic_ns()
+        with self._lock:
+            if self._file is None:
+                return
+            block = self._block
+            if block is None:
+                block = self._block = [self._offset, timestamp, timestamp, 0]
+            block[2] = timestamp
+            block[3] += 1
+
+            self._file.write(_RECORD.pack(timestamp, direction, port_id, len(data)))
+            self._file.write(data)
+            self._offset += _RECORD.size + len(data)
+            self.records += 1
+            self.bytes_captured += len(data)
+
+            if self._offset - block[0] >= self.block_size:
+                self._index.append(BlockIndexEntry(*block))
+                self._block = None
+
+    def flush(self):
+        """Flush buffered records to disk."""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self):
+        """Write the block index and footer, then close the file."""
+        with self._lock:
+            if self._file is None:
+                return
+            if self._block is not None:
+                self._index.append(BlockIndexEntry(*self._block))
+                self._block = None
+            index_offset = self._offset
+            for entry in self._index:
+                self._file.write(_INDEX_ENTRY.pack(*entry))
+            self._file.write(_FOOTER.pack(index_offset, len(self._index), INDEX_MAGIC))
+            self._file.close()
+            self._file = None
+        self.logger.info(f"Capture {self.path} closed: {self.records} records, {self.bytes_captured} bytes")
+
+    def __enter__(self) -> 'CaptureWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class CaptureReader:
+    """Memory-mapped, time-indexed access to a capture file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        if size < _HEADER_V1.size:
+            self._file.close()
+            raise ValueError(f"{path} is not a capture file")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, self.wall_time_ns = _HEADER_V1.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a capture file")
+        if version not in (1, VERSION):
+            self.close()
+            raise ValueError(f"Unsupported capture version {version}")
+        self.version = version
+        self._header_size = _HEADER_V1.size if version == 1 else _HEADER.size
+        if size < self._header_size:
+            self.close()
+            raise ValueError(f"{path} is not a capture file")
+        self.monotonic_time_ns: Optional[int] = _HEADER.unpack_from(self._mm, 0)[4] if version > 1 else None
+
+        self.index: List[BlockIndexEntry] = []
+        self._end = size
+        if not self._read_index(size):
+            self.logger.warning(f"{path} has no index (capture not closed?), scanning records")
+            self._rebuild_index(size)
+        self._first_timestamps = [entry.first_timestamp for entry in self.index]
+
+    def _read_index(self, size: int) -> bool:
+        if size < self._header_size + _FOOTER.size:
+            return False
+        index_offset, count, magic = _FOOTER.unpack_from(self._mm, size - _FOOTER.size)
+        if magic != INDEX_MAGIC or index_offset + count * _INDEX_ENTRY.size + _FOOTER.size != size:
+            return False
+        self.index = [BlockIndexEntry(*_INDEX_ENTRY.unpack_from(self._mm, index_offset + i * _INDEX_ENTRY.size))
+                      for i in range(count)]
+        self._end = index_offset
+        return True
+
+    def _rebuild_index(self, size: int, block_size: int = DEFAULT_BLOCK_SIZE):
+        """Scan records into blocks, dropping a truncated trailing record."""
+        mm = self._mm
+        pos = self._header_size
+        block = None
+        while pos + _RECORD.size <= size:
+            timestamp, _, _, length = _RECORD.unpack_from(mm, pos)
+            if pos + _RECORD.size + length > size:
+                break
+            if block is None:
+                block = [pos, timestamp, timestamp, 0]
+            block[2] = timestamp
+            block[3] += 1
+            pos += _RECORD.size + length
+            if pos - block[0] >= block_size:
+                self.index.append(BlockIndexEntry(*block))
+                block = None
+        if block is not None:
+            self.index.append(BlockIndexEntry(*block))
+        self._end = pos
+
+    @property
+    def record_count(self) -> int:
+        return sum(entry.count for entry in self.index)
+
+    @property
+    def start_time(self) -> Optional[int]:
+        """Monotonic timestamp of the first record, in ns."""
+        return self.index[0].first_timestamp if self.index else None
+
+    @property
+    def end_time(self) -> Optional[int]:
+        """Monotonic timestamp of the last record, in ns."""
+        return self.index[-1].last_timestamp if self.index else None
+
+    @property
+    def duration(self) -> float:
+        """Seconds between the first and last record."""
+        if not self.index:
+            return 0.0
+        return (self.end_time - self.start_time) / 1e9
+
+    def to_wall_time(self, timestamp: int) -> float:
+        """Unix time in seconds of a record timestamp."""
+        origin = self.monotonic_time_ns
+        if origin is None:
+            origin = self.start_time if self.index else timestamp
+        return (self.wall_time_ns + timestamp - origin) / 1e9
+
+    def _records_from(self, pos: int) -> Iterator[CaptureRecord]:
+        mm = self._mm
+        end = self._end
+        unpack = _RECORD.unpack_from
+        header_size = _RECORD.size
+        while pos < end:
+            timestamp, direction, port_id, length = unpack(mm, pos)
+            start = pos + header_size
+            pos = start + length
+            yield CaptureRecord(timestamp, direction, port_id, mm[start:pos])
+
+    def records(self, start: Optional[int] = None, end: Optional[int] = None) -> Iterator[CaptureRecord]:
+        """
+        Iterate records, optionally limited to a time range.
+
+        Args:
+            start: First monotonic timestamp (ns) to include; found via the block index
+            end: Stop before records later than this timestamp (ns)
+        """
+        if not self.index:
+            return
+        offset = self.index[0].offset
+        if start is not None:
+            block = max(0, bisect.bisect_right(self._first_timestamps, start) - 1)
+            offset = self.index[block].offset
+        for record in self._records_from(offset):
+            if start is not None and record.timestamp < start:
+                continue
+            if end is not None and record.timestamp > end:
+                return
+            yield record
+
+    def seek_seconds(self, seconds: float) -> Iterator[CaptureRecord]:
+        """Iterate records starting ``seconds`` after the first one."""
+        if not self.index:
+            return iter(())
+        return self.records(start=self.start_time + int(seconds * 1e9))
+
+    def __iter__(self) -> Iterator[CaptureRecord]:
+        return self.records()
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self) -> 'CaptureReader':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class CaptureReplayer:
+    """
+    Feed captured bytes into frame decoders, one per port and direction.
+
+    With ``speed=None`` records are replayed as fast as possible; otherwise
+    the original timing is reproduced, scaled by ``speed`` (2.0 = twice
+    as fast).
+    """
+
+    def __init__(self, reader: CaptureReader, speed: Optional[float] = None,
+                 direction: Optional[int] = DIRECTION_RX, port_id: Optional[int] = None):
+        """
+        Args:
+            reader: Open capture
+            speed: Real-time factor, or None for maximum speed
+            direction: Only replay this direction, or None for both
+            port_id: Only replay this port, or None for all
+        """
+        self.reader = reader
+        self.speed = speed
+        self.direction = direction
+        self.port_id = port_id
+        self.decoders: Dict[Tuple[int, int], FrameDecoder] = {}
+
+    def frames(self, start: Optional[int] = None, end: Optional[int] = None) -> Iterator[Tuple[CaptureRecord, Frame]]:
+        """Yield ``(record, frame)`` for every frame completed by a record."""
+        origin = None
+        wall_origin = time.monotonic()
+        for record in self.reader.records(start, end):
+            if self.direction is not None and record.direction != self.direction:
+                continue
+            if self.port_id is not None and record.port_id != self.port_id:
+                continue
+
+            if self.speed:
+                if origin is None:
+                    origin = record.timestamp
+                delay = (record.timestamp - origin) / 1e9 / self.speed - (time.monotonic() - wall_origin)
+                if delay > 0:
+                    time.sleep(delay)
+
+            key = (record.port_id, record.direction)
+            decoder = self.decoders.get(key)
+            if decoder is None:
+                decoder = self.decoders[key] = FrameDecoder()
+            for frame in decoder.feed(record.data):
+                yield record, frame
+
+    def replay(self, on_frame: Callable[[CaptureRecord, Frame], None], start: Optional[int] = None,
+               end: Optional[int] = None) -> int:
+        """
+        Call ``on_frame`` for every decoded frame.
+
+        Returns:
+            Number of frames replayed
+        """
+        count = 0
+        for record, frame in self.frames(start, end):
+            on_frame(record, frame)
+            count += 1
+        return count
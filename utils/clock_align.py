@@ -0,0 +1,385 @@
+"""
+Firmware Clock Alignment
+========================
+
+Map firmware ``HAL_GetTick()`` milliseconds to host Unix time, so firmware
+log lines, host frame captures and GUI actions can be merged into one
+timeline.
+
+The firmware tick drifts against the host clock (crystal tolerance, tens
+of ppm) and restarts from zero on every reboot. The stream is therefore
+cut into one ``ClockSegment`` per boot, and each segment gets its own
+linear fit::
+
+    host_time = offset + rate * (tick - first_tick)
+
+A new segment starts when the tick goes backwards (reset) or at the
+``=== LoRa Gateway Starting ===`` line. Ticks that wrap at 2**32 ms
+(49.7 days) are unwrapped instead.
+
+Matched events are (tick, host time) pairs of the same moment:
+
+- Every stored log line: the firmware tick and the time the host
+  received the line, less the line's own wire time on the log UART. The
+  host side is still late by whatever the firmware had queued.
+- UART2 receive dumps (``U2 RX[n]:``) matched by their bytes to frames
+  the host wrote in a capture. The host side is the write time plus the
+  wire time, which is much tighter.
+
+Only the earliest sample per ``bucket_ms`` of ticks is kept (the least
+delayed one), so memory stays bounded over weeks of log. The fit is a
+least-squares line through those samples, shifted down onto their lower
+envelope so that no event is placed after the host received it.
+
+Example::
+
+    aligner = ClockAligner()
+    host_times = aligner.align(store.query(), capture_frames(reader))
+    for segment in aligner.segments:
+        print(segment.boot, f"{segment.drift_ppm:+.1f} ppm")
+
+Author: Assistant
+Date: October 2025
+"""
+
+import bisect
+import json
+import logging
+import re
+from datetime import datetime
+from itertools import chain
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from .capture import DIRECTION_TX, CaptureReader, CaptureReplayer
+from .command_registry import REGISTRY, RequestKinds, request_kind
+from .log_store import LogRecord
+from .timeouts import wire_time
+
+BOOT_MARKER = '=== LoRa Gateway Starting ==='
+
+TICK_WRAP = 1 << 32
+
+# Host seconds per firmware tick before any fit
+NOMINAL_RATE = 1e-3
+
+DEFAULT_BUCKET_MS = 10000
+
+# A marker within this many ms of a segment's first tick belongs to that boot
+BOOT_WINDOW_MS = 5000
+
+# Longest time between a frame in the capture and the log line that dumps it
+MAX_FRAME_SKEW = 2.0
+
+# "[%08lu] LVL:SRC " plus CR LF around the message
+LINE_OVERHEAD = 21
+
+DUMP_PATTERN = re.compile(r'RX\[(\d+)\]: ((?:[0-9A-F]{2} ?)+)$')
+
+FrameTimes = Dict[Tuple[int, bytes], List[float]]
+
+
+class ClockSegment:
+    """Tick-to-host mapping of one firmware boot."""
+
+    __slots__ = ('boot', 'first_tick', 'last_tick', 'first_host', 'last_host', 'offset', 'rate',
+                 'samples', 'marker_seen', 'bucket_ms', '_buckets', '_fitted')
+
+    def __init__(self, boot: int, bucket_ms: int = DEFAULT_BUCKET_MS):
+        self.boot = boot
+        self.bucket_ms = bucket_ms
+        self.first_tick: Optional[int] = None
+        self.last_tick: Optional[int] = None
+        self.first_host: Optional[float] = None
+        self.last_host: Optional[float] = None
+        self.offset = 0.0
+        self.rate = NOMINAL_RATE
+        self.samples = 0
+        self.marker_seen = False
+        self._buckets: Dict[int, Tuple[int, float]] = {}
+        self._fitted = False
+
+    def add(self, tick: int, host_time: float):
+        """Add a matched event; ``tick`` must already be unwrapped."""
+        if self.first_tick is None:
+            self.first_tick = self.last_tick = tick
+            self.first_host = self.last_host = host_time
+        else:
+            self.last_tick = max(self.last_tick, tick)
+            self.first_host = min(self.first_host, host_time)
+            self.last_host = max(self.last_host, host_time)
+        self.samples += 1
+        self._fitted = False
+
+        # Keep the least delayed sample of each bucket
+        key = tick // self.bucket_ms
+        kept = self._buckets.get(key)
+        if kept is None or host_time - tick * NOMINAL_RATE < kept[1] - kept[0] * NOMINAL_RATE:
+            self._buckets[key] = (tick, host_time)
+
+    def fit(self):
+        """Fit ``offset`` and ``rate`` to the kept samples."""
+        points = list(self._buckets.values())
+        if not points:
+            return
+        # Centre both axes to keep the sums well conditioned
+        x0, y0 = self.first_tick, points[0][1]
+        xs = [tick - x0 for tick, _ in points]
+        ys = [host - y0 for _, host in points]
+        n = len(points)
+        mean_x = sum(xs) / n
+        mean_y = sum(ys) / n
+        sxx = sum((x - mean_x) ** 2 for x in xs)
+        if n >= 2 and sxx > 0:
+            rate = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / sxx
+        else:
+            rate = NOMINAL_RATE
+        intercept = mean_y - rate * mean_x
+        # Lower envelope: no sample may end up before its mapped time
+        intercept += min(y - (intercept + rate * x) for x, y in zip(xs, ys))
+        self.rate = rate
+        self.offset = y0 + intercept
+        self._fitted = True
+
+    def to_host(self, tick: int) -> float:
+        """Host Unix time of an (unwrapped) tick of this boot."""
+        if not self._fitted:
+            self.fit()
+        # The envelope runs along the start of each tick; events fall anywhere within it
+        return self.offset + self.rate * (tick + 0.5 - self.first_tick)
+
+    def residuals(self) -> List[float]:
+        """Host time minus the start of each kept sample's tick, in seconds."""
+        return [host - self.to_host(tick - 0.5) for tick, host in self._buckets.values()]
+
+    @property
+    def drift_ppm(self) -> float:
+        """Firmware clock error in ppm; positive when the firmware runs slow."""
+        if not self._fitted:
+            self.fit()
+        return (self.rate / NOMINAL_RATE - 1) * 1e6
+
+    @property
+    def boot_time(self) -> Optional[float]:
+        """Host time at which this boot's tick was zero."""
+        if self.first_tick is None:
+            return None
+        return self.to_host(0)
+
+
+class ClockAligner:
+    """Split a firmware log into boots and align each boot's ticks to host time."""
+
+    def __init__(self, bucket_ms: int = DEFAULT_BUCKET_MS, log_baudrate: int = 115200,
+                 max_frame_skew: float = MAX_FRAME_SKEW):
+        """
+        Args:
+            bucket_ms: Tick span per kept sample
+            log_baudrate: Baudrate of the log UART, to remove each line's wire time
+            max_frame_skew: Longest time in seconds between a captured frame
+                and the log line that dumps it
+        """
+        self.bucket_ms = bucket_ms
+        self.log_baudrate = log_baudrate
+        self.max_frame_skew = max_frame_skew
+        self.segments: List[ClockSegment] = []
+        self.boots: List[Optional[int]] = []
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._previous_tick: Optional[int] = None
+        self._wrap_base = 0
+        self._reset_opened = False
+
+        # Statistics
+        self.reboots = 0
+        self.wraps = 0
+        self.frame_matches = 0
+
+    def _new_segment(self) -> ClockSegment:
+        segment = ClockSegment(len(self.segments), self.bucket_ms)
+        self.segments.append(segment)
+        self._wrap_base = 0
+        return segment
+
+    def track(self, tick: int, boot_marker: bool = False) -> Tuple[int, int]:
+        """
+        Place a tick in the stream, detecting reboots and wraps.
+
+        Ticks must be passed in the order the firmware logged them.
+
+        Args:
+            tick: Raw firmware tick in ms
+            boot_marker: The line is the firmware start-up marker
+
+        Returns:
+            ``(segment index, unwrapped tick)``
+        """
+        previous = self._previous_tick
+        self._previous_tick = tick
+        if not self.segments:
+            self._new_segment()
+            self._reset_opened = True
+        elif previous is not None and tick < previous:
+            if previous - tick > TICK_WRAP // 2:
+                self._wrap_base += TICK_WRAP
+                self.wraps += 1
+            else:
+                self._new_segment()
+                self._reset_opened = True
+                self.reboots += 1
+        segment = self.segments[-1]
+        unwrapped = tick + self._wrap_base
+
+        if boot_marker:
+            # The boot's first lines may come before its marker; those already opened the segment
+            same_boot = (not segment.marker_seen and self._reset_opened
+                         and (segment.first_tick is None or unwrapped - segment.first_tick <= BOOT_WINDOW_MS))
+            if not same_boot:
+                segment = self._new_segment()
+                self.reboots += 1
+            segment.marker_seen = True
+            self._reset_opened = False
+        return segment.boot, unwrapped
+
+    def add(self, tick: int, host_time: float, boot_marker: bool = False) -> Tuple[int, int]:
+        """Track a tick and add it as a matched event; returns ``track()``'s result."""
+        boot, unwrapped = self.track(tick, boot_marker)
+        self.segments[boot].add(unwrapped, host_time)
+        return boot, unwrapped
+
+    def _match_frame(self, record: LogRecord, frames: FrameTimes) -> Optional[float]:
+        match = DUMP_PATTERN.search(record.message)
+        if match is None:
+            return None
+        data = bytes.fromhex(match.group(2))
+        if len(data) != int(match.group(1)):
+            return None   # Dump truncated by the firmware
+        # Only firmware receptions: the host write is certain to come before the log line
+        times = frames.get((DIRECTION_TX, data))
+        if not times:
+            return None
+        # Latest frame before the log line arrived
+        index = bisect.bisect_right(times, record.host_time) - 1
+        if index < 0 or record.host_time - times[index] > self.max_frame_skew:
+            return None
+        return times[index]
+
+    def align(self, records: Sequence[LogRecord], frames: Optional[FrameTimes] = None) -> List[Optional[float]]:
+        """
+        Fit every boot in ``records`` and map each record to host time.
+
+        Args:
+            records: Stored log records in reception order
+            frames: Frame event times from ``capture_frames()``, to match
+                against UART2 frame dumps
+
+        Returns:
+            Aligned host time per record (None for non-logger lines);
+            the boot of each record is left in ``boots``
+        """
+        placed: List[Optional[Tuple[int, int]]] = []
+        for record in records:
+            if record.tick is None:
+                placed.append(None)
+                continue
+            sent = record.host_time - wire_time(len(record.message) + LINE_OVERHEAD, self.log_baudrate)
+            boot, tick = self.add(record.tick, sent, BOOT_MARKER in record.message)
+            placed.append((boot, tick))
+            if frames and record.source == 'U2':
+                frame_time = self._match_frame(record, frames)
+                if frame_time is not None:
+                    self.segments[boot].add(tick, frame_time)
+                    self.frame_matches += 1
+        for segment in self.segments:
+            segment.fit()
+        self.logger.info(f"Aligned {len(records)} records: {len(self.segments)} boots, "
+                         f"{self.frame_matches} frame matches")
+        self.boots = [None if place is None else place[0] for place in placed]
+        return [None if place is None else self.segments[place[0]].to_host(place[1]) for place in placed]
+
+
+def capture_frames(reader: CaptureReader, baudrate: int = 115200) -> FrameTimes:
+    """
+    Host times at which each captured frame passed the firmware's UART.
+
+    Frames the host wrote reached the firmware one wire time after the
+    write; frames the host read left the firmware one wire time before
+    they were read.
+
+    Returns:
+        ``{(direction, frame bytes): sorted host times}``
+    """
+    frames: FrameTimes = {}
+    replayer = CaptureReplayer(reader, direction=None)
+    for record, frame in replayer.frames():
+        duration = wire_time(len(frame.raw), baudrate)
+        host_time = reader.to_wall_time(record.timestamp)
+        host_time += duration if record.direction == DIRECTION_TX else -duration
+        frames.setdefault((record.direction, bytes(frame.raw)), []).append(host_time)
+    for times in frames.values():
+        times.sort()
+    return frames
+
+
+class TimelineEvent(NamedTuple):
+    """One entry of a merged timeline."""
+
+    host_time: float
+    origin: str     # e.g. "LOG", "CAP TX", "GUI"
+    text: str
+
+
+def log_events(records: Sequence[LogRecord], host_times: Sequence[Optional[float]],
+               boots: Optional[Sequence[Optional[int]]] = None) -> Iterator[TimelineEvent]:
+    """Timeline events of aligned log records (reception time for non-logger lines)."""
+    for index, (record, host_time) in enumerate(zip(records, host_times)):
+        if record.tick is None:
+            yield TimelineEvent(record.host_time, 'LOG', record.message)
+            continue
+        tag = f"#{boots[index]} " if boots else ''
+        yield TimelineEvent(host_time, 'LOG', f"{tag}{record.level}:{record.source:3s} {record.message}")
+
+
+def frame_events(reader: CaptureReader) -> Iterator[TimelineEvent]:
+    """Timeline events of every frame in a capture."""
+    kinds = RequestKinds()
+    for record, frame in CaptureReplayer(reader, direction=None).frames():
+        key = (record.port_id, frame.module_function, frame.module_id, frame.command)
+        if record.direction == DIRECTION_TX:
+            origin, kind = 'CAP TX', kinds.request(key, request_kind(frame.payload))
+        else:
+            origin, kind = 'CAP RX', kinds.response(key)
+        name = REGISTRY.command_name(frame.command, frame.module_function, kind)
+        yield TimelineEvent(reader.to_wall_time(record.timestamp), origin,
+                            f"{name} {frame.module_function}:{frame.module_id} {frame.raw.hex(' ').upper()}")
+
+
+def host_log_events(path: str, origin: str = 'GUI') -> Iterator[TimelineEvent]:
+    """
+    Timeline events of a host application log written by ``setup_logging``.
+
+    Reads both the JSON-lines format and the text format
+    (``YYYY-MM-DD HH:MM:SS[,mmm] - name - LEVEL - message``).
+    """
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if line.startswith('{'):
+                try:
+                    entry = json.loads(line)
+                    host_time = datetime.fromisoformat(entry['time']).timestamp()
+                except (ValueError, KeyError):
+                    continue
+                yield TimelineEvent(host_time, origin, f"{entry.get('level', '')} {entry.get('message', '')}")
+                continue
+            stamp, sep, rest = line.partition(' - ')
+            if not sep:
+                continue
+            try:
+                host_time = datetime.fromisoformat(stamp.replace(',', '.')).timestamp()
+            except ValueError:
+                continue
+            yield TimelineEvent(host_time, origin, rest)
+
+
+def merge_timelines(*streams: Iterable[TimelineEvent]) -> List[TimelineEvent]:
+    """Merge event streams into one list ordered by host time."""
+    return sorted(chain.from_iterable(streams), key=lambda event: event.host_time)
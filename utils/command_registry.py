@@ -0,0 +1,400 @@
+"""
+Command Registry
+================
+
+Single table of gateway commands keyed by ``(module_function, command)``,
+built once at import time, with precompiled ``struct.Struct`` codecs for
+every configurable parameter.
+
+Command codes are only unique within a module function: 0x20, 0x23 and
+0x24 are LoRa queries on the gateway but LTEL attenuation/power settings
+on VLAD modules. Entries registered with ``module_function=None`` are the
+gateway command set and apply to any module function without a more
+specific entry.
+
+The module function alone does not tell the two apart: a module function
+5 host still queries the gateway's LoRa settings. Responses are therefore
+resolved with the kind of the request they answer (``request_kind``), and
+a module-specific SET entry only applies to SETs and their acks.
+
+Author: Assistant
+Date: October 2025
+"""
+
+import logging
+import struct
+from typing import Callable, Dict, Hashable, List, NamedTuple, Optional, Tuple
+
+# Module Functions
+MODULE_FUNCTION_SERVER = 0x00
+MODULE_FUNCTION_VLAD = 0x05
+MODULE_FUNCTION_SNIFFER = 0x10
+
+# Command kinds
+KIND_QUERY = 'query'
+KIND_SET = 'set'
+KIND_EVENT = 'event'
+KIND_CONTROL = 'control'
+
+
+class ParameterCodec:
+    """Precompiled encoder/decoder for one parameter data type."""
+
+    # data_type -> (struct format, scale from host value to wire value)
+    FORMATS = {
+        'uint8': ('B', None),
+        'int8': ('b', None),
+        'uint16': ('<H', None),
+        'uint32': ('<I', None),
+        'float_mhz': ('<f', 1e6),   # Host value in Hz, wire value float MHz
+    }
+
+    __slots__ = ('data_type', 'size', 'range', 'options', '_struct', '_scale')
+
+    def __init__(self, data_type: str, value_range: Optional[Tuple[int, int]] = None,
+                 options: Optional[List[int]] = None):
+        if data_type not in self.FORMATS:
+            raise ValueError(f"Unsupported data type: {data_type}")
+        fmt, scale = self.FORMATS[data_type]
+        self.data_type = data_type
+        self._struct = struct.Struct(fmt)
+        self._scale = scale
+        self.size = self._struct.size
+        self.range = value_range
+        self.options = options
+
+    def validate(self, value: int) -> int:
+        """Check value against range/options and return it."""
+        if self.range is not None:
+            min_val, max_val = self.range
+            if not (min_val <= value <= max_val):
+                raise ValueError(f"Value must be between {min_val} and {max_val}")
+        if self.options is not None and value not in self.options:
+            raise ValueError(f"Value must be one of {self.options}")
+        return value
+
+    def parse(self, value_str: str) -> int:
+        """Convert user input to a validated host value."""
+        try:
+            value = int(value_str)
+        except ValueError:
+            raise ValueError(f"Cannot convert '{value_str}' to {self.data_type}")
+        return self.validate(value)
+
+    def encode(self, value: int) -> bytes:
+        """Encode a host value into the wire payload."""
+        self.validate(value)
+        try:
+            if self._scale is not None:
+                return self._struct.pack(value / self._scale)
+            return self._struct.pack(value)
+        except struct.error:
+            raise ValueError(f"Cannot convert '{value}' to {self.data_type}")
+
+    def decode(self, payload: bytes) -> Optional[int]:
+        """Decode a wire payload, or return None if it is too short."""
+        if len(payload) < self.size:
+            return None
+        value = self._struct.unpack_from(payload)[0]
+        if self._scale is not None:
+            return int(round(value * self._scale))
+        return value
+
+
+class CommandSpec(NamedTuple):
+    """Registry entry for one command."""
+
+    name: str
+    command: int
+    module_function: Optional[int]
+    kind: str
+    parameter: Optional[str] = None
+    codec: Optional[ParameterCodec] = None
+
+
+# Configurable parameters, in display order
+PARAMETERS = {
+    'module_id': {
+        'name': 'Module ID',
+        'query_cmd': 0x10,
+        'set_cmd': 0x90,
+        'data_type': 'uint8',
+        'range': (1, 255),
+        'cache_ttl': 3600.0,   # Seconds a cached value stays fresh
+        'gateway_answers': False,   # processUartCommand() ignores the query
+        'set_acknowledged': False,  # ... and the SET
+        'description': 'Unique module identifier'
+    },
+    'tx_freq': {
+        'name': 'TX Frequency',
+        'query_cmd': 0x20,
+        'set_cmd': 0xB0,
+        'data_type': 'float_mhz',
+        'range': (145000000, 160000000),   # DOWNLINK_FREQ_MIN/MAX in Lora.hpp
+        'cache_ttl': 3600.0,
+        'description': 'Transmit frequency in Hz'
+    },
+    'rx_freq': {
+        'name': 'RX Frequency',
+        'query_cmd': 0x21,
+        'set_cmd': 0xB1,
+        'data_type': 'float_mhz',
+        'range': (170000000, 185000000),   # UPLINK_FREQ_MIN/MAX in Lora.hpp
+        'cache_ttl': 3600.0,
+        'description': 'Receive frequency in Hz'
+    },
+    'uart_baudrate': {
+        'name': 'UART Baudrate',
+        'query_cmd': 0x22,
+        'set_cmd': 0xB2,
+        'data_type': 'uint32',
+        'options': [9600, 19200, 38400, 57600, 115200, 230400],
+        'cache_ttl': 3600.0,
+        'gateway_answers': False,
+        'set_acknowledged': False,  # SET_UART_BAUDRATE restores the defaults and sends no response
+        'description': 'UART communication speed'
+    },
+    'bandwidth': {
+        'name': 'Bandwidth',
+        'query_cmd': 0x23,
+        'set_cmd': 0xB3,
+        'data_type': 'uint8',
+        'options': [0, 1, 2, 3, 4, 5, 6, 7, 8, 9],
+        'cache_ttl': 3600.0,
+        'description': 'LoRa bandwidth setting'
+    },
+    'spread_factor': {
+        'name': 'Spread Factor',
+        'query_cmd': 0x24,
+        'set_cmd': 0xB4,
+        'data_type': 'uint8',
+        'range': (6, 12),
+        'cache_ttl': 3600.0,
+        'description': 'LoRa spreading factor'
+    },
+    'coding_rate': {
+        'name': 'Coding Rate',
+        'query_cmd': 0x25,
+        'set_cmd': 0xB5,
+        'data_type': 'uint8',
+        'options': [1, 2, 3, 4],
+        'cache_ttl': 3600.0,
+        'description': 'LoRa coding rate'
+    },
+    'output_power': {
+        'name': 'Output Power (dBm)',
+        'query_cmd': 0x26,
+        'set_cmd': None,  # No direct set command
+        'data_type': 'int8',
+        'range': (-20, 20),
+        'cache_ttl': 2.0,   # Measured value, changes continuously
+        'gateway_answers': False,
+        'description': 'RF output power in dBm'
+    },
+    'ltel_attenuation': {
+        'name': 'LTEL Attenuation',
+        'query_cmd': 0x11,
+        'set_cmd': 0x20,
+        'set_module_function': MODULE_FUNCTION_VLAD,
+        'data_type': 'uint8',
+        'range': (0, 63),
+        'cache_ttl': 60.0,
+        'gateway_answers': False,
+        'description': 'LTEL attenuation value'
+    }
+}
+
+# Parameters whose query the gateway firmware answers (all unless marked)
+GATEWAY_PARAMETERS = [key for key, info in PARAMETERS.items() if info.get('gateway_answers', True)]
+
+# Commands without a parameter codec: (name, command, module_function, kind)
+COMMANDS = [
+    ('QUERY_PARAMETER_SIGMA', 0x12, None, KIND_QUERY),
+    ('SET_VLAD_ATTENUATION', 0x13, None, KIND_SET),
+    ('QUERY_MASTER_STATUS', 0x14, None, KIND_QUERY),
+    ('QUERY_PARAMETER_STR', 0x15, None, KIND_QUERY),
+    ('QUERY_PARAMETER_ADC', 0x16, None, KIND_QUERY),
+    ('QUERY_SERVER_PORT', 0x16, MODULE_FUNCTION_SERVER, KIND_QUERY),
+    ('ONE_DETECTION', 0x17, None, KIND_EVENT),
+    ('MULTIPLE_DETECTION', 0x18, None, KIND_EVENT),
+    ('QUERY_OPERATION_MODE', 0x27, None, KIND_QUERY),
+    ('TRIGGER_SNIFFER_SIMULATION', 0x30, None, KIND_CONTROL),
+    ('SET_PARAMETER_FREQOUT', 0x31, None, KIND_SET),
+    ('SET_OPERATION_MODE', 0x40, None, KIND_CONTROL),
+    ('SET_VLAD_SERIAL_FISICA', 0x92, None, KIND_SET),
+    ('SET_OUT', 0xB6, None, KIND_SET),
+    ('SET_AOUT_0_10V', 0xB7, None, KIND_SET),
+    ('SET_AOUT_4_20mA', 0xB8, None, KIND_SET),
+    ('SET_AOUT_0_20mA', 0xB9, None, KIND_SET),
+    ('SET_DOUT1', 0xBA, None, KIND_SET),
+    ('SET_VLAD_MODE', 0xC0, None, KIND_SET),
+    ('SET_PARAMETERS', 0xC2, None, KIND_SET),
+    ('SET_PARAMETER_FREQBASE', 0xC3, None, KIND_SET),
+    ('SET_POUT_MIN', 0x23, MODULE_FUNCTION_VLAD, KIND_SET),
+    ('SET_POUT_MAX', 0x24, MODULE_FUNCTION_VLAD, KIND_SET),
+]
+
+# Names for parameter commands that differ from QUERY_/SET_ + key
+_PARAMETER_COMMAND_NAMES = {
+    ('query', 'ltel_attenuation'): 'QUERY_PARAMETER_LTEL',
+    ('set', 'ltel_attenuation'): 'SET_ATT_LTEL',
+    ('query', 'output_power'): 'QUERY_PARAMETER_PdBm',
+}
+
+
+class CommandRegistry:
+    """Constant-time lookup of command specs by (module_function, command)."""
+
+    def __init__(self):
+        self._commands: Dict[Tuple[Optional[int], int], CommandSpec] = {}
+        self._by_name: Dict[str, CommandSpec] = {}
+        self.codecs: Dict[str, ParameterCodec] = {}
+
+    def register(self, spec: CommandSpec):
+        """Add a command spec; a (module_function, command) pair may only be registered once."""
+        key = (spec.module_function, spec.command)
+        if key in self._commands:
+            raise ValueError(f"Duplicate command 0x{spec.command:02X} for module function {spec.module_function}")
+        self._commands[key] = spec
+        self._by_name[spec.name] = spec
+
+    def register_parameter(self, key: str, info: dict):
+        """Create the codec for a parameter and register its query/set commands."""
+        codec = ParameterCodec(info['data_type'], info.get('range'), info.get('options'))
+        self.codecs[key] = codec
+
+        query_name = _PARAMETER_COMMAND_NAMES.get(('query', key), f"QUERY_{key.upper()}")
+        self.register(CommandSpec(query_name, info['query_cmd'], info.get('query_module_function'),
+                                  KIND_QUERY, key, codec))
+        if info.get('set_cmd') is not None:
+            set_name = _PARAMETER_COMMAND_NAMES.get(('set', key), f"SET_{key.upper()}")
+            self.register(CommandSpec(set_name, info['set_cmd'], info.get('set_module_function'),
+                                      KIND_SET, key, codec))
+
+    def lookup(self, module_function: Optional[int], command: int,
+               kind: Optional[str] = None) -> Optional[CommandSpec]:
+        """
+        Find the spec for a command, falling back to the gateway command set.
+
+        Args:
+            module_function: Module function of the frame
+            command: Command code
+            kind: Kind of the request the frame belongs to; a module-specific
+                SET entry is skipped for any other kind (None accepts any kind)
+        """
+        spec = self._commands.get((module_function, command))
+        if spec is not None and (kind is None or kind == KIND_SET or spec.kind != KIND_SET):
+            return spec
+        if module_function is not None:
+            return self._commands.get((None, command))
+        return None
+
+    def by_name(self, name: str) -> Optional[CommandSpec]:
+        """Find a spec by its command name."""
+        return self._by_name.get(name)
+
+    def command_name(self, command: int, module_function: Optional[int] = None,
+                     kind: Optional[str] = None) -> str:
+        """Get human-readable name for a command code (``kind`` as in ``lookup``)."""
+        spec = self.lookup(module_function, command, kind)
+        return spec.name if spec is not None else f"UNKNOWN_0x{command:02X}"
+
+    def __iter__(self):
+        return iter(self._commands.values())
+
+    def __len__(self):
+        return len(self._commands)
+
+
+def _build_registry() -> CommandRegistry:
+    registry = CommandRegistry()
+    for key, info in PARAMETERS.items():
+        registry.register_parameter(key, info)
+    for name, command, module_function, kind in COMMANDS:
+        registry.register(CommandSpec(name, command, module_function, kind))
+    return registry
+
+
+REGISTRY = _build_registry()
+
+
+def request_kind(data: Optional[bytes]) -> str:
+    """Kind of a parameter request from its payload: SETs carry the value, queries nothing."""
+    return KIND_SET if data else KIND_QUERY
+
+
+class RequestKinds:
+    """
+    Kinds of the requests last seen per key, for naming recorded traffic.
+
+    Captures and logs show requests and their responses as separate frames;
+    a response gets the kind of the last request with the same key.
+    """
+
+    def __init__(self):
+        self._kinds: Dict[Hashable, str] = {}
+
+    def request(self, key: Hashable, kind: str) -> str:
+        """Remember and return the kind of a request."""
+        self._kinds[key] = kind
+        return kind
+
+    def response(self, key: Hashable) -> Optional[str]:
+        """Kind of the last request with this key, None if none was seen."""
+        return self._kinds.get(key)
+
+
+# Handler signature: handler(frame, spec, value)
+Handler = Callable[[object, CommandSpec, Optional[int]], None]
+
+
+class CommandDispatcher:
+    """
+    Route decoded frames to handlers registered by command or parameter name.
+
+    A handler registered for a parameter key (e.g. ``'tx_freq'``) receives
+    both query responses and SET acknowledgements for that parameter, with
+    the payload already decoded by the parameter codec. Values are only
+    decoded for frames that answered a request of known kind.
+    """
+
+    def __init__(self, registry: CommandRegistry = REGISTRY):
+        self.registry = registry
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._handlers: Dict[str, Handler] = {}
+        self._fallback: Optional[Handler] = None
+
+    def on(self, name: str, handler: Handler):
+        """Register handler for a command name or parameter key."""
+        self._handlers[name] = handler
+
+    def on_unhandled(self, handler: Handler):
+        """Register handler for frames with no specific handler."""
+        self._fallback = handler
+
+    def dispatch(self, frame, kind: Optional[str] = None) -> bool:
+        """
+        Dispatch a decoded frame.
+
+        Args:
+            frame: Decoded frame
+            kind: Kind of the request the frame answered, None if unsolicited
+
+        Returns:
+            True if a handler was called
+        """
+        spec = self.registry.lookup(frame.module_function, frame.command, kind)
+        value = None
+        handler = None
+        if spec is not None:
+            handler = self._handlers.get(spec.name)
+            if handler is None and spec.parameter is not None:
+                handler = self._handlers.get(spec.parameter)
+            if spec.codec is not None and kind is not None:
+                value = spec.codec.decode(frame.payload)
+        if handler is None:
+            handler = self._fallback
+        if handler is None:
+            return False
+        handler(frame, spec, value)
+        return True
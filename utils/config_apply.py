@@ -0,0 +1,356 @@
+"""
+Configuration Apply Engine
+==========================
+
+Apply a saved configuration profile to a gateway, writing only the
+parameters that differ from the device.
+
+Every SET on the gateway ends in ``Lora::save_settings()``, which
+rewrites all LoRa settings in EEPROM, so unchanged values cost both bus
+time and EEPROM wear. The engine:
+
+1. reads the current values, from the parameter cache where fresh,
+   otherwise with one batched readout
+2. computes the diff against the profile
+3. sends SETs for the changed values only
+4. verifies them with one batched readback
+
+The firmware defines SET_PARAMETERS (0xC2) but does not handle it, so
+changed values are written one SET at a time. Parameters the gateway
+cannot read back, or whose SET it does not acknowledge, are skipped:
+SET_UART_BAUDRATE restores the default settings without a response, and
+retrying it would reset the device again.
+
+Profiles use the GUI's "Save Configuration" JSON format::
+
+    {"module_function": 0, "module_id": 0, "parameters": {"spread_factor": "9", ...}}
+
+Author: Assistant
+Date: October 2025
+"""
+
+import json
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from .command_registry import PARAMETERS, REGISTRY
+from .parameter_cache import ParameterCache
+from .request_job import JobProgress, JobStep, RequestJob, SubmitFunction
+
+# Per-request time assumed for the savings estimate when nothing was measured
+DEFAULT_REQUEST_TIME = 0.05
+
+
+class ParameterChange(NamedTuple):
+    """One parameter to write."""
+
+    key: str
+    current: Optional[int]      # None if the device did not report it
+    target: int
+
+
+class ApplyPlan(NamedTuple):
+    """Result of comparing a profile with the device."""
+
+    changes: List[ParameterChange]
+    unchanged: List[str]
+    read_only: List[str]        # In the profile but without a SET command
+    skipped: List[str]          # Not readable or not acknowledged by the gateway; never written
+    unknown: List[str]          # Not a known parameter
+    cached_reads: int           # Current values taken from the cache
+    queried_reads: int          # Current values read from the device
+
+
+class ApplyReport(NamedTuple):
+    """Outcome of applying a profile."""
+
+    plan: ApplyPlan
+    written: List[str]
+    failed: Dict[str, str]      # Parameter -> error for SETs that were not acknowledged
+    mismatched: Dict[str, Tuple[Optional[int], int]]   # Parameter -> (read back, expected)
+    cancelled: bool
+    elapsed: float
+    time_saved: float           # Estimated seconds saved by skipped writes and cached reads
+    verify_only: bool = False   # Produced by verify(): nothing was written
+
+    @property
+    def writes_avoided(self) -> int:
+        return len(self.plan.unchanged)
+
+    @property
+    def ok(self) -> bool:
+        return not self.cancelled and not self.failed and not self.mismatched
+
+    def summary(self) -> str:
+        if self.verify_only:
+            checked = len(self.plan.changes) + len(self.plan.unchanged)
+            return (f"{len(self.plan.unchanged)}/{checked} parameters match, "
+                    f"{len(self.mismatched)} mismatched in {self.elapsed:.2f} s")
+        text = (f"{len(self.written)} written, {self.writes_avoided} unchanged (writes avoided), "
+                f"{len(self.failed)} failed, {len(self.mismatched)} mismatched in {self.elapsed:.2f} s; "
+                f"~{self.time_saved:.2f} s saved")
+        if self.plan.skipped:
+            text += f", {len(self.plan.skipped)} skipped ({', '.join(self.plan.skipped)})"
+        if self.cancelled:
+            text += " (cancelled)"
+        return text
+
+
+def load_profile(path: str) -> dict:
+    """Read a configuration profile saved by the GUI."""
+    with open(path, 'r') as f:
+        profile = json.load(f)
+    if not isinstance(profile.get('parameters'), dict):
+        raise ValueError(f"{path} has no 'parameters' section")
+    return profile
+
+
+class ConfigApplier:
+    """Diff-based configuration apply for one device. Blocking; run it off the GUI thread."""
+
+    def __init__(self, submit: SubmitFunction, cache: Optional[ParameterCache] = None,
+                 module_function: int = 0x00, module_id: int = 0x00,
+                 on_progress: Optional[Callable[[JobProgress], None]] = None):
+        """
+        Args:
+            submit: Request function as for ``RequestJob``
+            cache: Parameter cache consulted for current values and updated with results
+            module_function: Target module function
+            module_id: Target module id
+            on_progress: Progress callback for the read, write and verify batches
+        """
+        self.submit = submit
+        self.cache = cache if cache is not None else ParameterCache()
+        self.module_function = module_function
+        self.module_id = module_id
+        self.on_progress = on_progress
+        self.name = "Apply configuration"
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self.current_job: Optional[RequestJob] = None
+        self._cancelled = False
+        self._finished = threading.Event()
+
+    @property
+    def device(self) -> Tuple[int, int]:
+        return (self.module_function, self.module_id)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    @property
+    def done(self) -> bool:
+        return self._finished.is_set()
+
+    def cancel(self):
+        """Stop after the current batch; unanswered requests are dropped."""
+        self._cancelled = True
+        job = self.current_job
+        if job is not None:
+            job.cancel()
+
+    @staticmethod
+    def normalize(key: str, value) -> Union[int, float]:
+        """
+        Round a profile value to what the wire format can carry and validate it.
+
+        The range is checked again after rounding: a frequency just inside
+        its limits may come back outside them from the float32 round trip.
+
+        Raises:
+            ValueError: If the value or its rounded form is invalid
+        """
+        codec = REGISTRY.codecs[key]
+        return codec.validate(codec.decode(codec.encode(codec.parse(str(value)))))
+
+    def _module_function(self, key: str, kind: str) -> int:
+        module_function = PARAMETERS[key].get(f'{kind}_module_function')
+        return self.module_function if module_function is None else module_function
+
+    def _run(self, name: str, steps: List[JobStep]) -> RequestJob:
+        job = RequestJob(f"{self.name}: {name}", steps, self.submit, self.on_progress)
+        self.current_job = job
+        job.start()
+        if self._cancelled:
+            job.cancel()
+        job.wait()
+        return job
+
+    def read_values(self, keys: List[str]) -> Tuple[Dict[str, Optional[int]], float]:
+        """
+        Read parameters in one batch.
+
+        Returns:
+            ``(values, seconds)``; values are None for parameters that did not answer
+        """
+        if not keys:
+            return {}, 0.0
+        steps = [JobStep(f"Query {PARAMETERS[key]['name']}", self._module_function(key, 'query'),
+                         self.module_id, PARAMETERS[key]['query_cmd']) for key in keys]
+        started = time.perf_counter()
+        job = self._run("read", steps)
+        values = {}
+        for index, key in enumerate(keys):
+            frame = job.results.get(index)
+            value = REGISTRY.codecs[key].decode(frame.payload) if frame is not None else None
+            values[key] = value
+            if value is not None:
+                self.cache.update(self.device, key, value)
+        return values, time.perf_counter() - started
+
+    @staticmethod
+    def applicable(key: str) -> bool:
+        """Whether a parameter can be written and verified on the gateway."""
+        info = PARAMETERS[key]
+        return info.get('gateway_answers', True) and info.get('set_acknowledged', True)
+
+    def targets(self, parameters: Dict[str, object]) -> Tuple[Dict[str, int], List[str], List[str], List[str]]:
+        """
+        Split profile parameters into writable targets, read-only, skipped and unknown keys.
+
+        Skipped parameters cannot be read back or are not acknowledged
+        (see ``applicable``); their values are still validated.
+
+        Raises:
+            ValueError: If a profile value is invalid
+        """
+        targets = {}
+        read_only = []
+        skipped = []
+        unknown = []
+        for key, value in parameters.items():
+            if key not in PARAMETERS:
+                unknown.append(key)
+            elif PARAMETERS[key]['set_cmd'] is None:
+                read_only.append(key)
+            else:
+                try:
+                    target = self.normalize(key, value)
+                except ValueError as e:
+                    raise ValueError(f"{PARAMETERS[key]['name']}: {e}")
+                if self.applicable(key):
+                    targets[key] = target
+                else:
+                    skipped.append(key)
+        if skipped:
+            self.logger.warning(f"Skipping parameters the gateway cannot apply safely: {', '.join(skipped)}")
+        return targets, read_only, skipped, unknown
+
+    def plan(self, parameters: Dict[str, object]) -> Tuple[ApplyPlan, Dict[str, int], float]:
+        """
+        Compare profile parameters with the device.
+
+        Returns:
+            ``(plan, targets, read_seconds)``
+
+        Raises:
+            ValueError: If a profile value is invalid (nothing is sent)
+        """
+        targets, read_only, skipped, unknown = self.targets(parameters)
+
+        current = {}
+        to_read = []
+        for key in targets:
+            value = self.cache.get(self.device, key)
+            if value is None:
+                to_read.append(key)
+            else:
+                current[key] = value
+        read_values, read_seconds = self.read_values(to_read)
+        current.update(read_values)
+
+        changes = []
+        unchanged = []
+        for key, target in targets.items():
+            if current.get(key) == target:
+                unchanged.append(key)
+            else:
+                changes.append(ParameterChange(key, current.get(key), target))
+
+        plan = ApplyPlan(changes, unchanged, read_only, skipped, unknown,
+                         len(targets) - len(to_read), len(to_read))
+        return plan, targets, read_seconds
+
+    def apply(self, parameters: Dict[str, object]) -> ApplyReport:
+        """
+        Apply profile parameters, writing only what changed.
+
+        Raises:
+            ValueError: If a profile value is invalid (nothing is sent)
+        """
+        started = time.perf_counter()
+        self._finished.clear()
+        try:
+            plan, targets, read_seconds = self.plan(parameters)
+            self.logger.info(f"{len(plan.changes)} of {len(targets)} parameters differ "
+                             f"({plan.cached_reads} read from cache)")
+
+            written = []
+            failed = {}
+            write_seconds = 0.0
+            if plan.changes and not self._cancelled:
+                steps = [JobStep(f"Set {PARAMETERS[c.key]['name']} to {c.target}",
+                                 self._module_function(c.key, 'set'), self.module_id,
+                                 PARAMETERS[c.key]['set_cmd'], REGISTRY.codecs[c.key].encode(c.target))
+                         for c in plan.changes]
+                write_started = time.perf_counter()
+                job = self._run("write", steps)
+                write_seconds = time.perf_counter() - write_started
+                for index, change in enumerate(plan.changes):
+                    if index in job.results:
+                        written.append(change.key)
+                    else:
+                        failed[change.key] = job.errors.get(index, "No acknowledgement")
+                        self.cache.invalidate(self.device, change.key)
+
+            # One batched readback of everything that was written
+            mismatched = {}
+            if written and not self._cancelled:
+                readback, _ = self.read_values(written)
+                for key in written:
+                    if readback[key] != targets[key]:
+                        mismatched[key] = (readback[key], targets[key])
+
+            # Estimate with this run's own timings where available
+            write_time = write_seconds / len(plan.changes) if written else None
+            read_time = read_seconds / plan.queried_reads if plan.queried_reads else None
+            write_time = write_time or read_time or DEFAULT_REQUEST_TIME
+            read_time = read_time or write_time
+            time_saved = len(plan.unchanged) * write_time + plan.cached_reads * read_time
+
+            report = ApplyReport(plan, written, failed, mismatched, self._cancelled,
+                                 time.perf_counter() - started, time_saved)
+            self.logger.info(report.summary())
+            return report
+        finally:
+            self.current_job = None
+            self._finished.set()
+
+    def verify(self, parameters: Dict[str, object]) -> ApplyReport:
+        """
+        Read every profile parameter from the device (bypassing the cache) and
+        report the ones that differ, without writing anything.
+
+        Raises:
+            ValueError: If a profile value is invalid
+        """
+        started = time.perf_counter()
+        self._finished.clear()
+        try:
+            targets, read_only, skipped, unknown = self.targets(parameters)
+            values, _ = self.read_values(list(targets))
+            changes = [ParameterChange(key, values[key], target) for key, target in targets.items()
+                       if values[key] != target]
+            unchanged = [key for key in targets if values[key] == targets[key]]
+            plan = ApplyPlan(changes, unchanged, read_only, skipped, unknown, 0, len(targets))
+            mismatched = {c.key: (c.current, c.target) for c in changes}
+            report = ApplyReport(plan, [], {}, mismatched, self._cancelled,
+                                 time.perf_counter() - started, 0.0, verify_only=True)
+            self.logger.info(f"Verify: {len(unchanged)}/{len(targets)} parameters match")
+            return report
+        finally:
+            self.current_job = None
+            self._finished.set()
@@ -0,0 +1,136 @@
+"""
+CRC16 Engine
+============
+
+Table-driven CRC-16 implementations shared by the host tools.
+
+- CRC-16/XMODEM (poly 0x1021, init 0x0000): gateway 0x7E/0x7F frames,
+  matches ``CommandMessage::crc_get`` in the firmware.
+- CRC-16/MODBUS (poly 0x8005 reflected, init 0xFFFF): FASE 1 test frames.
+
+XMODEM is computed with ``binascii.crc_hqx``, which is the same CRC
+implemented in C with a 256-entry table, so no XMODEM table is kept
+here; MODBUS has no stdlib equivalent and uses the precomputed table
+below.
+
+Author: Assistant
+Date: October 2025
+"""
+
+import binascii
+from typing import Iterable, List, Tuple
+
+XMODEM_INIT = 0x0000
+MODBUS_INIT = 0xFFFF
+
+
+def _build_modbus_table() -> Tuple[int, ...]:
+    """Build the LSB-first lookup table for reflected polynomial 0xA001."""
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = ((crc >> 1) ^ 0xA001) if crc & 0x0001 else (crc >> 1)
+        table.append(crc)
+    return tuple(table)
+
+
+MODBUS_TABLE = _build_modbus_table()
+
+
+def crc16_xmodem(data: bytes, crc: int = XMODEM_INIT) -> int:
+    """
+    Calculate CRC-16/XMODEM.
+
+    Args:
+        data: Bytes-like object to checksum
+        crc: Running CRC from a previous call, for incremental use
+
+    Returns:
+        16-bit CRC value
+    """
+    return binascii.crc_hqx(data, crc)
+
+
+def crc16_modbus(data: bytes, crc: int = MODBUS_INIT) -> int:
+    """
+    Calculate CRC-16/MODBUS.
+
+    Args:
+        data: Bytes-like object to checksum
+        crc: Running CRC from a previous call, for incremental use
+
+    Returns:
+        16-bit CRC value
+    """
+    table = MODBUS_TABLE
+    for byte in data:
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+    return crc
+
+
+_ALGORITHMS = {
+    'xmodem': (crc16_xmodem, XMODEM_INIT),
+    'modbus': (crc16_modbus, MODBUS_INIT),
+}
+
+
+class Crc16:
+    """Incremental CRC-16 calculator."""
+
+    def __init__(self, algorithm: str = 'xmodem'):
+        try:
+            self._func, self._init = _ALGORITHMS[algorithm]
+        except KeyError:
+            raise ValueError(f"Unsupported CRC algorithm: {algorithm}")
+        self.algorithm = algorithm
+        self.value = self._init
+
+    def reset(self):
+        """Restart the calculation from the initial value."""
+        self.value = self._init
+
+    def update(self, data: bytes) -> int:
+        """Add bytes to the running CRC and return the new value."""
+        self.value = self._func(data, self.value)
+        return self.value
+
+    def digest(self) -> bytes:
+        """CRC as transmitted on the wire (little-endian)."""
+        return bytes((self.value & 0xFF, self.value >> 8))
+
+
+def validate_frames(candidates: Iterable[bytes], algorithm: str = 'xmodem',
+                    skip_head: int = 1, skip_tail: int = 1) -> List[bool]:
+    """
+    Validate the trailing little-endian CRC of many candidate frames.
+
+    The CRC covers ``frame[skip_head:-(2 + skip_tail)]`` and is stored in the
+    two bytes that follow. The defaults match gateway frames (START_MARK
+    excluded, END_MARK after the CRC); use ``algorithm='modbus',
+    skip_head=0, skip_tail=0`` for FASE 1 frames.
+
+    Args:
+        candidates: Frames to check, e.g. from a serial capture
+        algorithm: 'xmodem' or 'modbus'
+        skip_head: Bytes before the CRC-covered region
+        skip_tail: Bytes after the CRC field
+
+    Returns:
+        One boolean per candidate, True when the CRC matches
+    """
+    try:
+        func, init = _ALGORITHMS[algorithm]
+    except KeyError:
+        raise ValueError(f"Unsupported CRC algorithm: {algorithm}")
+
+    min_len = skip_head + 2 + skip_tail
+    results = []
+    append = results.append
+    for frame in candidates:
+        end = len(frame) - 2 - skip_tail
+        if len(frame) < min_len:
+            append(False)
+            continue
+        append(func(frame[skip_head:end], init) == (frame[end] | (frame[end + 1] << 8)))
+    return results
@@ -0,0 +1,271 @@
+"""
+Fleet Configuration
+===================
+
+Run the same query, apply or verify plan on many gateways at once, one
+serial port per gateway.
+
+Each port gets its own ``GatewaySession`` (reader thread, frame decoder,
+request correlator and parameter cache) and a worker from a bounded
+thread pool runs ``ConfigApplier`` against it. Ports only share the
+pool, so a missing or misbehaving unit fails its own row and nothing
+else; commissioning N units takes about as long as the slowest one.
+
+Example::
+
+    runner = FleetRunner(['/dev/ttyUSB0', '/dev/ttyUSB1'])
+    for result in runner.run(ACTION_APPLY, load_profile('profile.json')['parameters']):
+        print(result.port, result.summary())
+
+Author: Assistant
+Date: October 2025
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional, Union
+
+import serial
+
+from .command_registry import GATEWAY_PARAMETERS, PARAMETERS
+from .config_apply import ApplyReport, ConfigApplier
+from .metrics import ProtocolMetrics
+from .parameter_cache import ParameterCache
+from .protocol import FrameDecoder
+from .request_correlator import RequestCorrelator
+from .serial_reader import DEFAULT_TIMEOUT, SerialReader
+from .timeouts import TimeoutEstimator
+from .tracing import TRACER
+
+ACTION_QUERY = 'query'
+ACTION_APPLY = 'apply'
+ACTION_VERIFY = 'verify'
+ACTIONS = (ACTION_QUERY, ACTION_APPLY, ACTION_VERIFY)
+
+# Upper bound on concurrent ports; each also runs a reader and a timeout thread
+MAX_WORKERS = 32
+
+
+class GatewaySession:
+    """Thread-based request/response session on one serial port."""
+
+    def __init__(self, port: str, baudrate: int = 115200, timeout: Optional[float] = None, retries: int = 2):
+        """
+        Args:
+            port: Serial port name
+            baudrate: Serial baudrate
+            timeout: Per-attempt response timeout in seconds; None adapts it
+                to the baudrate and measured round trips
+            retries: Retransmissions after a timeout
+        """
+        self.port_name = port
+        self.baudrate = baudrate
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.serial_port = None
+        self.frame_decoder = FrameDecoder()
+        self.metrics = ProtocolMetrics(self.frame_decoder)
+        self.correlator = RequestCorrelator(self._send, timeout=timeout, retries=retries,
+                                            estimator=TimeoutEstimator(baudrate), metrics=self.metrics)
+        self.cache = ParameterCache()
+        self.reader: Optional[SerialReader] = None
+        self.error: Optional[Exception] = None
+        self._rx_started: Optional[float] = None   # First byte of the frame being received (tracing)
+
+    @property
+    def is_open(self) -> bool:
+        return self.serial_port is not None and self.serial_port.is_open
+
+    def open(self):
+        """Open the port and start the reader thread."""
+        # serial_for_url also accepts socket://host:port, e.g. a serial_bridge.py client
+        self.serial_port = serial.serial_for_url(self.port_name, baudrate=self.baudrate, timeout=DEFAULT_TIMEOUT)
+        self.reader = SerialReader(self.serial_port)
+        self.reader.start(self._on_data, self._on_error)
+
+    def close(self):
+        """Fail pending requests, stop the reader and close the port."""
+        self.correlator.close()
+        if self.reader is not None:
+            self.reader.stop()
+            self.reader = None
+        if self.serial_port is not None:
+            self.serial_port.close()
+            self.serial_port = None
+
+    def __enter__(self) -> 'GatewaySession':
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def request(self, module_function: int, module_id: int, command: int, data: Optional[bytes] = None,
+                timeout: Optional[float] = None, retries: Optional[int] = None) -> Optional[Future]:
+        """Send a command; returns a Future for the response, or None if the port is down."""
+        if not self.is_open or self.error is not None:
+            return None
+        return self.correlator.submit(module_function, module_id, command, data, timeout, retries)
+
+    def _send(self, frame: bytes) -> bool:
+        try:
+            self.serial_port.write(frame)
+            self.metrics.record_tx(len(frame))
+            return True
+        except Exception as e:
+            self.logger.error(f"{self.port_name}: error sending frame: {e}")
+            return False
+
+    def _on_data(self, data: bytes):
+        self.metrics.record_rx(len(data))
+        rx_at = TRACER.now() if TRACER.enabled else None
+        if not self.frame_decoder.pending:
+            self._rx_started = rx_at
+        frames = self.frame_decoder.feed(data)
+        self.metrics.record_frames(frames)
+        for frame in frames:
+            self.cache.on_frame(frame, self.correlator.pending_kind(frame))
+            self.correlator.on_frame(frame, self._rx_started)
+            # Any later frame in this chunk started in it
+            self._rx_started = rx_at
+
+    def _on_error(self, error: Exception):
+        self.error = error
+        self.correlator.cancel_all(f"{self.port_name}: {error}")
+
+
+class FleetResult(NamedTuple):
+    """Outcome for one port."""
+
+    port: str
+    ok: bool
+    error: Optional[str]
+    values: Dict[str, Optional[int]]    # Parameter values read (query) or read back (verify)
+    report: Optional[ApplyReport]       # Apply/verify report
+    elapsed: float
+
+    def summary(self) -> str:
+        if self.error is not None:
+            return f"ERROR: {self.error}"
+        if self.report is not None:
+            return self.report.summary()
+        answered = sum(1 for value in self.values.values() if value is not None)
+        return f"{answered}/{len(self.values)} parameters answered"
+
+
+class FleetRunner:
+    """Run one plan on many ports concurrently with a bounded worker pool."""
+
+    def __init__(self, ports: List[str], baudrate: int = 115200, module_function: int = 0x00,
+                 module_id: int = 0x00, timeout: Optional[float] = None, retries: int = 2,
+                 max_workers: Optional[int] = None, on_result: Optional[Callable[[FleetResult], None]] = None):
+        """
+        Args:
+            ports: Serial ports, one gateway each
+            baudrate: Serial baudrate
+            module_function: Target module function on every gateway
+            module_id: Target module id on every gateway
+            timeout: Per-attempt response timeout in seconds, adaptive if None
+            retries: Retransmissions after a timeout
+            max_workers: Ports processed at once, defaults to all (capped at MAX_WORKERS)
+            on_result: Called from a worker thread as each port finishes
+        """
+        self.ports = list(dict.fromkeys(ports))
+        self.baudrate = baudrate
+        self.module_function = module_function
+        self.module_id = module_id
+        self.timeout = timeout
+        self.retries = retries
+        self.max_workers = max(1, min(max_workers or len(self.ports) or 1, MAX_WORKERS))
+        self.on_result = on_result
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._appliers: Dict[str, ConfigApplier] = {}
+        self._lock = threading.Lock()
+        self._cancelled = False
+
+    def cancel(self):
+        """Stop every port after its current batch; ports not started yet are skipped."""
+        self._cancelled = True
+        with self._lock:
+            appliers = list(self._appliers.values())
+        for applier in appliers:
+            applier.cancel()
+
+    def run(self, action: str, parameters: Union[Dict[str, object], List[str], None] = None) -> List[FleetResult]:
+        """
+        Run an action on every port and wait for all of them.
+
+        Args:
+            action: ACTION_QUERY, ACTION_APPLY or ACTION_VERIFY
+            parameters: Profile parameters for apply/verify; for query, the
+                parameter keys to read (default: those the gateway answers)
+
+        Returns:
+            One result per port, in port order
+
+        Raises:
+            ValueError: If the action is unknown or a profile value is invalid
+                (checked once, before any port is opened)
+        """
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown action: {action}")
+        if action == ACTION_QUERY:
+            unknown = [key for key in parameters or () if key not in PARAMETERS]
+            if unknown:
+                raise ValueError(f"Unknown parameters: {', '.join(unknown)}")
+        else:
+            if not parameters:
+                raise ValueError(f"'{action}' needs profile parameters")
+            ConfigApplier(lambda *args: None).targets(parameters)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(self.max_workers, thread_name_prefix='fleet') as pool:
+            futures = [pool.submit(self._run_port, port, action, parameters) for port in self.ports]
+            try:
+                results = [future.result() for future in futures]
+            except BaseException:
+                # e.g. KeyboardInterrupt: stop the workers before the pool waits for them
+                self.cancel()
+                raise
+        ok = sum(1 for result in results if result.ok)
+        self.logger.info(f"{action} on {len(results)} ports: {ok} ok in {time.perf_counter() - started:.2f} s")
+        return results
+
+    def _run_port(self, port: str, action: str, parameters: Union[Dict[str, object], List[str], None]) -> FleetResult:
+        started = time.perf_counter()
+        values = {}
+        report = None
+        try:
+            if self._cancelled:
+                raise RuntimeError("Cancelled")
+            with GatewaySession(port, self.baudrate, self.timeout, self.retries) as session:
+                applier = ConfigApplier(session.request, session.cache, self.module_function, self.module_id)
+                with self._lock:
+                    self._appliers[port] = applier
+                try:
+                    if action == ACTION_QUERY:
+                        values, _ = applier.read_values(list(parameters or GATEWAY_PARAMETERS))
+                        ok = any(value is not None for value in values.values())
+                        error = None if ok else "No response"
+                    else:
+                        report = applier.apply(parameters) if action == ACTION_APPLY else applier.verify(parameters)
+                        if action == ACTION_VERIFY:
+                            values = {key: mismatch[0] for key, mismatch in report.mismatched.items()}
+                        ok = report.ok
+                        error = None
+                        if session.error is not None:
+                            ok, error = False, str(session.error)
+                finally:
+                    with self._lock:
+                        self._appliers.pop(port, None)
+            result = FleetResult(port, ok, error, values, report, time.perf_counter() - started)
+        except Exception as e:
+            # One unit failing must not affect the others
+            self.logger.error(f"{port}: {e}")
+            result = FleetResult(port, False, str(e), values, report, time.perf_counter() - started)
+
+        if self.on_result is not None:
+            self.on_result(result)
+        return result
@@ -0,0 +1,98 @@
+"""
+Line Buffer
+===========
+
+Fixed-size, thread-safe ring buffer of text lines for log and raw-data
+views. Producers append from any thread; a renderer periodically takes
+the lines added since its last refresh and draws them in one go.
+
+Author: Assistant
+Date: October 2025
+"""
+
+import threading
+from collections import deque
+from itertools import islice
+from typing import Callable, Iterable, List, Optional, Tuple
+
+DEFAULT_MAX_LINES = 5000
+
+
+class LineBuffer:
+    """Keeps the newest ``max_lines`` lines and tracks what was rendered."""
+
+    def __init__(self, max_lines: int = DEFAULT_MAX_LINES):
+        """
+        Args:
+            max_lines: Lines kept; older lines are dropped
+        """
+        self.max_lines = max_lines
+        self._lines = deque(maxlen=max_lines)
+        self._lock = threading.Lock()
+        self._rendered = 0
+
+        # Statistics
+        self.total_lines = 0
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def append(self, line: str):
+        """Add one line."""
+        with self._lock:
+            self._lines.append(line)
+            self.total_lines += 1
+
+    def extend(self, lines: Iterable[str]):
+        """Add several lines."""
+        lines = list(lines)
+        with self._lock:
+            self._lines.extend(lines)
+            self.total_lines += len(lines)
+
+    @property
+    def pending(self) -> int:
+        """Lines appended since the last ``take_pending()``."""
+        return self.total_lines - self._rendered
+
+    def take_pending(self) -> Tuple[List[str], bool]:
+        """
+        Return the lines appended since the last call.
+
+        Returns:
+            ``(lines, reset)``; ``reset`` is True when more lines arrived than
+            the buffer holds, in which case ``lines`` is the whole buffer and
+            the view should be redrawn from scratch
+        """
+        with self._lock:
+            count = self.total_lines - self._rendered
+            self._rendered = self.total_lines
+            if count <= 0:
+                return [], False
+            if count >= len(self._lines):
+                return list(self._lines), count > len(self._lines)
+            lines = list(islice(reversed(self._lines), count))
+        lines.reverse()
+        return lines, False
+
+    def snapshot(self, match: Optional[Callable[[str], bool]] = None, mark_rendered: bool = False) -> List[str]:
+        """
+        Return all buffered lines.
+
+        Args:
+            match: Only return lines for which this returns True
+            mark_rendered: Treat every line as rendered, for a full redraw
+        """
+        with self._lock:
+            if mark_rendered:
+                self._rendered = self.total_lines
+            lines = list(self._lines)
+        if match is not None:
+            lines = [line for line in lines if match(line)]
+        return lines
+
+    def clear(self):
+        """Drop all lines."""
+        with self._lock:
+            self._lines.clear()
+            self._rendered = self.total_lines
@@ -4,20 +4,201 @@ Logging Configuration Utilities
 
 Utilities for setting up consistent logging across the application.
 
+By default ``setup_logging`` writes synchronously, as before. With
+``asynchronous=True`` the logger only gets a ``QueueHandler``: records
+are put on a bounded in-memory queue (dropped and counted if it is
+full, never waited on) and a ``QueueListener`` thread does all console
+and disk I/O, so serial reader threads never block on a slow disk.
+
+Setting ``max_bytes`` or ``rotate_interval`` switches the file from a
+new timestamped file per start to ``lora_gateway.log`` rotated by size
+and/or age. Rotated files are gzip-compressed on a helper thread, and at
+most ``backup_count`` are kept. ``json_lines=True`` writes one JSON
+object per record to the file instead of text.
+
+Example::
+
+    setup_logging(asynchronous=True, max_bytes=10 * 1024 * 1024,
+                  rotate_interval=86400, json_lines=True)
+    ...
+    stop_logging()           # also done automatically at exit
+
 Author: Assistant
 Date: October 2025
 """
 
+import atexit
+import copy
+import gzip
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import shutil
+import threading
+import time
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
+
+DEFAULT_BACKUP_COUNT = 10
+DEFAULT_QUEUE_SIZE = 10000
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Listeners started by setup_logging(asynchronous=True), stopped by stop_logging()
+_listeners: List[logging.handlers.QueueListener] = []
+_atexit_registered = False
+
+_EXCEPTION_FORMATTER = logging.Formatter()
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+
+        # Statistics
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the arguments now (they may change later) but leave formatting to the listener
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _EXCEPTION_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RotatingCompressedFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    File handler rotated by size and/or age, with gzip-compressed backups.
+
+    Backups are named ``<file>.1.gz`` (newest) to ``<file>.<backup_count>.gz``.
+    Compression runs on a helper thread; the next rollover waits for it,
+    so backups are never shifted while still being written.
+    """
+
+    def __init__(self, filename: str, max_bytes: int = 0, rotate_interval: Optional[float] = None,
+                 backup_count: int = DEFAULT_BACKUP_COUNT, compress: bool = True, encoding: Optional[str] = 'utf-8'):
+        """
+        Args:
+            filename: Log file path
+            max_bytes: Rotate when the file would exceed this size (0: never)
+            rotate_interval: Rotate when the file is older than this many seconds (None: never)
+            backup_count: Rotated files kept
+            compress: Gzip rotated files
+            encoding: File encoding
+        """
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding=encoding)
+        self.rotate_interval = rotate_interval
+        self.compress = compress
+        self._compressor: Optional[threading.Thread] = None
+        if compress:
+            self.namer = lambda name: name + '.gz'
+            self.rotator = self._rotate_compressed
+        self.rollover_at = self._next_rollover(os.stat(self.baseFilename).st_mtime
+                                               if os.path.exists(self.baseFilename) else time.time())
+
+    def _next_rollover(self, opened: float) -> Optional[float]:
+        return opened + self.rotate_interval if self.rotate_interval else None
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.rollover_at is not None and record.created >= self.rollover_at:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self):
+        self.wait_compressed()
+        super().doRollover()
+        self.rollover_at = self._next_rollover(time.time())
+
+    def _rotate_compressed(self, source: str, dest: str):
+        if not os.path.exists(source):
+            return
+        # Move the file aside now; the slow part happens off the logging thread
+        pending = dest[:-len('.gz')]
+        os.replace(source, pending)
+        self._compressor = threading.Thread(target=self._compress, args=(pending, dest),
+                                            name='LogCompressor', daemon=True)
+        self._compressor.start()
+
+    @staticmethod
+    def _compress(source: str, dest: str):
+        try:
+            with open(source, 'rb') as f_in, gzip.open(dest + '.tmp', 'wb') as f_out:
+                shutil.copyfileobj(f_in, f_out)
+            os.replace(dest + '.tmp', dest)
+            os.remove(source)
+        except OSError as e:
+            logging.getLogger(__name__).error(f"Failed to compress rotated log {source}: {e}")
+
+    def wait_compressed(self, timeout: Optional[float] = None):
+        """Wait for the compression of the last rotated file."""
+        if self._compressor is not None:
+            self._compressor.join(timeout)
+            self._compressor = None
+
+    def close(self):
+        self.wait_compressed()
+        super().close()
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, thread, message and any extra fields."""
+
+    # Attributes every LogRecord has; anything else was passed with extra=
+    _STANDARD = frozenset(logging.LogRecord('', 0, '', 0, '', (), None).__dict__) | {'message', 'asctime'}
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        for key, value in record.__dict__.items():
+            if key not in self._STANDARD:
+                entry[key] = value
+        return json.dumps(entry, default=str)
+
+
+def stop_logging():
+    """Stop the asynchronous listeners, writing out every queued record."""
+    while _listeners:
+        listener = _listeners.pop()
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
 
 def setup_logging(
     logger_name: str = None,
     log_level: int = logging.INFO,
     log_to_file: bool = True,
-    log_dir: str = "logs"
+    log_dir: str = "logs",
+    asynchronous: bool = False,
+    max_bytes: int = 0,
+    rotate_interval: Optional[float] = None,
+    backup_count: int = DEFAULT_BACKUP_COUNT,
+    compress: bool = True,
+    json_lines: bool = False,
+    queue_size: int = DEFAULT_QUEUE_SIZE
 ) -> logging.Logger:
     """
     Setup logging configuration for the application.
@@ -27,10 +208,18 @@ def setup_logging(
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         log_to_file: Whether to log to file in addition to console
         log_dir: Directory to store log files
+        asynchronous: Do all console and file I/O on a background listener thread
+        max_bytes: Rotate the log file at this size (0: no size limit)
+        rotate_interval: Rotate the log file after this many seconds (None: no age limit)
+        backup_count: Rotated log files kept
+        compress: Gzip rotated log files
+        json_lines: Write the log file as JSON lines
+        queue_size: Records buffered for the listener thread before new ones are dropped
         
     Returns:
         Configured logger instance
     """
+    global _atexit_registered
     
     # Create logger
     logger = logging.getLogger(logger_name)
@@ -41,32 +230,50 @@ def setup_logging(
         return logger
     
     # Create formatter
-    formatter = logging.Formatter(
-        fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
+    formatter = logging.Formatter(fmt=LOG_FORMAT, datefmt=DATE_FORMAT)
+    handlers = []
     
     # Console handler
     console_handler = logging.StreamHandler()
     console_handler.setLevel(log_level)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    handlers.append(console_handler)
     
     # File handler (if enabled)
+    log_filename = None
     if log_to_file:
         # Create log directory if it doesn't exist
         if not os.path.exists(log_dir):
             os.makedirs(log_dir)
         
-        # Create log filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        log_filename = os.path.join(log_dir, f"lora_gateway_{timestamp}.log")
-        
-        file_handler = logging.FileHandler(log_filename)
+        if max_bytes or rotate_interval:
+            # One file rotated in place, so disk use stays bounded across restarts
+            log_filename = os.path.join(log_dir, "lora_gateway.log")
+            file_handler = RotatingCompressedFileHandler(log_filename, max_bytes, rotate_interval,
+                                                         backup_count, compress)
+        else:
+            # Create log filename with timestamp
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            log_filename = os.path.join(log_dir, f"lora_gateway_{timestamp}.log")
+            file_handler = logging.FileHandler(log_filename)
         file_handler.setLevel(log_level)
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
-        
+        file_handler.setFormatter(JsonLinesFormatter() if json_lines else formatter)
+        handlers.append(file_handler)
+    
+    if asynchronous:
+        log_queue = queue.Queue(queue_size)
+        logger.addHandler(NonBlockingQueueHandler(log_queue))
+        listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        _listeners.append(listener)
+        if not _atexit_registered:
+            atexit.register(stop_logging)
+            _atexit_registered = True
+    else:
+        for handler in handlers:
+            logger.addHandler(handler)
+    
+    if log_filename:
         logger.info(f"Logging to file: {log_filename}")
     
     return logger
@@ -185,6 +392,3 @@ def log_connection_event(logger: logging.Logger, event: str, port: str, details:
     if details:
         message += f" ({details})"
     logger.info(message)
-
-# Create package-level logger
-package_logger = setup_logging("lora_gateway")
\ No newline at end of file
@@ -0,0 +1,229 @@
+"""
+Firmware Log Parser
+===================
+
+Split and format the gateway's text log (``Logger.cpp``) fast enough to
+keep up with hex dumps of UART2 and LoRa traffic on the 115200 baud
+RS485 log port.
+
+Firmware lines look like::
+
+    [00012345] INF:SYS Processing command 0x20
+    [00012346] DBG:U2  RX[10]: 7E 00 00 20 00 00 8D 3A 7F
+
+- ``LineSplitter`` turns arbitrary read chunks into complete lines and
+  keeps the partial tail for the next chunk, so the port can be drained
+  with large reads instead of one ``readline()`` per line.
+- ``LogParser`` keeps its regexes and colour tables at module level,
+  formats the timestamp with integer arithmetic, caches the coloured
+  level/source prefixes and frame command names, and only runs the
+  command regexes on lines that can contain a command. ``feed()`` is
+  the batch mode: one chunk in, one string with all its lines out.
+
+Author: Assistant
+Date: October 2025
+"""
+
+import re
+from collections import Counter
+from typing import List, NamedTuple, Optional
+
+from .command_registry import KIND_QUERY, KIND_SET, REGISTRY, RequestKinds
+
+LOG_PATTERN = re.compile(r'\[(\d+)\] (\w+):(\w+) +(.*)')
+
+# Command id in "Processing command 0x20" and in frame hex dumps
+COMMAND_PATTERN = re.compile(r'Processing command 0x([0-9A-Fa-f]{2})')
+FRAME_PATTERN = re.compile(r'\[\d+\]: 7E ([0-9A-F]{2}) [0-9A-F]{2} ([0-9A-F]{2})')
+
+# Hex dumps of requests: received from the host on UART2, forwarded over LoRa
+REQUEST_DUMPS = ('RX[', 'Transmitting[')
+
+RESET = '\033[0m'
+
+LEVEL_COLORS = {
+    'DBG': '\033[36m',  # Cyan
+    'INF': '\033[32m',  # Green
+    'WRN': '\033[33m',  # Yellow
+    'ERR': '\033[31m',  # Red
+    'CRT': '\033[91m',  # Bright Red
+}
+
+SOURCE_COLORS = {
+    'SYS': '\033[94m',  # Blue
+    'U2': '\033[95m',   # Magenta
+    'LRX': '\033[92m',  # Bright Green
+    'LTX': '\033[93m',  # Bright Yellow
+    'CMD': '\033[96m',  # Bright Cyan
+    'CFG': '\033[97m',  # White
+}
+
+
+class LogLine(NamedTuple):
+    """One parsed firmware log line."""
+
+    timestamp_ms: int
+    level: str
+    source: str
+    message: str
+
+
+def format_timestamp(timestamp_ms: int) -> str:
+    """Firmware tick in ms as ``HH:MM:SS.mmm``."""
+    seconds, millis = divmod(timestamp_ms, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{millis:03d}"
+
+
+class LineSplitter:
+    """Split byte chunks into complete text lines."""
+
+    def __init__(self, encoding: str = 'utf-8'):
+        self.encoding = encoding
+        self._pending = b''
+
+    @property
+    def pending(self) -> int:
+        """Bytes of an incomplete line held back."""
+        return len(self._pending)
+
+    def feed(self, data: bytes) -> List[str]:
+        """Return the lines completed by ``data``, without line endings."""
+        if self._pending:
+            data = self._pending + data
+        end = data.rfind(b'\n')
+        if end < 0:
+            self._pending = data
+            return []
+        self._pending = data[end + 1:]
+        return data[:end].decode(self.encoding, errors='ignore').splitlines()
+
+    def flush(self) -> List[str]:
+        """Return the incomplete last line, if any."""
+        data, self._pending = self._pending, b''
+        return data.decode(self.encoding, errors='ignore').splitlines()
+
+
+class LogParser:
+    """Parse, annotate and colour firmware log lines."""
+
+    def __init__(self, color: bool = True, annotate: bool = True):
+        """
+        Args:
+            color: Add ANSI colours for level and source
+            annotate: Append command names to command and frame messages
+        """
+        self.color = color
+        self.annotate = annotate
+        self.splitter = LineSplitter()
+        self._prefixes = {}
+        self._frame_names = {}
+        self._kinds = RequestKinds()
+
+        # Statistics
+        self.lines = 0
+        self.level_counts = Counter()
+        self.command_counts = Counter()
+
+    @staticmethod
+    def parse(line: str) -> Optional[LogLine]:
+        """Split a line into its fields, or None if it is not a logger line."""
+        match = LOG_PATTERN.match(line)
+        if match is None:
+            return None
+        timestamp, level, source, message = match.groups()
+        return LogLine(int(timestamp), level, source, message)
+
+    def annotate_command(self, message: str) -> str:
+        """Append the command name to command and frame log messages."""
+        # Cheap substring tests first: most lines contain neither
+        if 'command 0x' in message:
+            match = COMMAND_PATTERN.search(message)
+            if match:
+                name = REGISTRY.command_name(int(match.group(1), 16))
+                self.command_counts[name] += 1
+                return f"{message} ({name})"
+        start = message.find(': 7E ')
+        if start >= 0:
+            # Function, id, command and length bytes sit at fixed offsets in the
+            # dump; names are cached per bytes and kind so the regex runs once each
+            pair = message[start + 5:start + 13]
+            if message.startswith(REQUEST_DUMPS):
+                kind = self._kinds.request(pair, KIND_QUERY if message[start + 17:start + 19] in ('', '00')
+                                           else KIND_SET)
+            else:
+                # Responses are named after the request they answer
+                kind = self._kinds.response(pair)
+            name = self._frame_names.get((pair, kind))
+            if name is None:
+                match = FRAME_PATTERN.search(message)
+                if match is None:
+                    return message
+                name = REGISTRY.command_name(int(match.group(2), 16), int(match.group(1), 16), kind)
+                self._frame_names[(pair, kind)] = name
+            return f"{message} ({name})"
+        return message
+
+    def _prefix(self, level: str, source: str) -> str:
+        prefix = self._prefixes.get((level, source))
+        if prefix is None:
+            if self.color:
+                prefix = (f"{LEVEL_COLORS.get(level, '')}{level}{RESET}:"
+                          f"{SOURCE_COLORS.get(source, '')}{source}{RESET}")
+            else:
+                prefix = f"{level}:{source}"
+            self._prefixes[(level, source)] = prefix
+        return prefix
+
+    def format(self, line: str) -> str:
+        """Format one line for the terminal; non-logger lines are returned stripped."""
+        line = line.strip()
+        match = LOG_PATTERN.match(line)
+        if match is None:
+            return line
+        timestamp, level, source, message = match.groups()
+        self.level_counts[level] += 1
+        if self.annotate:
+            message = self.annotate_command(message)
+        return f"[{format_timestamp(int(timestamp))}] {self._prefix(level, source)} {message}"
+
+    def skip(self, line: str) -> str:
+        """
+        Count a line that will not be displayed, without formatting it.
+
+        Returns:
+            The line's ``LVL:SRC`` key, or an empty string for non-logger lines
+        """
+        self.lines += 1
+        match = LOG_PATTERN.match(line.strip())
+        if match is None:
+            return ''
+        level, source, message = match.group(2, 3, 4)
+        self.level_counts[level] += 1
+        if 'command 0x' in message:
+            match = COMMAND_PATTERN.search(message)
+            if match:
+                self.command_counts[REGISTRY.command_name(int(match.group(1), 16))] += 1
+        return f"{level}:{source}"
+
+    def format_lines(self, lines: List[str]) -> List[str]:
+        """Format several lines, skipping blank ones."""
+        format_line = self.format
+        formatted = [format_line(line) for line in lines if line and not line.isspace()]
+        self.lines += len(formatted)
+        return formatted
+
+    def feed(self, data: bytes) -> str:
+        """
+        Batch mode: format every line completed by a read chunk.
+
+        Returns:
+            The formatted lines joined with newlines (newline-terminated),
+            or an empty string if no line was completed
+        """
+        formatted = self.format_lines(self.splitter.feed(data))
+        if not formatted:
+            return ''
+        formatted.append('')
+        return '\n'.join(formatted)
@@ -0,0 +1,138 @@
+"""
+Log Renderer
+============
+
+Rate-limited, coalesced terminal output for the firmware log.
+
+Printing every line as it arrives means one terminal write per line, and
+a slow terminal or SSH session then stalls whoever reads the port until
+the serial buffer overflows. ``LogRenderer`` separates the two:
+
+- ``feed()``/``add()`` are called by the reader. They format up to
+  ``max_rate`` lines per second (token bucket with a ``burst`` allowance)
+  into a bounded queue and only count the rest per ``LVL:SRC`` source.
+- ``flush()`` is called every ``interval`` from another thread. It writes
+  everything queued with one ``write()``, followed about once a second by
+  a summary such as ``... 340 DBG:U2 lines suppressed``.
+
+Suppression only affects the display. Anything that records the stream
+should take the raw chunks before they are handed to the renderer.
+
+Author: Assistant
+Date: October 2025
+"""
+
+import sys
+import threading
+import time
+from collections import Counter
+from typing import List, Optional, TextIO
+
+from .log_parser import RESET, LogParser
+
+DEFAULT_INTERVAL = 0.1
+DEFAULT_MAX_RATE = 200
+MAX_PENDING_LINES = 10000
+
+# Suppressed-line summaries are written at most this often (seconds)
+SUMMARY_INTERVAL = 1.0
+
+SUMMARY_COLOR = '\033[90m'  # Grey
+
+
+class LogRenderer:
+    """Queue formatted log lines and write them in batches at a limited rate."""
+
+    def __init__(self, parser: Optional[LogParser] = None, stream: Optional[TextIO] = None,
+                 interval: float = DEFAULT_INTERVAL, max_rate: float = DEFAULT_MAX_RATE,
+                 burst: Optional[float] = None, max_pending: int = MAX_PENDING_LINES):
+        """
+        Args:
+            parser: Splits and formats lines (a new ``LogParser`` if None)
+            stream: Output stream (default ``sys.stdout``)
+            interval: Refresh interval in seconds the caller flushes at
+            max_rate: Lines per second displayed; 0 displays everything
+            burst: Lines that may be displayed at once after a quiet
+                period (default: one second's worth)
+            max_pending: Formatted lines queued at most; further lines are
+                suppressed until the terminal catches up
+        """
+        self.parser = parser or LogParser()
+        self.stream = stream or sys.stdout
+        self.interval = interval
+        self.max_rate = max_rate
+        self.burst = burst if burst is not None else max_rate
+        self.max_pending = max_pending
+        self._tokens = self.burst
+        self._refilled = time.monotonic()
+        self._pending: List[str] = []
+        self._suppressed = Counter()
+        self._summary_due = time.monotonic() + SUMMARY_INTERVAL
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.shown = 0
+        self.suppressed = 0
+        self.writes = 0
+
+    def feed(self, data: bytes):
+        """Split a read chunk into lines and queue them."""
+        self.add(self.parser.splitter.feed(data))
+
+    def add(self, lines: List[str]):
+        """Queue lines for display, suppressing those over the rate limit."""
+        lines = [line for line in lines if line and not line.isspace()]
+        if not lines:
+            return
+        with self._lock:
+            allowed = len(lines)
+            if self.max_rate:
+                self._refill()
+                allowed = min(allowed, int(self._tokens))
+                self._tokens -= allowed
+            allowed = max(0, min(allowed, self.max_pending - len(self._pending)))
+            if allowed:
+                self._pending.extend(self.parser.format_lines(lines[:allowed]))
+                self.shown += allowed
+            for line in lines[allowed:]:
+                self._suppressed[self.parser.skip(line)] += 1
+            self.suppressed += len(lines) - allowed
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.max_rate)
+        self._refilled = now
+
+    def _summary(self) -> List[str]:
+        color, reset = (SUMMARY_COLOR, RESET) if self.parser.color else ('', '')
+        return [f"{color}... {count} {key or 'other'} lines suppressed{reset}"
+                for key, count in self._suppressed.most_common()]
+
+    def flush(self, final: bool = False) -> int:
+        """
+        Write the queued lines with a single ``write()``.
+
+        Args:
+            final: Also write any pending suppression summary now (and the
+                incomplete last line) instead of waiting for the next one
+
+        Returns:
+            Number of lines written
+        """
+        if final:
+            self.add(self.parser.splitter.flush())
+        with self._lock:
+            lines, self._pending = self._pending, []
+            now = time.monotonic()
+            if now >= self._summary_due or final:
+                if self._suppressed:
+                    lines.extend(self._summary())
+                    self._suppressed.clear()
+                self._summary_due = now + SUMMARY_INTERVAL
+        if not lines:
+            return 0
+        lines.append('')
+        self.stream.write('\n'.join(lines))
+        self.stream.flush()
+        self.writes += 1
+        return len(lines) - 1
@@ -0,0 +1,285 @@
+"""
+Firmware Log Store
+==================
+
+Indexed SQLite storage of parsed firmware log lines, so incidents can be
+queried by time, level and source instead of grepping text dumps.
+
+One row per line::
+
+    host_time   REAL     Unix time the line was received on the host
+    tick        INTEGER  Firmware tick in ms (NULL for non-logger lines)
+    level       TEXT     DBG/INF/WRN/ERR/CRT (NULL for non-logger lines)
+    source      TEXT     SYS/U2/LRX/LTX/CMD/CFG (NULL for non-logger lines)
+    message     TEXT
+
+Indexes on ``host_time``, ``(level, source, host_time)`` and
+``(source, host_time)`` make a query such as "all ERR:LRX between T1 and
+T2" a range scan over the matching rows only.
+
+Rows are buffered and inserted in one transaction per batch (every
+``batch_size`` rows or ``commit_interval`` seconds, whichever comes
+first). The database uses WAL journaling, so it can be queried while a
+monitor is still writing to it.
+
+Example::
+
+    with LogStore('gateway.db') as store:
+        store.add_lines(lines)
+
+    store = LogStore('gateway.db', readonly=True)
+    for record in store.query(start, end, levels=['ERR'], sources=['LRX']):
+        print(record)
+
+Author: Assistant
+Date: October 2025
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from .log_parser import LOG_PATTERN
+
+SCHEMA_VERSION = 1
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_COMMIT_INTERVAL = 1.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS log (
+    id INTEGER PRIMARY KEY,
+    host_time REAL NOT NULL,
+    tick INTEGER,
+    level TEXT,
+    source TEXT,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS log_time ON log (host_time);
+CREATE INDEX IF NOT EXISTS log_level_source_time ON log (level, source, host_time);
+CREATE INDEX IF NOT EXISTS log_source_time ON log (source, host_time);
+"""
+
+
+def parse_time(text: str) -> float:
+    """
+    Unix time from an ISO date (``2025-10-16 15:30``), a time of day
+    (``15:30:05``, today) or a Unix timestamp.
+
+    Raises:
+        ValueError: If the text is none of these
+    """
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(text).timestamp()
+    except ValueError:
+        pass
+    of_day = datetime.strptime(text, '%H:%M:%S' if text.count(':') == 2 else '%H:%M').time()
+    return datetime.combine(datetime.now().date(), of_day).timestamp()
+
+
+class LogRecord(NamedTuple):
+    """One stored log line."""
+
+    host_time: float
+    tick: Optional[int]
+    level: Optional[str]
+    source: Optional[str]
+    message: str
+
+
+class LogStore:
+    """Batched writer and indexed queries over a SQLite log database."""
+
+    def __init__(self, path: str, readonly: bool = False, batch_size: int = DEFAULT_BATCH_SIZE,
+                 commit_interval: float = DEFAULT_COMMIT_INTERVAL):
+        """
+        Args:
+            path: Database file (created if it does not exist, unless readonly)
+            readonly: Open an existing database for queries only
+            batch_size: Rows buffered before they are committed
+            commit_interval: Longest time in seconds rows stay buffered
+
+        Raises:
+            sqlite3.Error: If the database cannot be opened
+        """
+        self.path = path
+        self.readonly = readonly
+        self.batch_size = batch_size
+        self.commit_interval = commit_interval
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._lock = threading.Lock()
+        self._rows: List[Tuple] = []
+        self._last_commit = time.monotonic()
+
+        if readonly:
+            self._db = sqlite3.connect(f'file:{path}?mode=ro', uri=True, check_same_thread=False)
+        else:
+            # Written from the reader thread, committed from whichever thread calls commit()
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('PRAGMA synchronous=NORMAL')
+            self._db.executescript(_SCHEMA)
+            self._db.execute(f'PRAGMA user_version={SCHEMA_VERSION}')
+            self._db.commit()
+
+        # Statistics
+        self.records = 0
+        self.commits = 0
+
+    def add_lines(self, lines: Iterable[str], host_time: Optional[float] = None):
+        """
+        Parse and buffer log lines received at ``host_time``.
+
+        Args:
+            lines: Text lines without line endings; blank lines are skipped
+            host_time: Unix time of reception (default: now)
+        """
+        if host_time is None:
+            host_time = time.time()
+        rows = []
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            match = LOG_PATTERN.match(line)
+            if match is None:
+                rows.append((host_time, None, None, None, line))
+            else:
+                tick, level, source, message = match.groups()
+                rows.append((host_time, int(tick), level, source, message))
+        if rows:
+            with self._lock:
+                self._rows.extend(rows)
+                if len(self._rows) < self.batch_size:
+                    return
+                self._commit()
+
+    def add(self, record: LogRecord):
+        """Buffer one record."""
+        with self._lock:
+            self._rows.append(tuple(record))
+            if len(self._rows) >= self.batch_size:
+                self._commit()
+
+    def _commit(self):
+        rows, self._rows = self._rows, []
+        self._last_commit = time.monotonic()
+        if not rows:
+            return
+        with self._db:
+            self._db.executemany('INSERT INTO log (host_time, tick, level, source, message) '
+                                 'VALUES (?, ?, ?, ?, ?)', rows)
+        self.records += len(rows)
+        self.commits += 1
+
+    def commit(self):
+        """Write all buffered rows in one transaction."""
+        with self._lock:
+            self._commit()
+
+    def commit_if_due(self):
+        """Commit buffered rows older than ``commit_interval``; call periodically."""
+        with self._lock:
+            if self._rows and time.monotonic() - self._last_commit >= self.commit_interval:
+                self._commit()
+
+    @property
+    def pending(self) -> int:
+        """Rows buffered but not yet committed."""
+        return len(self._rows)
+
+    @staticmethod
+    def _where(start: Optional[float], end: Optional[float], levels: Optional[Sequence[str]],
+               sources: Optional[Sequence[str]], contains: Optional[str]) -> Tuple[str, list]:
+        clauses = []
+        params: list = []
+        if start is not None:
+            clauses.append('host_time >= ?')
+            params.append(start)
+        if end is not None:
+            clauses.append('host_time < ?')
+            params.append(end)
+        if levels:
+            clauses.append(f"level IN ({', '.join('?' * len(levels))})")
+            params.extend(levels)
+        if sources:
+            clauses.append(f"source IN ({', '.join('?' * len(sources))})")
+            params.extend(sources)
+        if contains:
+            clauses.append("message LIKE ? ESCAPE '\\'")
+            escaped = contains.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            params.append(f'%{escaped}%')
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def query(self, start: Optional[float] = None, end: Optional[float] = None,
+              levels: Optional[Sequence[str]] = None, sources: Optional[Sequence[str]] = None,
+              contains: Optional[str] = None, limit: Optional[int] = None,
+              newest_first: bool = False) -> List[LogRecord]:
+        """
+        Records matching all given filters, in reception order.
+
+        Args:
+            start: Earliest host time (inclusive)
+            end: Latest host time (exclusive)
+            levels: Accepted levels, e.g. ``['ERR', 'CRT']``
+            sources: Accepted sources, e.g. ``['LRX']``
+            contains: Substring the message must contain
+            limit: Maximum records returned
+            newest_first: Return the newest records first
+
+        Returns:
+            Matching records
+        """
+        where, params = self._where(start, end, levels, sources, contains)
+        order = 'DESC' if newest_first else 'ASC'
+        sql = f'SELECT host_time, tick, level, source, message FROM log{where} ORDER BY host_time {order}, id {order}'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        with self._lock:
+            return [LogRecord(*row) for row in self._db.execute(sql, params)]
+
+    def count(self, start: Optional[float] = None, end: Optional[float] = None,
+              levels: Optional[Sequence[str]] = None, sources: Optional[Sequence[str]] = None,
+              contains: Optional[str] = None) -> int:
+        """Number of records matching the filters (see ``query``)."""
+        where, params = self._where(start, end, levels, sources, contains)
+        with self._lock:
+            return self._db.execute(f'SELECT COUNT(*) FROM log{where}', params).fetchone()[0]
+
+    def summary(self, start: Optional[float] = None, end: Optional[float] = None) -> List[Tuple[str, str, int]]:
+        """Record counts per level and source, most frequent first."""
+        where, params = self._where(start, end, None, None, None)
+        with self._lock:
+            return self._db.execute(f'SELECT level, source, COUNT(*) AS n FROM log{where} '
+                                    f'GROUP BY level, source ORDER BY n DESC', params).fetchall()
+
+    def time_range(self) -> Tuple[Optional[float], Optional[float]]:
+        """Host times of the first and last stored records."""
+        with self._lock:
+            return self._db.execute('SELECT MIN(host_time), MAX(host_time) FROM log').fetchone()
+
+    def close(self):
+        """Commit buffered rows and close the database."""
+        with self._lock:
+            if self._db is None:
+                return
+            if not self.readonly:
+                self._commit()
+            self._db.close()
+            self._db = None
+        if not self.readonly:
+            self.logger.info(f"Log store {self.path} closed: {self.records} records in {self.commits} commits")
+
+    def __enter__(self) -> 'LogStore':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
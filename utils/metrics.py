@@ -0,0 +1,234 @@
+"""
+Protocol Metrics
+================
+
+Counters and per-command latency histograms for one serial link.
+
+``ProtocolMetrics`` is fed by whoever owns the port (bytes and frames in
+each direction) and by ``RequestCorrelator`` (round trips, retries and
+timeouts per command). CRC failures and resyncs are read from the
+link's ``FrameDecoder`` when the snapshot is taken, so they are never
+counted twice.
+
+Round trips go into log-spaced histogram buckets (eight per octave, ~9%
+wide), so p50/p95/p99 cost constant memory however long the link runs.
+
+Example::
+
+    metrics = ProtocolMetrics(decoder)
+    correlator = RequestCorrelator(send, metrics=metrics)
+    ...
+    print(metrics.to_json())
+
+Author: Assistant
+Date: October 2025
+"""
+
+import json
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .command_registry import REGISTRY
+from .protocol import Frame, FrameDecoder
+
+MetricsKey = Tuple[int, int, int]
+
+# Histogram resolution: 2**(1/8) growth per bucket from 10 us upwards
+BUCKETS_PER_OCTAVE = 8
+HISTOGRAM_MIN = 1e-5
+
+PERCENTILES = (50, 95, 99)
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with percentile estimates."""
+
+    __slots__ = ('buckets', 'count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def add(self, value: float):
+        """Record one sample, in seconds."""
+        index = self._index(value)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    @staticmethod
+    def _index(value: float) -> int:
+        if value <= HISTOGRAM_MIN:
+            return 0
+        return int(math.log2(value / HISTOGRAM_MIN) * BUCKETS_PER_OCTAVE) + 1
+
+    @staticmethod
+    def _bucket_value(index: int) -> float:
+        """Geometric middle of a bucket."""
+        if index == 0:
+            return HISTOGRAM_MIN
+        return HISTOGRAM_MIN * 2 ** ((index - 0.5) / BUCKETS_PER_OCTAVE)
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Estimated value below which ``percent`` of the samples fall."""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(self.count * percent / 100))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(max(self._bucket_value(index), self.min), self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        """Summary in milliseconds."""
+        def ms(value):
+            return None if value is None else round(value * 1000, 3)
+        data = {'count': self.count, 'min_ms': ms(self.min), 'mean_ms': ms(self.mean), 'max_ms': ms(self.max)}
+        for percent in PERCENTILES:
+            data[f'p{percent}_ms'] = ms(self.percentile(percent))
+        return data
+
+
+class CommandStats:
+    """Round trips and failures of one device/command."""
+
+    __slots__ = ('rtt', 'responses', 'retries', 'timeouts')
+
+    def __init__(self):
+        self.rtt = LatencyHistogram()
+        self.responses = 0
+        self.retries = 0
+        self.timeouts = 0
+
+
+class ProtocolMetrics:
+    """Thread-safe traffic counters and per-command latency for one link."""
+
+    def __init__(self, decoder: Optional[FrameDecoder] = None):
+        """
+        Args:
+            decoder: Frame decoder of the link, for CRC error and resync counts
+        """
+        self.decoder = decoder
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Zero all counters and histograms."""
+        with self._lock:
+            self.started = time.time()
+            self.bytes_tx = 0
+            self.bytes_rx = 0
+            self.frames_tx = 0
+            self.frames_rx = 0
+            self.retries = 0
+            self.timeouts = 0
+            self.unmatched = 0
+            # Keyed by request key and kind: on VLAD modules 0x20 is both a query and a SET
+            self._commands: Dict[Tuple[MetricsKey, Optional[str]], CommandStats] = {}
+            self._decoder_base = self._decoder_counts()
+
+    def _decoder_counts(self) -> Tuple[int, int, int]:
+        decoder = self.decoder
+        if decoder is None:
+            return (0, 0, 0)
+        return (decoder.crc_errors, decoder.resyncs, decoder.bytes_discarded)
+
+    def _stats(self, key: MetricsKey, kind: Optional[str]) -> CommandStats:
+        stats = self._commands.get((key, kind))
+        if stats is None:
+            stats = self._commands[(key, kind)] = CommandStats()
+        return stats
+
+    def record_tx(self, num_bytes: int, frames: int = 1):
+        """Bytes written to the port."""
+        with self._lock:
+            self.bytes_tx += num_bytes
+            self.frames_tx += frames
+
+    def record_rx(self, num_bytes: int):
+        """Bytes read from the port."""
+        with self._lock:
+            self.bytes_rx += num_bytes
+
+    def record_frames(self, frames: List[Frame]):
+        """Frames decoded from received bytes."""
+        if frames:
+            with self._lock:
+                self.frames_rx += len(frames)
+
+    def record_response(self, key: MetricsKey, rtt: float, kind: Optional[str] = None):
+        """A request of ``kind`` answered after ``rtt`` seconds (measured from its last transmission)."""
+        with self._lock:
+            stats = self._stats(key, kind)
+            stats.responses += 1
+            stats.rtt.add(rtt)
+
+    def record_retry(self, key: MetricsKey, kind: Optional[str] = None):
+        with self._lock:
+            self._stats(key, kind).retries += 1
+            self.retries += 1
+
+    def record_timeout(self, key: MetricsKey, kind: Optional[str] = None):
+        with self._lock:
+            self._stats(key, kind).timeouts += 1
+            self.timeouts += 1
+
+    def record_unmatched(self):
+        """A frame that answered no outstanding request."""
+        with self._lock:
+            self.unmatched += 1
+
+    def snapshot(self) -> dict:
+        """
+        Current values as plain data.
+
+        Returns:
+            ``{'elapsed', 'counters', 'commands'}``; commands are keyed
+            ``"FUNC:ID NAME"`` with latencies in milliseconds
+        """
+        with self._lock:
+            crc_errors, resyncs, discarded = (now - base for now, base in
+                                              zip(self._decoder_counts(), self._decoder_base))
+            counters = {
+                'bytes_tx': self.bytes_tx,
+                'bytes_rx': self.bytes_rx,
+                'frames_tx': self.frames_tx,
+                'frames_rx': self.frames_rx,
+                'crc_errors': crc_errors,
+                'resyncs': resyncs,
+                'bytes_discarded': discarded,
+                'retries': self.retries,
+                'timeouts': self.timeouts,
+                'unmatched': self.unmatched,
+            }
+            commands = {}
+            for ((module_function, module_id, command), kind), stats in sorted(
+                    self._commands.items(), key=lambda item: (item[0][0], item[0][1] or '')):
+                name = REGISTRY.command_name(command, module_function, kind)
+                entry = stats.rtt.to_dict()
+                entry.update(responses=stats.responses, retries=stats.retries, timeouts=stats.timeouts)
+                commands[f"{module_function}:{module_id} {name}"] = entry
+            return {'elapsed': round(time.time() - self.started, 3), 'counters': counters, 'commands': commands}
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        """Snapshot as a JSON document."""
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def dump(self, path: str):
+        """Write the snapshot to a JSON file."""
+        with open(path, 'w') as f:
+            f.write(self.to_json())
@@ -0,0 +1,186 @@
+"""
+Parameter Cache
+===============
+
+Per-device cache of decoded parameter values, so tools can show the
+current state of many modules without querying each one over the bus
+every time.
+
+Values are keyed by device ``(module_function, module_id)`` and
+parameter key. Each parameter has its own time-to-live (``cache_ttl`` in
+``PARAMETERS``): radio settings only change when a host writes them,
+while readings such as output power drift continuously. Query responses
+and SET acknowledgements are written through as frames are decoded, so
+a successful SET updates the cache without a readback. The caller passes
+the kind of the request each frame answers (see
+``RequestCorrelator.pending_kind``); unsolicited frames are not cached.
+
+Stale-while-revalidate::
+
+    value, fresh = cache.lookup(device, 'tx_freq')
+    if not fresh:
+        cache.revalidate(device, 'tx_freq', lambda: manager.query_parameter(*device, 0x20))
+
+Author: Assistant
+Date: October 2025
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+from .command_registry import PARAMETERS, REGISTRY, CommandRegistry
+
+DeviceKey = Tuple[int, int]
+
+# TTL for parameters without a cache_ttl entry
+DEFAULT_TTL = 5.0
+
+
+class CacheEntry(NamedTuple):
+    """One cached value."""
+
+    value: Any
+    updated: float      # time.monotonic() when stored
+    ttl: float
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (time.monotonic() if now is None else now) - self.updated
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return self.age(now) < self.ttl
+
+
+class ParameterCache:
+    """Thread-safe parameter value cache with per-parameter TTLs."""
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, registry: CommandRegistry = REGISTRY):
+        """
+        Args:
+            ttls: Override TTLs in seconds, by parameter key
+            registry: Registry used to decode frames in ``on_frame``
+        """
+        self.registry = registry
+        self.ttls = {key: info.get('cache_ttl', DEFAULT_TTL) for key, info in PARAMETERS.items()}
+        if ttls:
+            self.ttls.update(ttls)
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._entries: Dict[Tuple[DeviceKey, str], CacheEntry] = {}
+        self._revalidating = set()
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.revalidations = 0
+
+    def update(self, device: DeviceKey, key: str, value, timestamp: Optional[float] = None):
+        """Store a value, ending any revalidation in progress for it."""
+        entry = CacheEntry(value, time.monotonic() if timestamp is None else timestamp,
+                           self.ttls.get(key, DEFAULT_TTL))
+        with self._lock:
+            self._entries[(device, key)] = entry
+            self._revalidating.discard((device, key))
+
+    def on_frame(self, frame, kind: Optional[str]) -> bool:
+        """
+        Write through a decoded query response or SET acknowledgement.
+
+        Args:
+            frame: Decoded frame
+            kind: Kind of the request the frame answers, None if unsolicited
+
+        Returns:
+            True if the frame carried a parameter value
+        """
+        if kind is None:
+            return False
+        spec = self.registry.lookup(frame.module_function, frame.command, kind)
+        if spec is None or spec.parameter is None or spec.codec is None:
+            return False
+        value = spec.codec.decode(frame.payload)
+        if value is None:
+            return False
+        self.update((frame.module_function, frame.module_id), spec.parameter, value)
+        return True
+
+    def peek(self, device: DeviceKey, key: str) -> Optional[CacheEntry]:
+        """Return the entry regardless of age, without touching statistics."""
+        with self._lock:
+            return self._entries.get((device, key))
+
+    def get(self, device: DeviceKey, key: str):
+        """Return the value if it is fresh, otherwise None."""
+        value, fresh = self.lookup(device, key)
+        return value if fresh else None
+
+    def lookup(self, device: DeviceKey, key: str) -> Tuple[Any, bool]:
+        """
+        Return ``(value, fresh)``; value is None if nothing is cached.
+
+        A stale value is still returned so callers can show it while it
+        is refreshed (see ``revalidate``).
+        """
+        with self._lock:
+            entry = self._entries.get((device, key))
+            if entry is None:
+                self.misses += 1
+                return None, False
+            if entry.is_fresh():
+                self.hits += 1
+                return entry.value, True
+            self.stale_hits += 1
+            return entry.value, False
+
+    def revalidate(self, device: DeviceKey, key: str, refresh: Callable[[], Any]) -> bool:
+        """
+        Start a refresh unless one is already running for this value.
+
+        Args:
+            refresh: Sends the query; may return a Future or asyncio Task,
+                whose completion also ends the revalidation
+
+        Returns:
+            True if ``refresh`` was called
+        """
+        with self._lock:
+            if (device, key) in self._revalidating:
+                return False
+            self._revalidating.add((device, key))
+            self.revalidations += 1
+
+        def finished(*args):
+            with self._lock:
+                self._revalidating.discard((device, key))
+
+        try:
+            pending = refresh()
+        except Exception:
+            finished()
+            raise
+        if pending is None:
+            finished()
+        elif hasattr(pending, 'add_done_callback'):
+            pending.add_done_callback(finished)
+        return pending is not None
+
+    def invalidate(self, device: Optional[DeviceKey] = None, key: Optional[str] = None):
+        """Drop one value, all values of a device, or everything."""
+        with self._lock:
+            if device is None:
+                self._entries.clear()
+            elif key is not None:
+                self._entries.pop((device, key), None)
+            else:
+                for entry_key in [k for k in self._entries if k[0] == device]:
+                    del self._entries[entry_key]
+
+    def values(self, device: DeviceKey, fresh_only: bool = False) -> Dict[str, Any]:
+        """All cached values of one device, by parameter key."""
+        now = time.monotonic()
+        with self._lock:
+            return {key: entry.value for (dev, key), entry in self._entries.items()
+                    if dev == device and (not fresh_only or entry.is_fresh(now))}
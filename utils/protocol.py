@@ -0,0 +1,186 @@
+"""
+Gateway Frame Protocol
+======================
+
+Framing for the 0x7E/0x7F serial protocol spoken by the LoRa Gateway
+firmware (see ``CommandMessage::composeAndSendMessage``)::
+
+    [START][FUNC][ID][CMD][RSV][LEN][DATA ...][CRC_L][CRC_H][END]
+
+The CRC is CRC-16/XMODEM over FUNC..DATA, stored little-endian.
+
+Author: Assistant
+Date: October 2025
+"""
+
+import logging
+import struct
+from typing import Iterable, Iterator, List, NamedTuple, Optional
+
+from .crc16 import crc16_xmodem
+
+# Protocol Constants
+START_MARK = 0x7E
+END_MARK = 0x7F
+
+HEADER_SIZE = 6        # START, FUNC, ID, CMD, RESERVED, LEN
+FOOTER_SIZE = 3        # CRC_L, CRC_H, END
+MIN_FRAME_SIZE = HEADER_SIZE + FOOTER_SIZE
+MAX_FRAME_SIZE = MIN_FRAME_SIZE + 255
+
+DATA_LEN_INDEX = 5
+
+_START_BYTE = bytes([START_MARK])
+_CRC_STRUCT = struct.Struct("<H")
+
+
+class Frame(NamedTuple):
+    """A complete, CRC-validated protocol frame."""
+
+    module_function: int
+    module_id: int
+    command: int
+    payload: bytes
+    raw: bytes
+
+
+class FrameBuilder:
+    """Frame builder for serial communication protocol."""
+
+    def __init__(self):
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def _calculate_crc(self, data: bytes) -> bytes:
+        """Calculate CRC16 XMODEM checksum."""
+        return _CRC_STRUCT.pack(crc16_xmodem(data))
+
+    def build_frame(self, module_function: int, module_id: int, command_id: int, data: Optional[bytes] = None) -> bytes:
+        """Build generic frame with CRC."""
+        frame = bytearray([START_MARK, module_function, module_id, command_id, 0, len(data or [])])
+        frame.extend(data or b"")
+        frame += self._calculate_crc(frame[1:])
+        frame.append(END_MARK)
+        return bytes(frame)
+
+
+class FrameDecoder:
+    """
+    Incremental decoder for the gateway frame protocol.
+
+    Bytes can be fed in arbitrary chunks: partial frames are kept between
+    calls and several frames packed into one chunk are all returned. On a
+    bad end mark or CRC the decoder drops the candidate START_MARK and
+    resynchronises on the next one found with ``bytearray.find``.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._buffer = bytearray()
+
+        # Statistics
+        self.frames_decoded = 0
+        self.crc_errors = 0
+        self.resyncs = 0
+        self.bytes_discarded = 0
+
+    def reset(self):
+        """Drop any partial frame held in the buffer."""
+        self._buffer.clear()
+
+    @property
+    def pending(self) -> int:
+        """Number of buffered bytes not yet consumed by a frame."""
+        return len(self._buffer)
+
+    def feed(self, data: bytes) -> List[Frame]:
+        """
+        Feed a chunk of received bytes.
+
+        Args:
+            data: Raw bytes as read from the serial port
+
+        Returns:
+            List of complete frames found so far, in arrival order
+        """
+        buf = self._buffer
+        buf += data
+        frames = []
+
+        while buf:
+            start = buf.find(_START_BYTE)
+            if start < 0:
+                self.bytes_discarded += len(buf)
+                buf.clear()
+                break
+            if start > 0:
+                self.bytes_discarded += start
+                del buf[:start]
+
+            total = self._check_candidate(0)
+            if total == 0:
+                # Incomplete candidate. A START_MARK inside a corrupted frame
+                # would otherwise stall delivery of the frames behind it
+                # until enough bytes arrive, so look for a complete frame
+                # further along and resync on it if there is one.
+                skip = self._find_complete_frame()
+                if skip < 0:
+                    break
+                self.resyncs += 1
+                self.bytes_discarded += skip
+                del buf[:skip]
+                continue
+
+            if total < 0:
+                # False start or corrupted frame: skip this START_MARK
+                self.resyncs += 1
+                self.bytes_discarded += 1
+                del buf[:1]
+                continue
+
+            raw = bytes(buf[:total])
+            del buf[:total]
+            frames.append(Frame(raw[1], raw[2], raw[3], raw[HEADER_SIZE:total - FOOTER_SIZE], raw))
+
+        self.frames_decoded += len(frames)
+        return frames
+
+    def _check_candidate(self, pos: int, count_errors: bool = True) -> int:
+        """
+        Check the frame candidate starting at ``pos`` in the buffer.
+
+        Returns:
+            Frame length if complete and valid, 0 if more bytes are
+            needed, -1 if the candidate is invalid
+        """
+        buf = self._buffer
+        available = len(buf) - pos
+        if available < HEADER_SIZE:
+            return 0
+
+        total = MIN_FRAME_SIZE + buf[pos + DATA_LEN_INDEX]
+        if available < total:
+            return 0
+
+        end = pos + total - FOOTER_SIZE
+        if buf[end + 2] != END_MARK:
+            return -1
+        if crc16_xmodem(buf[pos + 1:end]) != (buf[end] | (buf[end + 1] << 8)):
+            if count_errors:
+                self.crc_errors += 1
+            return -1
+        return total
+
+    def _find_complete_frame(self) -> int:
+        """Return the offset of the next complete valid frame after position 0, or -1."""
+        buf = self._buffer
+        pos = buf.find(_START_BYTE, 1)
+        while pos >= 0 and len(buf) - pos >= MIN_FRAME_SIZE:
+            if self._check_candidate(pos, count_errors=False) > 0:
+                return pos
+            pos = buf.find(_START_BYTE, pos + 1)
+        return -1
+
+    def iter_frames(self, chunks: Iterable[bytes]) -> Iterator[Frame]:
+        """Yield frames decoded from an iterable of byte chunks."""
+        for chunk in chunks:
+            yield from self.feed(chunk)
@@ -0,0 +1,352 @@
+"""
+Request Correlator
+==================
+
+Ties gateway responses to the requests that caused them.
+
+The firmware answers a command with a frame carrying the same module
+function, module id and command code, so requests are keyed by
+``(module_function, module_id, command)``. Each request returns a
+``concurrent.futures.Future`` that resolves with the response ``Frame``,
+or fails with ``TimeoutError`` once its retries are exhausted.
+
+Unless a fixed timeout is given, per-attempt timeouts come from a shared
+``TimeoutEstimator``: wire time at the link's baudrate plus the device's
+smoothed turnaround, learned from every answered request.
+
+Author: Assistant
+Date: October 2025
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .command_registry import request_kind
+from .metrics import ProtocolMetrics
+from .protocol import Frame, FrameBuilder
+from .timeouts import TimeoutEstimator
+from .tracing import TRACER, request_label
+
+RequestKey = Tuple[int, int, int]
+
+
+class _PendingRequest:
+    """Book-keeping for one outstanding request."""
+
+    __slots__ = ('key', 'kind', 'frame', 'future', 'timeout', 'retries', 'attempts', 'deadline', 'sent_at',
+                 'trace_id', 'queued_at', 'written_at')
+
+    def __init__(self, key: RequestKey, kind: str, frame: bytes, future: Future, timeout: Optional[float],
+                 retries: int):
+        self.key = key
+        self.kind = kind                # KIND_QUERY or KIND_SET
+        self.frame = frame
+        self.future = future
+        self.timeout = timeout          # None: adaptive
+        self.retries = retries
+        self.attempts = 0
+        self.deadline = 0.0
+        self.sent_at = 0.0
+        self.trace_id = 0             # Non-zero while tracing
+        self.queued_at = 0.0
+        self.written_at = 0.0
+
+
+class RequestCorrelator:
+    """
+    Pipelined request/response correlation with timeouts and retries.
+
+    Up to ``max_outstanding`` requests are on the wire at once; the rest
+    wait in FIFO order and are sent as soon as a slot frees up, so a bulk
+    readout takes one round trip per command instead of a fixed delay.
+    The gateway handles one UART frame at a time, hence the default of 1.
+    Two requests with the same key are never outstanding together because
+    their responses could not be told apart.
+    """
+
+    def __init__(self, send: Callable[[bytes], bool], max_outstanding: int = 1,
+                 timeout: Optional[float] = None, retries: int = 2,
+                 estimator: Optional[TimeoutEstimator] = None, metrics: Optional[ProtocolMetrics] = None):
+        """
+        Args:
+            send: Function that writes a frame to the port, returning success
+            max_outstanding: Maximum requests awaiting a response at once
+            timeout: Default per-attempt response timeout in seconds; None
+                derives it per request from ``estimator``
+            retries: Default number of retransmissions after a timeout
+            estimator: Round-trip history of the link, shared with other users
+                of the same port; a 115200 baud estimator by default
+            metrics: Receives round trips, retries and timeouts per command
+        """
+        self.send = send
+        self.max_outstanding = max(1, max_outstanding)
+        self.timeout = timeout
+        self.retries = retries
+        self.estimator = estimator if estimator is not None else TimeoutEstimator()
+        self.metrics = metrics if metrics is not None else ProtocolMetrics()
+        self.frame_builder = FrameBuilder()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._cond = threading.Condition()
+        self._waiting = deque()
+        self._inflight: Dict[RequestKey, _PendingRequest] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+        # Statistics
+        self.completed = 0
+        self.timeouts = 0
+        self.retransmits = 0
+        self.unmatched = 0
+
+    def submit(self, module_function: int, module_id: int, command: int, data: Optional[bytes] = None,
+               timeout: Optional[float] = None, retries: Optional[int] = None) -> Future:
+        """
+        Queue a request and return a future for its response frame.
+
+        Args:
+            module_function: Target module function
+            module_id: Target module id
+            command: Command code
+            data: Optional payload
+            timeout: Per-attempt timeout, defaults to the correlator setting
+                (adaptive if that is None)
+            retries: Retransmissions after timeout, defaults to the correlator setting
+
+        Returns:
+            Future resolving to the response Frame
+        """
+        frame = self.frame_builder.build_frame(module_function, module_id, command, data)
+        request = _PendingRequest((module_function, module_id, command), request_kind(data), frame, Future(),
+                                  self.timeout if timeout is None else timeout,
+                                  self.retries if retries is None else retries)
+        if TRACER.enabled:
+            request.trace_id = TRACER.new_id()
+            request.queued_at = TRACER.now()
+            TRACER.begin(request_label(request.key, request.kind), request.trace_id, request.queued_at,
+                         {'frame': frame.hex(' ').upper()})
+        with self._cond:
+            self._waiting.append(request)
+            self._ensure_thread()
+            to_send = self._fill_slots()
+        request.future.add_done_callback(lambda future: self._on_done(request))
+        self._transmit(to_send)
+        return request.future
+
+    def _on_done(self, request: _PendingRequest):
+        """Free the slot of a request whose future the caller cancelled."""
+        if not request.future.cancelled():
+            return
+        with self._cond:
+            if self._inflight.get(request.key) is not request:
+                return
+            del self._inflight[request.key]
+            to_send = self._fill_slots()
+        if request.trace_id:
+            TRACER.end(request_label(request.key, request.kind), request.trace_id, args={'error': 'cancelled'})
+        self._transmit(to_send)
+
+    def pending_kind(self, frame: Frame) -> Optional[str]:
+        """
+        Kind of the outstanding request a frame answers, None if unsolicited.
+
+        Lets decoders that run before ``on_frame`` resolve the response
+        with ``CommandRegistry.lookup``.
+        """
+        with self._cond:
+            request = self._inflight.get((frame.module_function, frame.module_id, frame.command))
+            return request.kind if request is not None else None
+
+    def on_frame(self, frame: Frame, first_byte_at: Optional[float] = None) -> bool:
+        """
+        Resolve the request matching a received frame.
+
+        Args:
+            frame: Decoded frame
+            first_byte_at: ``TRACER.now()`` when the frame's first byte
+                arrived, if known (tracing only)
+
+        Returns:
+            True if the frame answered an outstanding request
+        """
+        key = (frame.module_function, frame.module_id, frame.command)
+        with self._cond:
+            request = self._inflight.pop(key, None)
+            if request is None:
+                self.unmatched += 1
+                self.metrics.record_unmatched()
+                return False
+            self.completed += 1
+            to_send = self._fill_slots()
+            self._cond.notify()
+        if request.trace_id:
+            self._trace_response(request, first_byte_at)
+        rtt = time.monotonic() - request.sent_at
+        self.metrics.record_response(key, rtt, request.kind)
+        self.estimator.observe(key, rtt, len(request.frame), len(frame.raw), retransmitted=request.attempts > 1)
+        self._resolve(request.future, result=frame)
+        self._transmit(to_send)
+        return True
+
+    @property
+    def outstanding(self) -> int:
+        """Number of requests sent and awaiting a response."""
+        return len(self._inflight)
+
+    @property
+    def queued(self) -> int:
+        """Number of requests waiting for a free slot."""
+        return len(self._waiting)
+
+    def cancel_all(self, reason: str = "Request cancelled"):
+        """Fail every queued and outstanding request."""
+        with self._cond:
+            requests = list(self._inflight.values()) + list(self._waiting)
+            self._inflight.clear()
+            self._waiting.clear()
+        for request in requests:
+            if request.trace_id:
+                TRACER.end(request_label(request.key, request.kind), request.trace_id, args={'error': reason})
+            self._resolve(request.future, exception=ConnectionError(reason))
+
+    def close(self):
+        """Cancel all requests and stop the timeout thread."""
+        self.cancel_all("Correlator closed")
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        self._thread = None
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._running = True
+            self._thread = threading.Thread(target=self._timeout_loop, daemon=True)
+            self._thread.start()
+
+    def _fill_slots(self) -> List[_PendingRequest]:
+        """Move waiting requests in flight while slots are free. Caller holds the lock."""
+        to_send = []
+        skipped = []
+        now = time.monotonic()
+        while self._waiting and len(self._inflight) < self.max_outstanding:
+            request = self._waiting.popleft()
+            if request.future.done():
+                if request.trace_id:
+                    TRACER.end(request_label(request.key, request.kind), request.trace_id, args={'error': 'cancelled'})
+                continue
+            if request.key in self._inflight:
+                skipped.append(request)
+                continue
+            request.attempts = 1
+            request.sent_at = now
+            request.deadline = now + self._attempt_timeout(request)
+            self._inflight[request.key] = request
+            to_send.append(request)
+        self._waiting.extendleft(reversed(skipped))
+        if to_send:
+            self._cond.notify()
+        return to_send
+
+    def _attempt_timeout(self, request: _PendingRequest) -> float:
+        if request.timeout is not None:
+            return request.timeout
+        return self.estimator.timeout(request.key, len(request.frame), attempt=request.attempts)
+
+    def _transmit(self, requests: List[_PendingRequest]):
+        for request in requests:
+            if request.trace_id:
+                sent = self._traced_send(request)
+            else:
+                sent = self.send(request.frame)
+            if not sent:
+                with self._cond:
+                    if self._inflight.get(request.key) is request:
+                        del self._inflight[request.key]
+                    to_send = self._fill_slots()
+                self._resolve(request.future, exception=IOError(f"Failed to send {request.frame.hex().upper()}"))
+                self._transmit(to_send)
+
+    def _timeout_loop(self):
+        while True:
+            with self._cond:
+                if not self._running:
+                    return
+                now = time.monotonic()
+                expired = [r for r in self._inflight.values() if r.deadline <= now]
+                if not expired:
+                    next_deadline = min((r.deadline for r in self._inflight.values()), default=None)
+                    self._cond.wait(None if next_deadline is None else next_deadline - now)
+                    continue
+
+                resend = []
+                failed = []
+                for request in expired:
+                    if request.future.done():
+                        # Cancelled by the caller: never retransmit it
+                        del self._inflight[request.key]
+                        continue
+                    if request.attempts <= request.retries:
+                        request.attempts += 1
+                        request.sent_at = now
+                        request.deadline = now + self._attempt_timeout(request)
+                        self.retransmits += 1
+                        self.metrics.record_retry(request.key, request.kind)
+                        resend.append(request)
+                    else:
+                        del self._inflight[request.key]
+                        self.timeouts += 1
+                        self.metrics.record_timeout(request.key, request.kind)
+                        failed.append(request)
+                resend.extend(self._fill_slots())
+
+            for request in failed:
+                key = request.key
+                if request.trace_id:
+                    TRACER.end(request_label(key, request.kind), request.trace_id, args={'error': 'timeout',
+                                                                           'attempts': request.attempts})
+                self.logger.warning(f"No response to command 0x{key[2]:02X} "
+                                    f"(function 0x{key[0]:02X}, id {key[1]}) after {request.attempts} attempts")
+                self._resolve(request.future, exception=TimeoutError(
+                    f"No response to command 0x{key[2]:02X} after {request.attempts} attempts"))
+            self._transmit(resend)
+
+    def _traced_send(self, request: _PendingRequest) -> bool:
+        started = TRACER.now()
+        if request.attempts == 1:
+            TRACER.span('host queue', request.trace_id, request.queued_at, started)
+        sent = self.send(request.frame)
+        request.written_at = TRACER.now()
+        TRACER.span(f'write #{request.attempts}', request.trace_id, started, request.written_at,
+                    None if sent else {'error': 'send failed'})
+        if not sent:
+            TRACER.end(request_label(request.key, request.kind), request.trace_id, request.written_at)
+        return sent
+
+    def _trace_response(self, request: _PendingRequest, first_byte_at: Optional[float]):
+        completed = TRACER.now()
+        if first_byte_at is None or first_byte_at < request.written_at:
+            first_byte_at = completed
+        TRACER.span('wire + firmware', request.trace_id, request.written_at, first_byte_at)
+        TRACER.span('receive', request.trace_id, first_byte_at, completed)
+        TRACER.end(request_label(request.key, request.kind), request.trace_id, completed,
+                   {'attempts': request.attempts})
+        TRACER.frame_complete(request.key, request.trace_id, completed)
+
+    @staticmethod
+    def _resolve(future: Future, result=None, exception: Optional[BaseException] = None):
+        if future.done():
+            return
+        try:
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
+        except Exception:
+            # Cancelled by the caller in the meantime
+            pass
@@ -0,0 +1,159 @@
+"""
+Request Jobs
+============
+
+Run a batch of gateway requests (a full parameter readout, applying a
+configuration) in the background with progress reporting and
+cancellation.
+
+A job submits all of its steps up front; the ``RequestCorrelator``
+paces them onto the wire one round trip at a time. Progress is reported
+from whichever thread resolves each future, so GUI callers should hand
+``JobProgress`` updates over to their own thread (e.g. through a queue
+drained by a Tk ``after()`` pump).
+
+Author: Assistant
+Date: October 2025
+"""
+
+import logging
+import threading
+from concurrent.futures import CancelledError, Future
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from .protocol import Frame
+
+SubmitFunction = Callable[[int, int, int, Optional[bytes]], Optional[Future]]
+
+
+class JobStep(NamedTuple):
+    """One request of a job."""
+
+    description: str
+    module_function: int
+    module_id: int
+    command: int
+    data: Optional[bytes] = None
+
+
+class JobProgress(NamedTuple):
+    """Snapshot of a job after one of its steps finished."""
+
+    job: 'RequestJob'
+    index: int                  # Step that just finished, -1 for the final update
+    completed: int              # Steps answered so far
+    failed: int                 # Steps that timed out, failed to send or were cancelled
+    total: int
+    error: Optional[str]        # Why this step failed, None if it succeeded
+    finished: bool
+
+
+class RequestJob:
+    """A cancellable batch of requests with per-step progress."""
+
+    def __init__(self, name: str, steps: List[JobStep], submit: SubmitFunction,
+                 on_progress: Optional[Callable[[JobProgress], None]] = None):
+        """
+        Args:
+            name: Job name for logs and progress displays
+            steps: Requests to send, in order
+            submit: Function ``(module_function, module_id, command, data)``
+                returning a Future for the response, or None if the request
+                could not be queued (e.g. port not connected)
+            on_progress: Called after every step and once more when the job ends
+        """
+        self.name = name
+        self.steps = list(steps)
+        self.submit = submit
+        self.on_progress = on_progress
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self.results: Dict[int, Frame] = {}
+        self.errors: Dict[int, str] = {}
+        self._futures: List[Future] = []
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+        self._cancelled = False
+
+    @property
+    def total(self) -> int:
+        return len(self.steps)
+
+    @property
+    def completed(self) -> int:
+        return len(self.results)
+
+    @property
+    def failed(self) -> int:
+        return len(self.errors)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    @property
+    def done(self) -> bool:
+        return self._finished.is_set()
+
+    def start(self) -> 'RequestJob':
+        """Queue every step; returns immediately."""
+        self.logger.info(f"{self.name}: starting {self.total} requests")
+        if not self.steps:
+            self._finish()
+            return self
+
+        for index, step in enumerate(self.steps):
+            if self._cancelled:
+                self._step_done(index, None, "Cancelled")
+                continue
+            future = self.submit(step.module_function, step.module_id, step.command, step.data)
+            if future is None:
+                self._step_done(index, None, "Not connected")
+                continue
+            with self._lock:
+                self._futures.append(future)
+            future.add_done_callback(lambda fut, i=index: self._on_future_done(i, fut))
+        return self
+
+    def cancel(self):
+        """Cancel every step that has not been answered yet."""
+        self._cancelled = True
+        with self._lock:
+            futures = list(self._futures)
+        for future in futures:
+            future.cancel()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job ends; returns False on timeout."""
+        return self._finished.wait(timeout)
+
+    def _on_future_done(self, index: int, future: Future):
+        try:
+            frame = future.result()
+        except CancelledError:
+            self._step_done(index, None, "Cancelled")
+        except Exception as e:
+            self._step_done(index, None, str(e))
+        else:
+            self._step_done(index, frame, None)
+
+    def _step_done(self, index: int, frame: Optional[Frame], error: Optional[str]):
+        with self._lock:
+            if error is None:
+                self.results[index] = frame
+            else:
+                self.errors[index] = f"{self.steps[index].description}: {error}"
+            progress = JobProgress(self, index, self.completed, self.failed, self.total,
+                                   self.errors.get(index), False)
+            last = self.completed + self.failed == self.total
+        if self.on_progress is not None:
+            self.on_progress(progress)
+        if last:
+            self._finish()
+
+    def _finish(self):
+        state = "cancelled" if self._cancelled else "finished"
+        self.logger.info(f"{self.name}: {state}, {self.completed}/{self.total} ok, {self.failed} failed")
+        self._finished.set()
+        if self.on_progress is not None:
+            self.on_progress(JobProgress(self, -1, self.completed, self.failed, self.total, None, True))
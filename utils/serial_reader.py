@@ -0,0 +1,162 @@
+"""
+Event-Driven Serial Reader
+==========================
+
+Reads from a serial port by waiting for data instead of polling
+``in_waiting`` on a fixed sleep.
+
+On POSIX the port file descriptor is watched with ``select`` and drained
+with ``os.read``; elsewhere, and for ports without a file descriptor
+such as ``loop://`` and ``rfc2217://`` URLs, a blocking ``read`` with a
+short timeout is used. Either way the reader wakes as soon as a byte
+arrives, and idle ports cost one wakeup per timeout instead of one
+every 10 ms.
+
+Author: Assistant
+Date: October 2025
+"""
+
+import io
+import logging
+import os
+import select
+import threading
+from typing import Callable, Optional
+
+DEFAULT_TIMEOUT = 0.05
+MIN_READ_SIZE = 64
+MAX_READ_SIZE = 65536
+
+
+class SerialReader:
+    """
+    Wait for and read whatever bytes a serial port has available.
+
+    The read size adapts to the traffic: it doubles when a read fills the
+    buffer (a burst is arriving) and halves when reads come back mostly
+    empty, so a busy port is drained in few system calls without keeping a
+    large buffer around for a quiet one.
+    """
+
+    def __init__(self, port, timeout: float = DEFAULT_TIMEOUT, min_read: int = MIN_READ_SIZE,
+                 max_read: int = MAX_READ_SIZE, use_select: Optional[bool] = None):
+        """
+        Args:
+            port: Open ``serial.Serial`` (or compatible) instance
+            timeout: Longest wait for data before ``read()`` returns empty
+            min_read: Smallest read size in bytes
+            max_read: Largest read size in bytes
+            use_select: Force or disable ``select`` mode; auto-detected if None
+        """
+        self.port = port
+        self.timeout = timeout
+        self.min_read = min_read
+        self.max_read = max_read
+        self.read_size = min_read
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._fd = None
+        if use_select is None:
+            use_select = os.name == 'posix'
+            if use_select:
+                # URL ports such as loop:// and rfc2217:// have fileno() but no descriptor
+                try:
+                    self._fd = port.fileno()
+                except (io.UnsupportedOperation, AttributeError):
+                    use_select = False
+        elif use_select:
+            self._fd = port.fileno()
+        if not use_select:
+            # Blocking mode: read() waits for the first byte up to the port timeout
+            port.timeout = timeout
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        # Statistics
+        self.reads = 0
+        self.bytes_read = 0
+        self.idle_wakeups = 0
+
+    @property
+    def uses_select(self) -> bool:
+        """True when waiting on the file descriptor with ``select``."""
+        return self._fd is not None
+
+    def read(self) -> bytes:
+        """
+        Wait up to ``timeout`` for data and return what is available.
+
+        Returns:
+            Received bytes, or ``b''`` if nothing arrived in time
+
+        Raises:
+            OSError: If the port reports readiness but returns no data
+                (device unplugged)
+        """
+        if self._fd is not None:
+            ready, _, _ = select.select([self._fd], [], [], self.timeout)
+            if not ready:
+                self.idle_wakeups += 1
+                return b''
+            data = os.read(self._fd, self.read_size)
+            if not data:
+                raise OSError("Device reports readiness to read but returned no data")
+        else:
+            # Block for the first byte, then take everything already buffered
+            data = self.port.read(max(1, min(self.port.in_waiting, self.read_size)))
+            if not data:
+                self.idle_wakeups += 1
+                return b''
+            waiting = self.port.in_waiting
+            if waiting:
+                data += self.port.read(min(waiting, self.max_read))
+
+        self._adapt(len(data))
+        self.reads += 1
+        self.bytes_read += len(data)
+        return data
+
+    def _adapt(self, count: int):
+        if count >= self.read_size:
+            self.read_size = min(self.read_size * 2, self.max_read)
+        elif count < self.read_size // 4:
+            self.read_size = max(self.read_size // 2, self.min_read)
+
+    def start(self, on_data: Callable[[bytes], None], on_error: Optional[Callable[[Exception], None]] = None):
+        """
+        Start a background thread that calls ``on_data`` for every read.
+
+        Args:
+            on_data: Called from the reader thread with each chunk received
+            on_error: Called once with the exception that stopped the thread
+        """
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(on_data, on_error), daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        """Stop the background thread; it exits within one read timeout."""
+        self._stop.set()
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        """True while the background thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self, on_data: Callable[[bytes], None], on_error: Optional[Callable[[Exception], None]]):
+        while not self._stop.is_set():
+            try:
+                data = self.read()
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                self.logger.error(f"Error reading serial data: {e}")
+                if on_error:
+                    on_error(e)
+                break
+            if data:
+                on_data(data)
@@ -0,0 +1,385 @@
+"""
+Gateway Firmware Simulator
+==========================
+
+Pty-backed stand-in for the LoRa Gateway so host tools can run without
+hardware (Linux/macOS only).
+
+Mirrors ``processUartCommand()`` in ``project/Core/Src/main.cpp``:
+
+- QUERY/SET of TX/RX frequency, spread factor, bandwidth and coding
+  rate; SET responses echo the SET command with the value actually
+  applied (out-of-range values are ignored, as in ``Lora::set_*``)
+- SET_UART_BAUDRATE restores the LoRa defaults and sends no response
+- SET_OPERATION_MODE (1=RX, 2=TX, 3=TX_RX) answers with the mode enum
+- TRIGGER_SNIFFER_SIMULATION (0x30) starts IO (1) or tag (2) frames
+  every second, anything else stops them
+- Frames for another module function/id are "retransmitted over LoRa"
+- Commands the firmware ignores get no response
+
+Settings live in an EEPROM dictionary, optionally persisted to a JSON
+file. The ``[ticks] LVL:SRC message`` logger stream goes to a second pty.
+
+Author: Assistant
+Date: October 2025
+"""
+
+import json
+import logging
+import os
+import random
+import select
+import struct
+import threading
+import time
+import tty
+from typing import Dict, Optional
+
+from .protocol import Frame, FrameBuilder, FrameDecoder
+
+# Firmware defaults (Lora.hpp / Lora::check_already_store_data)
+DEFAULT_SETTINGS = {
+    'spread_factor': 7,
+    'bandwidth': 9,                 # BW_500KHZ
+    'coding_rate': 2,               # CR_4_6
+    'uplink_frequency': 173500000,  # RX frequency
+    'downlink_frequency': 149500000,  # TX frequency
+}
+
+SETTING_LIMITS = {
+    'spread_factor': (6, 12),
+    'bandwidth': (0, 9),
+    'coding_rate': (1, 4),
+    'uplink_frequency': (170000000, 185000000),
+    'downlink_frequency': (145000000, 160000000),
+}
+
+# Command codes handled by the firmware
+QUERY_TX_FREQ = 0x20
+QUERY_RX_FREQ = 0x21
+QUERY_BANDWIDTH = 0x23
+QUERY_SPREAD_FACTOR = 0x24
+QUERY_CODING_RATE = 0x25
+SET_TX_FREQ = 0xB0
+SET_RX_FREQ = 0xB1
+SET_UART_BAUDRATE = 0xB2
+SET_BANDWIDTH = 0xB3
+SET_SPREAD_FACTOR = 0xB4
+SET_CODING_RATE = 0xB5
+SET_OPERATION_MODE = 0x40
+TRIGGER_SNIFFER_SIMULATION = 0x30
+ONE_DETECTION = 0x17
+MULTIPLE_DETECTION = 0x18
+SNIFFER_IO_DATA = 0x23
+
+# command -> setting it reads or writes
+_QUERIES = {
+    QUERY_TX_FREQ: 'downlink_frequency',
+    QUERY_RX_FREQ: 'uplink_frequency',
+    QUERY_BANDWIDTH: 'bandwidth',
+    QUERY_SPREAD_FACTOR: 'spread_factor',
+    QUERY_CODING_RATE: 'coding_rate',
+}
+_SETS = {
+    SET_TX_FREQ: 'downlink_frequency',
+    SET_RX_FREQ: 'uplink_frequency',
+    SET_BANDWIDTH: 'bandwidth',
+    SET_SPREAD_FACTOR: 'spread_factor',
+    SET_CODING_RATE: 'coding_rate',
+}
+_FREQUENCY_SETTINGS = ('uplink_frequency', 'downlink_frequency')
+
+# Operation modes: SET_OPERATION_MODE data -> (enum value, name)
+MODE_RX, MODE_TX, MODE_TX_RX = 0, 1, 2
+_MODES = {0x01: (MODE_RX, 'RX'), 0x02: (MODE_TX, 'TX'), 0x03: (MODE_TX_RX, 'TX_RX')}
+
+_FLOAT = struct.Struct('<f')
+
+
+class SimulatorEeprom:
+    """LoRa settings store, persisted to a JSON file when a path is given."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.values: Dict[str, int] = dict(DEFAULT_SETTINGS)
+        self.writes = 0
+        if path and os.path.exists(path):
+            with open(path, 'r') as f:
+                stored = json.load(f)
+            # Same validity check as Lora::check_already_store_data()
+            if all(key in stored and SETTING_LIMITS[key][0] <= stored[key] <= SETTING_LIMITS[key][1]
+                   for key in DEFAULT_SETTINGS):
+                self.values = {key: int(stored[key]) for key in DEFAULT_SETTINGS}
+
+    def save(self):
+        """Write the current settings, like ``Lora::save_settings()``."""
+        self.writes += 1
+        if self.path:
+            with open(self.path, 'w') as f:
+                json.dump(self.values, f, indent=2)
+
+    def reset(self):
+        """Restore defaults, like ``Lora::set_default_parameters()``."""
+        self.values = dict(DEFAULT_SETTINGS)
+        self.save()
+
+
+class GatewaySimulator:
+    """
+    Simulated gateway on a pty pair, with its logger on a second pty.
+
+    Host tools open ``simulator.port`` (and ``simulator.log_port``) like a
+    real serial device.
+    """
+
+    def __init__(self, eeprom_path: Optional[str] = None, response_delay: float = 0.0, loss_rate: float = 0.0,
+                 module_function: int = 0x00, module_id: int = 0x00, block_duration: float = 1.0,
+                 simulation_interval: float = 1.0, seed: Optional[int] = None):
+        """
+        Args:
+            eeprom_path: JSON file backing the simulated EEPROM, in memory if None
+            response_delay: Seconds between receiving a command and answering it
+            loss_rate: Probability (0-1) that a response is dropped
+            module_function: Module function the device answers to
+            module_id: Module id the device answers to
+            block_duration: LoRa/simulation pause after each UART command (BLOCK_DURATION_MS)
+            simulation_interval: Seconds between sniffer simulation frames
+            seed: Random seed for loss and simulated detections
+        """
+        self.eeprom = SimulatorEeprom(eeprom_path)
+        self.response_delay = response_delay
+        self.loss_rate = loss_rate
+        self.module_function = module_function
+        self.module_id = module_id
+        self.block_duration = block_duration
+        self.simulation_interval = simulation_interval
+        self.random = random.Random(seed)
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self.operation_mode = MODE_TX_RX
+        self.io_simulation = False
+        self.tag_simulation = False
+        self.multiple_sniffer_id = 0
+
+        self.frame_builder = FrameBuilder()
+        self.frame_decoder = FrameDecoder()
+        self.port: Optional[str] = None
+        self.log_port: Optional[str] = None
+        self._fds = []
+        self._data_fd = None
+        self._log_fd = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._start_time = 0.0
+        self._block_until = 0.0
+        self._next_simulation = 0.0
+
+        # Statistics
+        self.frames_received = 0
+        self.responses_sent = 0
+        self.responses_dropped = 0
+        self.frames_retransmitted = 0
+        self.simulation_frames = 0
+
+    def start(self) -> 'GatewaySimulator':
+        """Create the pty pairs and start the firmware loop."""
+        self._data_fd, self.port = self._open_pty()
+        self._log_fd, self.log_port = self._open_pty()
+        self._start_time = time.monotonic()
+        self._next_simulation = self._start_time + self.simulation_interval
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+        self.log('INF', 'SYS', "=== LoRa Gateway Starting ===")
+        self.log('INF', 'SYS', "Version: 2.0.0 (simulator)")
+        self.log('INF', 'SYS', "Operation Mode: TX_RX")
+        self.log('INF', 'SYS', "Main communication: UART2 (USART2)")
+        self.log('INF', 'SYS', "Logger output: UART3 (USART3) RS485")
+        self.logger.info(f"Simulator on {self.port}, logger on {self.log_port}")
+        return self
+
+    def stop(self):
+        """Stop the firmware loop and close the ptys."""
+        self._stop.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=2.0)
+        self._thread = None
+        for fd in self._fds:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._fds = []
+
+    def __enter__(self) -> 'GatewaySimulator':
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    @property
+    def ticks(self) -> int:
+        """Milliseconds since start, like ``HAL_GetTick()``."""
+        return int((time.monotonic() - self._start_time) * 1000) & 0xFFFFFFFF
+
+    def log(self, level: str, source: str, message: str):
+        """Emit one logger line in the firmware format."""
+        self._write(self._log_fd, f"[{self.ticks:08d}] {level}:{source:<3s} {message}\r\n".encode('ascii'))
+
+    def log_hex(self, level: str, source: str, prefix: str, data: bytes):
+        """Emit a hex dump line like ``Logger::logHex``."""
+        dump = ''.join(f"{b:02X} " for b in data)
+        self.log(level, source, f"{prefix}[{len(data)}]: {dump}")
+
+    def _open_pty(self):
+        master, slave = os.openpty()
+        # Raw slave: no echo of our own output and no newline translation
+        tty.setraw(slave)
+        os.set_blocking(master, False)
+        self._fds.extend((master, slave))
+        return master, os.ttyname(slave)
+
+    def _write(self, fd: Optional[int], data: bytes) -> bool:
+        if fd is None:
+            return False
+        try:
+            os.write(fd, data)
+            return True
+        except (BlockingIOError, OSError):
+            # Nobody draining the port: a UART would just lose the bytes
+            return False
+
+    def _run(self):
+        while not self._stop.is_set():
+            timeout = max(0.0, min(self._next_simulation - time.monotonic(), 0.1))
+            try:
+                ready, _, _ = select.select([self._data_fd], [], [], timeout)
+            except (OSError, ValueError):
+                break
+            if ready:
+                try:
+                    data = os.read(self._data_fd, 4096)
+                except BlockingIOError:
+                    data = b''
+                except OSError:
+                    break
+                for frame in self.frame_decoder.feed(data):
+                    self._process_frame(frame)
+
+            now = time.monotonic()
+            if now >= self._next_simulation:
+                self._next_simulation = now + self.simulation_interval
+                if now >= self._block_until:
+                    self._handle_simulation()
+
+    def _process_frame(self, frame: Frame):
+        """Equivalent of processUartCommand() for one validated frame."""
+        self.frames_received += 1
+        self.log_hex('DBG', 'U2', 'RX', frame.raw)
+        self._block_until = time.monotonic() + self.block_duration
+
+        if frame.module_function != self.module_function or frame.module_id != self.module_id:
+            self._retransmit(frame)
+            return
+
+        command = frame.command
+        self.log('INF', 'CMD', f"Processing command 0x{command:02X}")
+        values = self.eeprom.values
+
+        if command in _QUERIES:
+            self._respond(frame, self._encode_setting(_QUERIES[command]))
+        elif command in _SETS:
+            key = _SETS[command]
+            value = self._decode_setting(key, frame.payload)
+            low, high = SETTING_LIMITS[key]
+            if value is not None and low <= value <= high:
+                values[key] = value
+            self._respond(frame, self._encode_setting(key))
+            self.eeprom.save()
+        elif command == SET_UART_BAUDRATE:
+            self.eeprom.reset()
+        elif command == SET_OPERATION_MODE:
+            requested = frame.payload[0] if len(frame.payload) == 1 else 0
+            self.log('INF', 'CFG', f"Changing operation mode to: {requested}")
+            if requested in _MODES:
+                self.operation_mode, name = _MODES[requested]
+                self.log('INF', 'CFG', f"Operation mode changed successfully to: {name}")
+                self._respond(frame, bytes([self.operation_mode]))
+        elif command == TRIGGER_SNIFFER_SIMULATION:
+            enable = frame.payload[0] if len(frame.payload) == 1 else 0
+            self.io_simulation = enable == 1
+            self.tag_simulation = enable == 2
+            self._respond(frame, bytes([enable if enable in (1, 2) else 0]))
+
+    def _respond(self, frame: Frame, data: bytes):
+        if self.response_delay > 0:
+            time.sleep(self.response_delay)
+        if self.loss_rate > 0 and self.random.random() < self.loss_rate:
+            self.responses_dropped += 1
+            return
+        response = self.frame_builder.build_frame(frame.module_function, frame.module_id, frame.command, data)
+        if self._write(self._data_fd, response):
+            self.responses_sent += 1
+
+    def _retransmit(self, frame: Frame):
+        if self.operation_mode not in (MODE_TX, MODE_TX_RX):
+            return
+        self.frames_retransmitted += 1
+        self.log_hex('INF', 'LTX', 'Transmitting', frame.raw)
+        self.log('INF', 'LTX', "Transmission successful")
+
+    def _encode_setting(self, key: str) -> bytes:
+        value = self.eeprom.values[key]
+        if key in _FREQUENCY_SETTINGS:
+            return _FLOAT.pack(value / 1e6)
+        return bytes([value])
+
+    @staticmethod
+    def _decode_setting(key: str, payload: bytes) -> Optional[int]:
+        if key in _FREQUENCY_SETTINGS:
+            if len(payload) < 4:
+                return 0
+            # Float math as in CommandMessage::freqDecode()
+            return int(_FLOAT.unpack_from(payload)[0] * 1e6)
+        return payload[0] if len(payload) == 1 else 0
+
+    def _handle_simulation(self):
+        """Equivalent of handleSnifferSimulation()."""
+        if self.io_simulation:
+            data = bytes(self.random.randrange(256) for _ in range(33))
+            self._send_simulation(SNIFFER_IO_DATA, data)
+        elif self.tag_simulation:
+            command, data = self._tag_detection()
+            if data:
+                self._send_simulation(command, data)
+
+    def _send_simulation(self, command: int, data: bytes):
+        frame = self.frame_builder.build_frame(0x00, 0x00, command, data)
+        if self._write(self._data_fd, frame):
+            self.simulation_frames += 1
+
+    def _tag_detection(self):
+        """Random ONE_DETECTION or MULTIPLE_DETECTION payload (enhancedTagSimulation)."""
+        rng = self.random
+        sniffer_id = rng.randint(1, 5)
+        num_tags = rng.randint(0, 24)
+        if num_tags == 0:
+            return ONE_DETECTION, b''
+
+        data = bytearray(struct.pack('<IBB', sniffer_id, num_tags, num_tags))
+        if self.multiple_sniffer_id == sniffer_id:
+            command = MULTIPLE_DETECTION
+            for _ in range(num_tags):
+                distance_a = rng.uniform(0.0, 40.0)
+                distance_b = max(0.0, distance_a + rng.uniform(-0.5, 0.5))
+                data += struct.pack('<IHHB', rng.randint(0, 200), int(distance_a * 100),
+                                    int(distance_b * 100), rng.randint(25, 42))
+            self.multiple_sniffer_id = 0
+        else:
+            command = ONE_DETECTION
+            for _ in range(num_tags):
+                data += struct.pack('<IB', rng.randint(0, 200), rng.randint(25, 42))
+            if rng.randint(0, 3) == 0:
+                self.multiple_sniffer_id = sniffer_id
+        return command, bytes(data)
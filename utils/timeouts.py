@@ -0,0 +1,193 @@
+"""
+Adaptive Timeouts
+=================
+
+Response timeouts derived from the link speed and from measured round
+trips instead of fixed constants.
+
+A response cannot arrive before the request and the response have been
+clocked out at the port's baudrate, so every timeout starts from that
+wire time. On top of it each ``(module_function, module_id, command)``
+keeps a TCP-style smoothed round trip and variance (RFC 6298) of the
+device's turnaround, i.e. the measured round trip minus the wire time:
+
+    rttvar = 3/4 * rttvar + 1/4 * |srtt - sample|
+    srtt   = 7/8 * srtt + 1/8 * sample
+    timeout = wire_time + srtt + max(granularity, 4 * rttvar)
+
+Storing the turnaround rather than the raw round trip keeps the history
+valid when the baudrate or the payload length changes. Samples from
+retransmitted requests are ignored (Karn's algorithm) and each
+retransmission doubles the previous attempt's timeout.
+
+Example::
+
+    estimator = TimeoutEstimator(baudrate=9600)
+    timeout = estimator.timeout(key, len(frame))
+    ...
+    estimator.observe(key, rtt, len(frame), len(response.raw))
+
+Author: Assistant
+Date: October 2025
+"""
+
+import threading
+from typing import Dict, Optional, Tuple
+
+from .command_registry import KIND_QUERY, KIND_SET, REGISTRY
+from .protocol import MIN_FRAME_SIZE
+
+# 8N1: start bit, 8 data bits, stop bit
+BITS_PER_BYTE = 10
+
+# Turnaround assumed before a device has answered anything
+DEFAULT_TURNAROUND = 0.2
+
+# Lower bound on the variance term: host scheduling and USB-serial latency
+DEFAULT_GRANULARITY = 0.01
+
+TimeoutKey = Tuple[int, int, int]
+
+
+def wire_time(num_bytes: int, baudrate: int) -> float:
+    """Seconds needed to clock ``num_bytes`` out at ``baudrate``."""
+    return num_bytes * BITS_PER_BYTE / baudrate
+
+
+def response_length(command: int, module_function: Optional[int] = None, request_data: int = 0) -> int:
+    """
+    Expected length of the frame answering a command.
+
+    Parameter queries answer with the parameter's wire size, SETs echo
+    their payload; anything else is assumed to echo the request.
+    """
+    spec = REGISTRY.lookup(module_function, command, KIND_SET if request_data else KIND_QUERY)
+    if spec is not None and spec.codec is not None:
+        return MIN_FRAME_SIZE + spec.codec.size
+    return MIN_FRAME_SIZE + request_data
+
+
+class RttEstimator:
+    """Smoothed round trip and variance of one device/command (RFC 6298)."""
+
+    __slots__ = ('srtt', 'rttvar', 'samples')
+
+    def __init__(self):
+        self.srtt: Optional[float] = None
+        self.rttvar = 0.0
+        self.samples = 0
+
+    def update(self, sample: float):
+        """Add one measured sample, in seconds."""
+        sample = max(sample, 0.0)
+        if self.srtt is None:
+            self.srtt = sample
+            self.rttvar = sample / 2
+        else:
+            self.rttvar += (abs(self.srtt - sample) - self.rttvar) / 4
+            self.srtt += (sample - self.srtt) / 8
+        self.samples += 1
+
+    def rto(self, granularity: float = DEFAULT_GRANULARITY) -> Optional[float]:
+        """Retransmission timeout, or None before the first sample."""
+        if self.srtt is None:
+            return None
+        return self.srtt + max(granularity, 4 * self.rttvar)
+
+    def __repr__(self) -> str:
+        if self.srtt is None:
+            return "<RttEstimator no samples>"
+        return f"<RttEstimator srtt={self.srtt * 1000:.1f} ms rttvar={self.rttvar * 1000:.1f} ms n={self.samples}>"
+
+
+class TimeoutEstimator:
+    """
+    Per-device/command response timeouts for one serial link.
+
+    Thread-safe; one instance is shared by everything talking over the
+    same port. Update ``baudrate`` when the link speed changes.
+    """
+
+    def __init__(self, baudrate: int = 115200, initial_turnaround: float = DEFAULT_TURNAROUND,
+                 min_timeout: float = 0.02, max_timeout: float = 2.0,
+                 granularity: float = DEFAULT_GRANULARITY):
+        """
+        Args:
+            baudrate: Link speed used for the wire time
+            initial_turnaround: Device turnaround assumed before the first answer
+            min_timeout: Lower bound for any timeout
+            max_timeout: Upper bound for any timeout, including backoff
+            granularity: Lower bound for the variance term
+        """
+        self.baudrate = baudrate
+        self.initial_turnaround = initial_turnaround
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.granularity = granularity
+        self._estimators: Dict[TimeoutKey, RttEstimator] = {}
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.samples = 0
+        self.discarded = 0
+
+    def wire_time(self, request_length: int, response_length: int) -> float:
+        """Time to send the request and receive the response at the current baudrate."""
+        return wire_time(request_length + response_length, self.baudrate)
+
+    def estimator(self, key: TimeoutKey) -> Optional[RttEstimator]:
+        """History for a device/command, or None if it never answered."""
+        return self._estimators.get(key)
+
+    def timeout(self, key: TimeoutKey, request_length: int, response_len: Optional[int] = None,
+                attempt: int = 1) -> float:
+        """
+        Timeout for one attempt of a request.
+
+        Args:
+            key: ``(module_function, module_id, command)``
+            request_length: Request frame length in bytes
+            response_len: Expected response length, defaults to ``response_length()``
+            attempt: 1 for the first transmission; each retransmission doubles the timeout
+        """
+        if response_len is None:
+            response_len = response_length(key[2], key[0], request_length - MIN_FRAME_SIZE)
+        estimator = self._estimators.get(key)
+        turnaround = estimator.rto(self.granularity) if estimator is not None else None
+        if turnaround is None:
+            turnaround = self.initial_turnaround
+        timeout = self.wire_time(request_length, response_len) + turnaround
+        timeout *= 2 ** (attempt - 1)
+        return min(max(timeout, self.min_timeout), self.max_timeout)
+
+    def observe(self, key: TimeoutKey, rtt: float, request_length: int, response_length: int,
+                retransmitted: bool = False):
+        """
+        Record a measured round trip.
+
+        Args:
+            key: ``(module_function, module_id, command)``
+            rtt: Seconds from sending the request to receiving the response
+            request_length: Request frame length in bytes
+            response_length: Response frame length in bytes
+            retransmitted: The request was sent more than once; the sample is
+                ambiguous and discarded
+        """
+        if retransmitted:
+            self.discarded += 1
+            return
+        turnaround = rtt - self.wire_time(request_length, response_length)
+        with self._lock:
+            estimator = self._estimators.get(key)
+            if estimator is None:
+                estimator = self._estimators[key] = RttEstimator()
+            estimator.update(turnaround)
+            self.samples += 1
+
+    def reset(self, key: Optional[TimeoutKey] = None):
+        """Forget the history of one device/command, or all of it."""
+        with self._lock:
+            if key is None:
+                self._estimators.clear()
+            else:
+                self._estimators.pop(key, None)
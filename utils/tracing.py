@@ -0,0 +1,185 @@
+"""
+Command Lifecycle Tracing
+=========================
+
+Optional trace of every request's lifecycle, written as Chrome
+trace-event JSON (loads in Perfetto and ``chrome://tracing``).
+
+Each request becomes one async track with consecutive stages::
+
+    host queue        submitted -> write start (waiting for a free slot)
+    write #N          write start -> write end (one per attempt)
+    wire + firmware   write end -> first response byte
+    receive           first response byte -> frame complete
+    dispatch to UI    frame complete -> handled on the GUI thread (GUI only)
+
+Tracing is off unless ``LORA_TRACE=<file.json>`` is set or a tool is
+started with ``--trace <file.json>``. When off, instrumented code only
+tests ``TRACER.enabled``; nothing is timestamped or allocated.
+
+Example::
+
+    TRACER.enable('trace.json')
+    ...                      # run requests
+    TRACER.save()            # also done automatically at exit
+
+Author: Assistant
+Date: October 2025
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from itertools import count
+from typing import Dict, List, Optional, Tuple
+
+from .command_registry import REGISTRY
+
+TRACE_ENV = 'LORA_TRACE'
+
+# Keeps a forgotten trace from growing without bound
+MAX_EVENTS = 1_000_000
+
+TraceKey = Tuple[int, int, int]
+
+
+class Tracer:
+    """Collects trace events in memory and writes them as Chrome trace JSON."""
+
+    def __init__(self):
+        self.enabled = False
+        self.path: Optional[str] = None
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._events: List[dict] = []
+        self._ids = count(1)
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+        self._threads: Dict[int, str] = {}
+        self._completed: Dict[TraceKey, Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+        self._atexit = False
+
+        # Statistics
+        self.dropped = 0
+
+    def enable(self, path: Optional[str] = None):
+        """Start recording; the trace is written to ``path`` by ``save()`` and at exit."""
+        self.path = path or self.path
+        if not self._atexit:
+            atexit.register(self._save_at_exit)
+            self._atexit = True
+        self.enabled = True
+        self.logger.info(f"Tracing enabled, writing to {self.path}")
+
+    def disable(self):
+        self.enabled = False
+
+    @staticmethod
+    def now() -> float:
+        """Timestamp for trace events (``time.perf_counter``)."""
+        return time.perf_counter()
+
+    def new_id(self) -> int:
+        """Id for a new request track."""
+        return next(self._ids)
+
+    def _add(self, event: dict):
+        if len(self._events) >= MAX_EVENTS:
+            self.dropped += 1
+            return
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        event['pid'] = self._pid
+        event['tid'] = tid
+        # list.append is atomic; no lock on the hot path
+        self._events.append(event)
+
+    def _ts(self, timestamp: float) -> float:
+        return round((timestamp - self._origin) * 1e6, 3)
+
+    def begin(self, name: str, trace_id: int, timestamp: Optional[float] = None, args: Optional[dict] = None):
+        """Open an async slice on request track ``trace_id``."""
+        event = {'name': name, 'cat': 'request', 'ph': 'b', 'id': trace_id,
+                 'ts': self._ts(self.now() if timestamp is None else timestamp)}
+        if args:
+            event['args'] = args
+        self._add(event)
+
+    def end(self, name: str, trace_id: int, timestamp: Optional[float] = None, args: Optional[dict] = None):
+        """Close the async slice opened with the same name and id."""
+        event = {'name': name, 'cat': 'request', 'ph': 'e', 'id': trace_id,
+                 'ts': self._ts(self.now() if timestamp is None else timestamp)}
+        if args:
+            event['args'] = args
+        self._add(event)
+
+    def span(self, name: str, trace_id: int, start: float, end: float, args: Optional[dict] = None):
+        """One stage of a request, as a nested async slice."""
+        self.begin(name, trace_id, start, args)
+        self.end(name, trace_id, max(start, end))
+
+    def instant(self, name: str, timestamp: Optional[float] = None, args: Optional[dict] = None):
+        """Thread-scoped instant event."""
+        event = {'name': name, 'cat': 'event', 'ph': 'i', 's': 't',
+                 'ts': self._ts(self.now() if timestamp is None else timestamp)}
+        if args:
+            event['args'] = args
+        self._add(event)
+
+    def frame_complete(self, key: TraceKey, trace_id: int, timestamp: float):
+        """Remember a completed response so the UI can trace its dispatch."""
+        with self._lock:
+            self._completed[key] = (trace_id, timestamp)
+
+    def dispatched(self, key: TraceKey):
+        """Trace the UI handling of the response most recently completed for ``key``."""
+        with self._lock:
+            completed = self._completed.pop(key, None)
+        if completed is not None:
+            trace_id, timestamp = completed
+            self.span('dispatch to UI', trace_id, timestamp, self.now())
+
+    def to_dict(self) -> dict:
+        """Trace in Chrome trace-event format."""
+        events = list(self._events)
+        for tid, name in list(self._threads.items()):
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': self._pid, 'tid': tid,
+                           'args': {'name': name}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def save(self, path: Optional[str] = None) -> Optional[str]:
+        """Write the trace; returns the path or None if there is nowhere to write."""
+        path = path or self.path
+        if path is None:
+            return None
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f)
+        self.logger.info(f"Trace with {len(self._events)} events written to {path}")
+        return path
+
+    def clear(self):
+        self._events = []
+        with self._lock:
+            self._completed.clear()
+
+    def _save_at_exit(self):
+        if self.enabled and self._events:
+            try:
+                self.save()
+            except OSError as e:
+                self.logger.error(f"Failed to write trace: {e}")
+
+
+def request_label(key: TraceKey, kind: Optional[str] = None) -> str:
+    """Track name for a request of ``kind``, e.g. ``"QUERY_SPREAD_FACTOR 0:0"``."""
+    return f"{REGISTRY.command_name(key[2], key[0], kind)} {key[0]}:{key[1]}"
+
+
+TRACER = Tracer()
+
+if os.environ.get(TRACE_ENV):
+    TRACER.enable(os.environ[TRACE_ENV])